@@ -0,0 +1,290 @@
+"""
+Attendance risk scoring API (FastAPI).
+
+    uvicorn backend.app:app --port 8000            # from the repository root
+    MAX_BATCH_SIZE=64 MAX_WAIT_MS=5 uvicorn backend.app:app
+
+Endpoints:
+    POST /predict-attendance-risk        one student   -> one prediction
+    POST /predict-attendance-risk/bulk   many students -> predictions, same order
+    GET  /students/{student_id}/risk     a student already in the feature store
+    GET  /health                         model version, micro-batching and cache stats
+
+Single-student requests are not scored one by one. Each request puts its row
+on a queue and awaits a future; a background task drains the queue into a
+micro-batch (up to MAX_BATCH_SIZE rows, waiting at most MAX_WAIT_MS after the
+first row arrives) and scores the whole batch with one vectorized call
+(inference.score_rows) on a worker thread, so the event loop never blocks on
+pandas/NumPy. Bulk requests are already batches and go straight to the
+worker thread.
+
+Predictions go through a PredictionCache (ml/code/prediction_cache.py) keyed
+by the input row's hash and the bundle version, so repeat requests for an
+unchanged student skip the model and a retrain invalidates them (bulk
+requests bypass it). Its size is PREDICTION_CACHE_SIZE (0 disables it).
+"""
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, ConfigDict
+
+# The model code lives in ml/code (flat modules, imported by name)
+ML_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml", "code")
+if ML_CODE_DIR not in sys.path:
+    sys.path.insert(0, ML_CODE_DIR)
+
+from attendance_features import TREND_COLUMNS, WEEK_PATTERN  # noqa: E402
+from inference import score_rows  # noqa: E402
+from model_bundle import bundle_path_for, get_bundle  # noqa: E402
+from prediction_cache import PredictionCache  # noqa: E402
+
+MODEL_TYPE = os.getenv("MODEL_TYPE", "logistic")
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("MAX_WAIT_MS", "5"))
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+
+cache = PredictionCache(max_entries=PREDICTION_CACHE_SIZE) if PREDICTION_CACHE_SIZE > 0 else None
+
+
+# ========== Request / Response Models ==========
+class StudentData(BaseModel):
+    # Any other feature columns (Week_N_Attendance, Average_Attendance, ...) are accepted as extras
+    model_config = ConfigDict(extra="allow")
+
+    student_id: int
+    student_name: Optional[str] = None
+    mentor_name: Optional[str] = None
+    parent_name: Optional[str] = None
+
+class PredictionResponse(BaseModel):
+    student_id: int
+    prediction: int
+    risk_score: float
+    risk_level: str
+
+class BulkRequest(BaseModel):
+    students: List[StudentData]
+
+class BulkResponse(BaseModel):
+    model_version: str
+    predictions: List[PredictionResponse]
+
+
+# ========== Scoring (worker thread) ==========
+def _score(records, use_cache=True):
+    """
+    Score a list of feature dicts -> list of response dicts, in the same order.
+
+    Records sending the same fields share one vectorized call (usually the
+    whole batch). A record is never put in a frame with columns only other
+    requests sent: those would be NaN in its row, changing its cache key and
+    keeping its trend features from being derived from its weeks.
+    """
+    # Cache lookups cost a few microseconds per row: a win for micro-batches,
+    # not for bulk requests that compiled scoring handles in one pass anyway
+    scorer = cache.score_rows if cache is not None and use_cache else score_rows
+    groups = {}
+    for position, record in enumerate(records):
+        groups.setdefault(frozenset(record), []).append(position)
+    results = [None] * len(records)
+    for positions in groups.values():
+        rows = pd.DataFrame.from_records([records[i] for i in positions])
+        labels, risk_scores, risk_levels = scorer(rows, MODEL_TYPE)
+        for i, sid, label, p, level in zip(positions, rows["student_id"], labels, risk_scores, risk_levels):
+            results[i] = {"student_id": int(sid), "prediction": int(label), "risk_score": float(p),
+                          "risk_level": str(level)}
+    return results
+
+def _bundle():
+    try:
+        return get_bundle(bundle_path_for(MODEL_TYPE))
+    except (FileNotFoundError, KeyError):
+        raise HTTPException(status_code=503, detail="Model not trained yet; run ml/code/train.py")
+
+def _required_fields(bundle):
+    """Raw input fields a request must carry (trend features are derived from the weeks)."""
+    names = {"student_name", "mentor_name", "parent_name"}
+    return [c for c in bundle["feature_names"] if c not in TREND_COLUMNS and c not in names]
+
+def _is_number(value):
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+def _validate(students):
+    """Feature dicts for the given students; 422 if any lacks a field the model needs or has a non-number in one."""
+    bundle = _bundle()
+    required = _required_fields(bundle)
+    numeric = set(required) | set(TREND_COLUMNS)
+    records = []
+    for student in students:
+        record = student.model_dump()
+        missing = [c for c in required if c not in record]
+        # Trend features are derived from the weeks when not given; any number of weeks will do
+        if any(c not in record for c in TREND_COLUMNS) and not any(WEEK_PATTERN.match(k) for k in record):
+            missing.append("Week_N_Attendance")
+        if missing:
+            raise HTTPException(status_code=422,
+                                detail=f"student {student.student_id}: missing fields {missing}")
+        # Extras are not typed by the model above: one "abc" would fail the whole micro-batch
+        invalid = [k for k, v in record.items() if (k in numeric or WEEK_PATTERN.match(k)) and not _is_number(v)]
+        if invalid:
+            raise HTTPException(status_code=422,
+                                detail=f"student {student.student_id}: fields must be numbers: {invalid}")
+        records.append(record)
+    return records
+
+
+# ========== Micro-batching ==========
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row requests into vectorized batches.
+
+    If scoring a batch raises, its rows are scored again one at a time, so
+    the exception only reaches the request whose row caused it.
+    """
+
+    def __init__(self, score_fn, executor, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.score_fn = score_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self.task = None
+        self.batches = 0
+        self.rows = 0
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, record):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((record, future))
+        return await future
+
+    async def _collect(self):
+        """Block for the first row, then take more until the batch is full or max_wait has passed."""
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.score_fn, records)
+            except Exception as e:
+                # A bad row must not fail the requests it was batched with: score them one by one
+                results = [e] if len(batch) == 1 else [await self._score_one(loop, r) for r in records]
+            self.batches += 1
+            self.rows += len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():  # the client may have gone away
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _score_one(self, loop, record):
+        """The record's result, or the exception scoring it raised."""
+        try:
+            return (await loop.run_in_executor(self.executor, self.score_fn, [record]))[0]
+        except Exception as e:
+            return e
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "queued": self.queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+
+# ========== App ==========
+@asynccontextmanager
+async def lifespan(app):
+    # One scoring thread: NumPy releases the GIL, and batches stay in arrival order
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+    app.state.executor = executor
+    app.state.batcher = MicroBatcher(_score, executor)
+    app.state.batcher.start()
+    try:
+        get_bundle(bundle_path_for(MODEL_TYPE))   # load (and memory-map) the bundle before the first request
+    except (FileNotFoundError, KeyError):
+        print(f"❌ No trained '{MODEL_TYPE}' model yet; scoring endpoints return 503 until one is saved")
+    yield
+    await app.state.batcher.stop()
+    executor.shutdown(wait=False)
+
+app = FastAPI(title="Attendance Risk API", lifespan=lifespan)
+
+
+@app.post("/predict-attendance-risk", response_model=PredictionResponse)
+async def predict_attendance_risk(student: StudentData):
+    record = _validate([student])[0]
+    try:
+        return await app.state.batcher.submit(record)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.post("/predict-attendance-risk/bulk", response_model=BulkResponse)
+async def predict_attendance_risk_bulk(request: BulkRequest):
+    records = _validate(request.students)
+    if not records:
+        return {"model_version": _bundle()["version"], "predictions": []}
+    loop = asyncio.get_running_loop()
+    try:
+        predictions = await loop.run_in_executor(app.state.executor, _score, records, False)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"model_version": _bundle()["version"], "predictions": predictions}
+
+@app.get("/students/{student_id}/risk", response_model=PredictionResponse)
+async def student_risk(student_id: int):
+    from feature_store import FeatureStore
+
+    def fetch():
+        with FeatureStore() as store:
+            return store.get([student_id])
+
+    _bundle()
+    rows = await asyncio.get_running_loop().run_in_executor(None, fetch)
+    if rows.empty:
+        raise HTTPException(status_code=404, detail=f"student {student_id} is not in the feature store")
+    return await app.state.batcher.submit(rows.iloc[0].to_dict())
+
+@app.get("/health")
+async def health():
+    try:
+        version = get_bundle(bundle_path_for(MODEL_TYPE))["version"]
+    except (FileNotFoundError, KeyError):
+        version = None
+    return {"model_type": MODEL_TYPE, "model_version": version, "batching": app.state.batcher.stats(),
+            "cache": cache.stats() if cache is not None else None}
@@ -0,0 +1,104 @@
+"""
+Local load test for the scoring API.
+
+    uvicorn backend.app:app --port 8000 &
+    python backend/load_test.py --requests 2000 --concurrency 64
+    python backend/load_test.py --bulk 500 --requests 50
+
+Fires single-student requests (or --bulk batches) from an asyncio client with
+a fixed number in flight, then reports p50/p99 latency and requests per
+second. Payloads are real rows from the feature store when one exists.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+ML_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml", "code")
+sys.path.insert(0, ML_CODE_DIR)
+
+SAMPLE_STUDENT = {
+    "student_id": 9999, "student_name": "Test Student", "mentor_name": "Test Mentor",
+    "parent_name": "Test Parent", "test_score": 45.0, "max_score": 100.0, "avg_score_ratio": 0.45,
+    **{f"Week_{i}_Attendance": float(100 - 8 * i) for i in range(1, 13)},
+    "Attendance_Decline_Score": 80.0, "Average_Attendance": 48.0,
+    "Lowest_Week_Attendance": 4.0, "Highest_Week_Attendance": 92.0,
+}
+
+
+def load_payloads(n):
+    """Up to n feature rows from the feature store (JSON-ready), or the sample student."""
+    try:
+        from feature_store import FeatureStore
+
+        with FeatureStore() as store:
+            rows = next(store.iter_chunks(n))
+        rows = rows.astype(object).where(rows.notna(), None)
+        return rows.to_dict("records")
+    except Exception:
+        return [SAMPLE_STUDENT]
+
+async def run(url, payloads, n_requests, concurrency, bulk):
+    latencies = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        async def one(i):
+            nonlocal errors
+            if bulk:
+                path = "/predict-attendance-risk/bulk"
+                body = {"students": [payloads[(i * bulk + j) % len(payloads)] for j in range(bulk)]}
+            else:
+                path, body = "/predict-attendance-risk", payloads[i % len(payloads)]
+            async with sem:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(path, json=body)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - start
+        health = (await client.get("/health")).json()
+
+    latencies = np.array(latencies) * 1000.0
+    return {
+        "requests": n_requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "req_per_s": n_requests / elapsed,
+        "students_per_s": n_requests * (bulk or 1) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "batching": health.get("batching"),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the scoring API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--bulk", type=int, default=0, help="students per bulk request (0: single-student requests)")
+    args = parser.parse_args(argv)
+
+    payloads = load_payloads(max(1000, args.bulk))
+    result = asyncio.run(run(args.url, payloads, args.requests, args.concurrency, args.bulk))
+
+    print(f"Requests: {result['requests']} ({result['errors']} errors) in {result['seconds']:.2f}s")
+    print(f"Throughput: {result['req_per_s']:.0f} req/s, {result['students_per_s']:.0f} students/s")
+    print(f"Latency: p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+    print(f"Server batching: {result['batching']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+import app
+
+
+def test_a_bad_row_only_fails_its_own_request():
+    def score(records):
+        if any(not isinstance(r["Average_Attendance"], (int, float)) for r in records):
+            raise ValueError("could not convert string to float: 'abc'")
+        return [r["student_id"] for r in records]
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            batcher = app.MicroBatcher(score, executor, max_batch_size=8, max_wait_ms=50)
+            batcher.start()
+            try:
+                return await asyncio.gather(batcher.submit({"student_id": 1, "Average_Attendance": 90.0}),
+                                            batcher.submit({"student_id": 2, "Average_Attendance": "abc"}),
+                                            return_exceptions=True)
+            finally:
+                await batcher.stop()
+
+    good, bad = asyncio.run(run())
+    assert good == 1 and isinstance(bad, ValueError)
+
+def test_non_numeric_features_are_rejected_per_request(monkeypatch):
+    monkeypatch.setattr(app, "_bundle", lambda: {"feature_names": ["Average_Attendance", "student_name"]})
+    ok = app.StudentData(student_id=1, Average_Attendance=90, Week_1_Attendance=None)
+    assert app._validate([ok])[0]["Average_Attendance"] == 90
+    for bad in ({"Average_Attendance": "abc", "Week_1_Attendance": 80},
+                {"Average_Attendance": 90, "Week_1_Attendance": "80"}):
+        with pytest.raises(HTTPException) as error:
+            app._validate([app.StudentData(student_id=2, **bad)])
+        assert error.value.status_code == 422 and "must be numbers" in error.value.detail
+
+def test_rows_are_scored_with_only_the_fields_they_sent(monkeypatch):
+    frames = []
+
+    def score(rows, model_type):
+        frames.append(rows)
+        return [0] * len(rows), [0.5] * len(rows), ["Medium"] * len(rows)
+    monkeypatch.setattr(app, "cache", None)
+    monkeypatch.setattr(app, "score_rows", score)
+    records = [{"student_id": 1, "Week_1_Attendance": 90},
+               {"student_id": 2, "Week_1_Attendance": 80, "Week_2_Attendance": 70},
+               {"student_id": 3, "Week_1_Attendance": 60}]
+    results = app._score(records)
+    assert [r["student_id"] for r in results] == [1, 2, 3]
+    assert sorted(sorted(frame.columns) for frame in frames) == [
+        ["Week_1_Attendance", "Week_2_Attendance", "student_id"], ["Week_1_Attendance", "student_id"]]
+    assert not any(frame.isna().any().any() for frame in frames)
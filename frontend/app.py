@@ -0,0 +1,158 @@
+"""
+Attendance risk dashboard (Streamlit).
+
+    streamlit run frontend/app.py                  # from the repository root
+    MODEL_TYPE=tree PAGE_SIZE=50 streamlit run frontend/app.py
+
+Drill down institute -> mentor -> student. Every student is scored once per
+data version (DashboardData.load behind st.cache_resource) and all
+aggregation and paging happens on the server (frontend/dashboard_data.py):
+the browser is only ever sent the summary table and the one page it is
+looking at. Every rerun reads the current version (data_version: the
+feature store's last sync and the model bundle's version, a millisecond
+check), so retraining the model or syncing the feature store is picked up
+on the next interaction. Pages are additionally kept in st.cache_data,
+keyed by that version, so flipping back to a page already seen is a
+dictionary lookup. "Reload data" drops the caches and rescores.
+
+The weekly risk trend per institute comes from the risk rollup that batch
+scoring maintains (ml/code/risk_rollup.py), a millisecond query.
+
+The sidebar shows how often each cache served a request without recomputing
+(hit rate) and how long the current page took to build.
+"""
+import os
+import sys
+import time
+
+import streamlit as st
+
+FRONTEND_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_CODE_DIR = os.path.join(os.path.dirname(FRONTEND_DIR), "ml", "code")
+for path in (ML_CODE_DIR, FRONTEND_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from dashboard_data import DashboardData, data_version  # noqa: E402
+from paths import ROLLUP_PATH  # noqa: E402
+from risk_rollup import RiskRollup  # noqa: E402
+
+MODEL_TYPE = os.getenv("MODEL_TYPE", "logistic")
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "25"))
+LEVELS = ["All", "High", "Medium", "Low"]
+
+
+# ========== Caches ==========
+@st.cache_resource
+def cache_counters():
+    """{cache name: [calls, misses]}, shared by every session of this server."""
+    return {}
+
+def counted(name, fn):
+    """Wrap a cached function so every call is counted; fn counts its own misses."""
+    def wrapper(*args, **kwargs):
+        cache_counters().setdefault(name, [0, 0])[0] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+def _miss(name):
+    cache_counters().setdefault(name, [0, 0])[1] += 1
+
+# One entry: a new version replaces the previous data instead of keeping both in memory
+@st.cache_resource(show_spinner="Scoring students...", max_entries=1)
+def _load_data(model_type, version):
+    _miss("data")
+    return DashboardData.load(model_type=model_type)
+
+@st.cache_resource
+def rollup():
+    return RiskRollup() if os.path.exists(ROLLUP_PATH) else None
+
+# Arguments starting with "_" are not hashed: the pages are keyed on the data version instead
+@st.cache_data(max_entries=1000)
+def _mentor_page(_data, version, institute_id, page):
+    _miss("mentor pages")
+    return _data.mentor_summary(institute_id, page, PAGE_SIZE)
+
+@st.cache_data(max_entries=5000)
+def _student_page(_data, version, institute_id, mentor_id, page, level):
+    _miss("student pages")
+    return _data.student_page(institute_id, mentor_id, page, PAGE_SIZE, level)
+
+load_data = counted("data", _load_data)
+mentor_page = counted("mentor pages", _mentor_page)
+student_page = counted("student pages", _student_page)
+
+
+# ========== Layout ==========
+def pager(label, pages, key):
+    if pages <= 1:
+        return 0
+    return st.number_input(f"{label} page (of {pages})", min_value=1, max_value=pages, value=1, key=key) - 1
+
+def sidebar(data, started):
+    st.sidebar.header("Data")
+    st.sidebar.caption(f"Model: {MODEL_TYPE} · version {data.version}")
+    if st.sidebar.button("Reload data"):
+        st.cache_data.clear()
+        _load_data.clear()
+        st.rerun()
+    st.sidebar.header("Caches")
+    st.sidebar.table([{"cache": name, "calls": calls, "hit rate": f"{1 - misses / calls:.0%}" if calls else "-"}
+                      for name, (calls, misses) in cache_counters().items()])
+    st.sidebar.caption(f"⏱️ Page built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def main():
+    started = time.perf_counter()
+    st.set_page_config(page_title="Attendance risk", layout="wide")
+    st.title("Attendance risk dashboard")
+    try:
+        data = load_data(MODEL_TYPE, data_version(model_type=MODEL_TYPE))
+    except FileNotFoundError:
+        st.error(f"No trained {MODEL_TYPE} model found. Run `python ml/code/train.py` first.")
+        return
+
+    institutes = data.institute_summary()
+    if institutes.empty:
+        st.warning("The feature store is empty.")
+        return
+    st.subheader("Institutes")
+    st.dataframe(institutes, hide_index=True, use_container_width=True)
+
+    institute_id = st.selectbox("Institute", institutes["institute_id"].tolist())
+    trend = rollup().query(institute_id=institute_id, by=("week",)) if rollup() is not None else None
+    if trend is not None and len(trend) > 1:
+        st.line_chart(trend.set_index("week")[["mean_risk"]].rename(columns={"mean_risk": "Mean risk by week"}))
+    mentors, pages = mentor_page(data, data.version, institute_id, 0)
+    page = pager("Mentor", pages, key=f"mentors-{institute_id}")
+    if page:
+        mentors, pages = mentor_page(data, data.version, institute_id, page)
+    st.subheader(f"Mentors of institute {institute_id}")
+    st.dataframe(mentors, hide_index=True, use_container_width=True)
+
+    labels = {row.mentor_id: f"{getattr(row, 'mentor_name', '')} ({row.mentor_id})".strip()
+              for row in mentors.itertuples()}
+    mentor_id = st.selectbox("Mentor", list(labels), format_func=labels.get)
+    level = st.radio("Risk level", LEVELS, horizontal=True)
+    level = None if level == "All" else level
+    students, pages = student_page(data, data.version, institute_id, mentor_id, 0, level)
+    page = pager("Student", pages, key=f"students-{institute_id}-{mentor_id}-{level}")
+    if page:
+        students, pages = student_page(data, data.version, institute_id, mentor_id, page, level)
+    st.subheader("Students (highest risk first)")
+    st.dataframe(students, hide_index=True, use_container_width=True)
+
+    if not students.empty:
+        student_id = st.selectbox("Student", students["student_id"].tolist())
+        detail = data.student_detail(student_id)
+        weekly = detail.pop("weekly_attendance")
+        left, right = st.columns([1, 2])
+        left.metric("Risk score", f"{detail['Risk_Score']:.0%}", detail["Risk_Level"])
+        left.json({k: v for k, v in detail.items() if k not in ("Risk_Score", "Risk_Level")})
+        if len(weekly):
+            right.line_chart(weekly.rename("Attendance by week"))
+
+    sidebar(data, started)
+
+
+main()
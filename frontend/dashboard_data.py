@@ -0,0 +1,177 @@
+"""
+Server-side data layer for the Streamlit dashboard (frontend/app.py).
+
+    data = DashboardData.load()                       # scores every stored student once
+    data.institute_summary()                          # one row per institute
+    data.mentor_summary(institute_id, page=0)         # one page of mentors
+    data.student_page(institute_id, mentor_id, page=0, level="High")
+    data.student_detail(student_id)
+
+load() pages through the feature store (FeatureStore.iter_chunks), scores
+each chunk with the cached model bundle (inference.score_rows) and keeps only
+the columns the dashboard shows. Summaries (student counts, mean Risk_Score
+and a Risk_Level histogram) per institute and per mentor are computed once
+at load, and the row positions of every mentor's students are grouped and
+sorted by Risk_Score up front, so a page request is a slice of precomputed
+arrays: it costs the same whatever the size of the institute, and only the
+rows of that page ever reach the browser.
+
+No Streamlit import here, so the same object can be used (and tested) from
+plain Python. `version` changes whenever the feature store or the model
+bundle does, and is what the app keys its caches on; data_version() reads
+it without loading anything (one small SQLite query and the bundle's
+.version file), so the app can check it on every rerun.
+"""
+import math
+import os
+import sqlite3
+import sys
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+# The model code lives in ml/code (flat modules, imported by name)
+ML_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml", "code")
+if ML_CODE_DIR not in sys.path:
+    sys.path.insert(0, ML_CODE_DIR)
+
+from compiled_model import RISK_LEVELS  # noqa: E402
+from paths import FEATURE_STORE_PATH  # noqa: E402
+
+ID_COLUMNS = ["institute_id", "mentor_id", "student_id", "parent_id"]
+NAME_COLUMNS = ["student_name", "mentor_name", "parent_name"]
+SHOWN_COLUMNS = ["Average_Attendance", "Attendance_Decline_Score", "Risk_Score", "Risk_Level"]
+DEFAULT_PAGE_SIZE = 25
+
+
+# ========== Summaries ==========
+def summarize(df, keys):
+    """
+    Student count, mean Risk_Score and Risk_Level histogram per group of keys.
+
+    Returns:
+        DataFrame with keys, students, mean_risk, Low, Medium, High (sorted by mean_risk desc)
+    """
+    grouped = df.groupby(keys, sort=False)
+    out = grouped["Risk_Score"].agg(students="size", mean_risk="mean")
+    levels = pd.crosstab([df[k] for k in keys], df["Risk_Level"])
+    out = out.join(levels.reindex(columns=list(RISK_LEVELS), fill_value=0)).fillna(0)
+    out[list(RISK_LEVELS)] = out[list(RISK_LEVELS)].astype(np.int64)
+    return out.sort_values("mean_risk", ascending=False, kind="stable").reset_index()
+
+def data_version(store_path=FEATURE_STORE_PATH, model_type="logistic"):
+    """Version load() would return now: last feature store sync and model bundle version."""
+    from feature_store import FEATURE_SET_VERSION
+    from model_bundle import bundle_path_for, read_version
+
+    updated_at = 0.0
+    try:
+        with closing(sqlite3.connect(f"file:{os.path.abspath(store_path)}?mode=ro", uri=True)) as conn:
+            row = conn.execute("SELECT updated_at FROM feature_sets WHERE version = ?",
+                               (FEATURE_SET_VERSION,)).fetchone()
+        updated_at = row[0] if row else 0.0
+    except sqlite3.Error:
+        pass    # no store yet
+    return f"{updated_at:.6f}-{read_version(bundle_path_for(model_type))}"
+
+def page_of(df, page, page_size):
+    """Rows of one page (clamped to the last page) and the number of pages."""
+    pages = max(1, math.ceil(len(df) / page_size))
+    page = min(max(int(page), 0), pages - 1)
+    return df.iloc[page * page_size:(page + 1) * page_size], pages
+
+
+class DashboardData:
+    def __init__(self, students, version="local"):
+        """
+        Args:
+            students: One scored row per student (ID_COLUMNS, Risk_Score, Risk_Level, ...)
+            version: Identifies the data and model the rows were scored with
+        """
+        self.version = version
+        # Highest risk first everywhere: sorting once here makes every page slice already ordered
+        self.students = students.sort_values("Risk_Score", ascending=False, kind="stable") \
+                                .reset_index(drop=True)
+        self.institutes = summarize(self.students, ["institute_id"])
+        mentors = summarize(self.students, ["institute_id", "mentor_id"])
+        if "mentor_name" in self.students:
+            names = self.students.drop_duplicates("mentor_id").set_index("mentor_id")["mentor_name"]
+            mentors.insert(2, "mentor_name", mentors["mentor_id"].map(names))
+        self.mentors = mentors
+        self._mentors = {key: frame.reset_index(drop=True)
+                         for key, frame in mentors.groupby("institute_id", sort=False)}
+        # Positions into self.students per mentor, still in Risk_Score order
+        self._mentor_rows = self.students.groupby(["institute_id", "mentor_id"], sort=False).indices
+        self._student_rows = pd.Index(self.students["student_id"])
+        self._levels = self.students["Risk_Level"].to_numpy()
+
+    @classmethod
+    def load(cls, store_path=FEATURE_STORE_PATH, model_type="logistic", chunk_size=5000):
+        """
+        Score every student in the feature store and build the dashboard's tables.
+
+        Raises:
+            FileNotFoundError: No model has been trained for model_type
+        """
+        from feature_store import FeatureStore
+        from inference import score_rows
+        from model_bundle import bundle_path_for, refresh_bundle
+
+        # Read first: if the store or the model changes during the load, the next check reloads
+        version = data_version(store_path, model_type)
+        refresh_bundle(bundle_path_for(model_type))   # a bundle retrained by another process
+        parts = []
+        with FeatureStore(store_path) as store:
+            week_columns = [c for c in (store.columns or []) if c.startswith("Week_")]
+            keep = [c for c in ID_COLUMNS + NAME_COLUMNS + SHOWN_COLUMNS[:2] + week_columns
+                    if c in (store.columns or [])]
+            for chunk in store.iter_chunks(chunk_size):
+                _, risk_scores, risk_levels = score_rows(chunk, model_type)
+                chunk = chunk[keep].copy()
+                chunk["Risk_Score"] = risk_scores
+                chunk["Risk_Level"] = risk_levels
+                parts.append(chunk)
+        if not parts:
+            return cls(pd.DataFrame(columns=ID_COLUMNS + SHOWN_COLUMNS), version=version)
+        return cls(pd.concat(parts, ignore_index=True), version=version)
+
+    # ========== Pages ==========
+    def institute_summary(self):
+        return self.institutes
+
+    def mentor_summary(self, institute_id, page=0, page_size=DEFAULT_PAGE_SIZE):
+        """One page of an institute's mentors (highest mean risk first) and the page count."""
+        mentors = self._mentors.get(institute_id, self.mentors.iloc[:0])
+        return page_of(mentors, page, page_size)
+
+    def student_page(self, institute_id, mentor_id, page=0, page_size=DEFAULT_PAGE_SIZE, level=None):
+        """
+        One page of a mentor's students, highest Risk_Score first.
+
+        Args:
+            level: Only students at this Risk_Level (None for all)
+
+        Returns:
+            (rows of the page, number of pages)
+        """
+        rows = self._mentor_rows.get((institute_id, mentor_id), np.empty(0, dtype=np.intp))
+        if level is not None:
+            rows = rows[self._levels[rows] == level]
+        pages = max(1, math.ceil(len(rows) / page_size))
+        page = min(max(int(page), 0), pages - 1)
+        columns = [c for c in ["student_id"] + NAME_COLUMNS[:1] + ["parent_id"] + SHOWN_COLUMNS
+                   if c in self.students]
+        return self.students.iloc[rows[page * page_size:(page + 1) * page_size]][columns], pages
+
+    def student_detail(self, student_id):
+        """A student's scored row as a dict plus its weekly attendance (None if unknown)."""
+        position = self._student_rows.get_indexer([student_id])[0]
+        if position < 0:
+            return None
+        row = self.students.iloc[position]
+        weeks = [c for c in self.students.columns if c.startswith("Week_")]
+        detail = {k: v.item() if isinstance(v, np.generic) else v for k, v in row.drop(weeks).items()}
+        detail["weekly_attendance"] = pd.Series(row[weeks].to_numpy(dtype=float),
+                                                index=[c.split("_")[1] for c in weeks])
+        return detail
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_data import DashboardData
+
+
+@pytest.fixture
+def data():
+    scores = [0.9, 0.2, 0.8, 0.5, 0.1, 0.75]
+    return DashboardData(pd.DataFrame({
+        "institute_id": [1, 1, 1, 1, 2, 2],
+        "mentor_id": [10, 10, 10, 11, 20, 20],
+        "student_id": [101, 102, 103, 104, 201, 202],
+        "parent_id": [301, 302, 303, 304, 401, 402],
+        "Week_1_Attendance": [0.9, 0.8, 0.7, 0.6, 0.5, 0.4],
+        "Week_2_Attendance": [0.5, 0.8, 0.6, 0.6, 0.5, 0.3],
+        "Risk_Score": scores,
+        "Risk_Level": np.where(np.array(scores) > 0.7, "High", np.where(np.array(scores) > 0.3, "Medium", "Low")),
+    }), version="test")
+
+def test_summaries_count_students_and_levels(data):
+    institutes = data.institute_summary().set_index("institute_id")
+    assert institutes.loc[1, ["students", "Low", "Medium", "High"]].tolist() == [4, 1, 1, 2]
+    assert institutes.loc[2, "mean_risk"] == pytest.approx(0.425)
+    mentors, pages = data.mentor_summary(1)
+    assert mentors["mentor_id"].tolist() == [10, 11] and pages == 1
+
+def test_student_pages_are_sorted_filtered_and_clamped(data):
+    rows, pages = data.student_page(1, 10, page=0, page_size=2)
+    assert rows["student_id"].tolist() == [101, 103] and pages == 2
+    assert data.student_page(1, 10, page=9, page_size=2)[0]["student_id"].tolist() == [102]
+    assert data.student_page(1, 10, level="High")[0]["student_id"].tolist() == [101, 103]
+    assert data.student_page(3, 99)[0].empty
+
+def test_student_detail(data):
+    detail = data.student_detail(103)
+    assert detail["Risk_Level"] == "High" and detail["weekly_attendance"].tolist() == [0.7, 0.6]
+    assert data.student_detail(999) is None
+
+def test_data_version_follows_store_syncs(tmp_path):
+    from feature_store import FeatureStore
+    from dashboard_data import data_version
+
+    path = str(tmp_path / "features.db")
+    assert data_version(path).startswith("0.000000-")       # no store yet
+    rows = pd.DataFrame({"student_id": [1, 2], "institute_id": [1, 1], "x": [0.5, 0.25]})
+    with FeatureStore(path) as store:
+        store.sync(rows)
+    first = data_version(path)
+    assert data_version(path) == first
+    with FeatureStore(path) as store:
+        store.sync(rows.assign(x=[0.5, 0.75]))
+    assert data_version(path) != first
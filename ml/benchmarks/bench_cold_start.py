@@ -0,0 +1,49 @@
+"""
+Benchmark: cold-start cost of the scoring entry points.
+
+Each statement runs in a fresh interpreter (so nothing is already imported)
+and the median wall time over several runs is reported.
+
+    python benchmarks/bench_cold_start.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code")
+
+CASES = {
+    "python (baseline)": "pass",
+    "from inference import predict_risk": "from inference import predict_risk",
+    "from try1 import predict_risk": "from try1 import predict_risk",
+    "inference + first predict_risk": (
+        "import warnings; warnings.filterwarnings('ignore')\n"
+        "import pandas as pd\n"
+        "from inference import predict_risk\n"
+        "row = {'student_id': [1], 'student_name': ['A'], 'test_score': [80.0], 'max_score': [100.0],"
+        " 'avg_score_ratio': [0.8], **{f'Week_{i}_Attendance': [90] for i in range(1, 13)},"
+        " 'Attendance_Decline_Score': [1.0], 'Average_Attendance': [90.0],"
+        " 'Lowest_Week_Attendance': [90], 'Highest_Week_Attendance': [90],"
+        " 'mentor_name': ['M'], 'parent_name': ['P']}\n"
+        "predict_risk(pd.DataFrame(row))"
+    ),
+}
+
+
+def time_statement(statement, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=os.path.dirname(CODE_DIR),
+                       env={**os.environ, "PYTHONPATH": CODE_DIR},
+                       check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, statement in CASES.items():
+        print(f"{name:40s} {time_statement(statement, runs) * 1000:8.1f} ms")
@@ -0,0 +1,104 @@
+"""
+Benchmark: loading parent contacts and resolving alert recipients.
+
+Writes one institute of synthetic parent contacts (--parents rows, default
+100000) plus an alerts file, then times:
+
+    load (iterrows)        the previous load_parents: iterrows + pick() per row
+    lookup (column scan)   the previous send loop: parents[parents.parent_id == pid] per alert
+    load (vectorized)      ContactDirectory.from_files
+    load (cached)          ContactDirectory.load with its array cache (cache_dir) warm
+    lookup (hashed)        ContactDirectory.positions for all alerts at once
+
+The old column scan is timed on --scan-sample alerts and scaled up, since a
+full run is O(alerts x parents).
+
+    python benchmarks/bench_contacts.py --parents 100000 --alerts 20000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+sys.path.insert(0, os.path.join(REPO_DIR, "notifications"))
+
+import numpy as np
+import pandas as pd
+
+from notifier import ContactDirectory
+from synthetic_data import institute_tables
+
+
+def legacy_load_parents(parent_files):
+    """load_parents as it was before ContactDirectory."""
+    dfs = []
+    for path in parent_files:
+        df = pd.read_csv(path)
+        cols = {c.lower(): c for c in df.columns}
+        def pick(name_variants, row):
+            for v in name_variants:
+                if v in cols:
+                    return row[cols[v]]
+            return None
+        out = []
+        for _, row in df.iterrows():
+            out.append({"parent_id": pick(["parent_id", "parentid"], row),
+                        "parent_name": pick(["parent_name", "parentname"], row),
+                        "parent_email": pick(["parent_email", "email"], row),
+                        "parent_phone": pick(["parent_phone", "phone"], row)})
+        dfs.append(pd.DataFrame(out))
+    return pd.concat(dfs, ignore_index=True).drop_duplicates(subset=["parent_id"])
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time contact loading and recipient lookup.")
+    parser.add_argument("--parents", type=int, default=100_000)
+    parser.add_argument("--alerts", type=int, default=20_000)
+    parser.add_argument("--scan-sample", type=int, default=500, help="alerts timed with the old column scan")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_contacts_")
+    try:
+        contacts = institute_tables(1, students=args.parents, weeks=1, contacts=True)["Parent_Contacts"]
+        path = os.path.join(work, "Parent_Contacts_Institute1.csv")
+        contacts.to_csv(path, index=False)
+        rng = np.random.default_rng(0)
+        alert_ids = rng.choice(contacts["parent_id"].to_numpy(), size=args.alerts)
+
+        print(f"{args.parents} parents, {args.alerts} alerts\n")
+        rows = []
+        legacy, seconds = timed(lambda: legacy_load_parents([path]))
+        rows.append(("load (iterrows)", seconds))
+        sample = alert_ids[:args.scan_sample]
+        _, seconds = timed(lambda: [legacy[legacy["parent_id"] == pid].iloc[0]["parent_email"] for pid in sample])
+        rows.append(("lookup (column scan)", seconds * args.alerts / len(sample)))
+
+        _, seconds = timed(lambda: ContactDirectory.from_files([path], "parent"))
+        rows.append(("load (vectorized)", seconds))
+        cache_dir = os.path.join(work, "cache")
+        ContactDirectory.load([path], "parent", cache_dir=cache_dir)
+        directory, seconds = timed(lambda: ContactDirectory.load([path], "parent", cache_dir=cache_dir))
+        rows.append(("load (cached)", seconds))
+        positions, seconds = timed(lambda: directory.positions(alert_ids))
+        rows.append(("lookup (hashed)", seconds))
+
+        emails = directory.frame["parent_email"].to_numpy()[positions]
+        expected = legacy.set_index("parent_id").loc[sample, "parent_email"].to_numpy()
+        assert (emails[:len(sample)] == expected).all(), "directory and legacy lookups disagree"
+
+        for name, seconds in rows:
+            print(f"{name:<22s} {seconds:10.4f}s")
+        before = rows[0][1] + rows[1][1]
+        after = rows[3][1] + rows[4][1]
+        print(f"\n✅ load + lookup: {before:.2f}s -> {after:.4f}s ({before / after:.0f}x)")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
@@ -0,0 +1,92 @@
+"""
+Benchmark: index-backed join_features() vs the old DataFrame.merge chain.
+
+Tables are scaled up by stacking copies of the real data with shifted IDs,
+then both join stages are timed and their peak traced memory recorded next
+to the size of the output frame's column buffers, which is what both peaks
+are made of (some output columns reuse the input arrays, so it can exceed them).
+
+    python benchmarks/bench_join.py            # 1x, 10x, 100x
+    python benchmarks/bench_join.py 1 10       # custom scales
+"""
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+from data_loader import load_data
+from feature_join import join_features
+
+warnings.filterwarnings("ignore")
+
+
+# ========== Old join stage (merge chain from prepare_dataset before the index join) ==========
+def merge_chain(students, score_summary, attendance, mentors, parents):
+    df = students.merge(score_summary, on="student_id", how="left")
+    attendance_clean = attendance.drop(columns=['student_id', 'mentor_id', 'parent_id'], errors='ignore')
+    df = pd.concat([df.reset_index(drop=True), attendance_clean.reset_index(drop=True)], axis=1)
+    mentors_clean = mentors.copy()
+    mentors_clean = mentors_clean.rename(columns={"mentor_id": "mentor_id_m"})
+    df = df.merge(mentors_clean, left_on="mentor_id", right_on="mentor_id_m", how="left")
+    df = df.drop(columns=["mentor_id_m"])
+    parents = parents.rename(columns={"parent_id": "parent_id_p"})
+    df = df.merge(parents, left_on=["student_id", "parent_id"],
+                  right_on=["student_id", "parent_id_p"], how="left")
+    df = df.drop(columns=["parent_id_p"])
+    if 'institute_id_x' in df.columns:
+        df = df.drop(columns=['institute_id_x', 'institute_id_y'])
+    return df
+
+
+# ========== Scaled Inputs ==========
+def scale_tables(factor):
+    scores, students, parents, mentors, attendance = load_data()
+    score_summary = scores.groupby("student_id").agg(
+        {"test_score": "mean", "max_score": "mean"}).reset_index()
+    score_summary["avg_score_ratio"] = score_summary["test_score"] / score_summary["max_score"]
+
+    # Shift every ID by a per-copy offset so copies never collide
+    offset = 10 ** 6
+    id_cols = ["student_id", "mentor_id", "parent_id"]
+
+    def stack(df):
+        copies = []
+        for k in range(factor):
+            copy = df.copy()
+            for c in id_cols:
+                if c in copy.columns:
+                    copy[c] = copy[c].astype("int64") + k * offset
+            copies.append(copy)
+        return pd.concat(copies, ignore_index=True)
+
+    return (stack(students), stack(score_summary), stack(attendance),
+            stack(mentors), stack(parents))
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    factors = [int(a) for a in sys.argv[1:]] or [1, 10, 100]
+    print(f"{'scale':>6s} {'students':>9s} {'merge s':>8s} {'index s':>8s} {'merge MB':>9s} {'index MB':>9s} "
+          f"{'output MB':>10s}")
+    for factor in factors:
+        tables = scale_tables(factor)
+        old, old_t, old_peak = measure(merge_chain, *tables)
+        new, new_t, new_peak = measure(join_features, *tables)
+        pd.testing.assert_frame_equal(old, new, check_dtype=False)
+        print(f"{factor:>5d}x {len(new):>9d} {old_t:8.3f} {new_t:8.3f} "
+              f"{old_peak / 1e6:9.1f} {new_peak / 1e6:9.1f} {new.memory_usage(index=False).sum() / 1e6:10.1f}")
+        del tables, old, new
@@ -0,0 +1,199 @@
+"""
+Benchmark: the whole pipeline on synthetic data, results saved as JSON.
+
+Generates institutes x students x weeks of synthetic data in a temporary
+directory (synthetic_data.py), then times each stage there. Nothing in
+ml/data or ml/models is touched.
+
+    load_data (csv)         parse every CSV shard
+    load_data (cache cold)  first read through the columnar cache (builds it)
+    load_data (cache warm)  read through the built cache
+    prepare_dataset         build_features + fit_encoders + encode_features
+    train_model             both models, headless, bundle written to the temp dir
+    predict_risk (1 row)    one raw student row, model already loaded (per call)
+    predict_risk (bulk)     every student in one call
+    load_mentors            notifier contact loading
+    send_to_mentors         one digest per mentor through the sms_stub channel
+    send_to_mentors (per alert)  digest=False: one message per alert row
+
+    python benchmarks/bench_pipeline.py                                # 2 x 2000 x 12
+    python benchmarks/bench_pipeline.py --institutes 8 --students 10000 --weeks 16 --repeat 3
+    python benchmarks/bench_pipeline.py --compare results/pipeline_2x2000x12_<time>.json
+
+Each stage records every run and the median; results land in
+benchmarks/results/pipeline_<I>x<S>x<W>_<time>.json (or --output).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_DIR = os.path.dirname(BENCH_DIR)
+REPO_DIR = os.path.dirname(ML_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+sys.path.insert(0, os.path.join(ML_DIR, "code"))
+sys.path.insert(0, os.path.join(REPO_DIR, "notifications"))
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import data_loader
+import model_bundle
+import notifier
+import try1
+from batch_scoring import alert_rows
+from inference import predict_risk
+from synthetic_data import generate
+
+warnings.filterwarnings("ignore")
+
+
+def timed(fn, repeat=1):
+    """(last result, list of wall times in seconds) over `repeat` calls."""
+    runs, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+def record(results, name, runs, rows, per_call=1):
+    runs = [r / per_call for r in runs]
+    results[name] = {"seconds": statistics.median(runs), "runs": runs, "rows": rows}
+    print(f"{name:<28s} {statistics.median(runs):10.4f}s  ({rows} rows)")
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ========== Stages ==========
+def run(institutes=2, students=2000, weeks=12, repeat=3, single_calls=200):
+    work = tempfile.mkdtemp(prefix="bench_pipeline_")
+    data_dir = os.path.join(work, "data")
+    models_dir = os.path.join(work, "models")
+    os.makedirs(models_dir)
+    results = {}
+    saved_types = dict(model_bundle.MODEL_TYPES)
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    try:
+        generated = generate(data_dir, institutes, students, weeks, contacts=True)
+        print(f"Generated {generated} in {data_dir}")
+
+        tables, runs = timed(lambda: data_loader.load_data(data_dir, use_cache=False), repeat)
+        record(results, "load_data (csv)", runs, generated["Weekly_Scores"])
+        _, runs = timed(lambda: data_loader.load_data(data_dir, use_cache=True))
+        record(results, "load_data (cache cold)", runs, generated["Weekly_Scores"])
+        tables, runs = timed(lambda: data_loader.load_data(data_dir, use_cache=True), repeat)
+        record(results, "load_data (cache warm)", runs, generated["Weekly_Scores"])
+
+        def prepare():
+            raw = try1.build_features(*tables)
+            encoders = try1.fit_encoders(raw)
+            return raw, encoders, try1.encode_features(raw, encoders)
+        (raw, encoders, df), runs = timed(prepare, repeat)
+        record(results, "prepare_dataset", runs, len(df))
+
+        with quiet:
+            _, runs = timed(lambda: try1.train_model(df, encoders=encoders, models_dir=models_dir), repeat)
+        record(results, "train_model", runs, len(df))
+
+        # Scoring reads the bundle just trained in the temp dir
+        bundle_path = os.path.join(models_dir, os.path.basename(model_bundle.BUNDLE_PATH))
+        model_bundle.MODEL_TYPES.update(logistic=bundle_path, tree=bundle_path)
+        model_bundle.clear_cache()
+        one = raw.iloc[[0]]
+        predict_risk(one)
+        _, runs = timed(lambda: [predict_risk(one) for _ in range(single_calls)], repeat)
+        record(results, "predict_risk (1 row)", runs, 1, per_call=single_calls)
+        scored, runs = timed(lambda: predict_risk(raw), repeat)
+        record(results, "predict_risk (bulk)", runs, len(raw))
+
+        alerts = alert_rows(raw, scored["Risk_Score"].to_numpy(), scored["Risk_Level"].to_numpy())
+        alerts_csv = os.path.join(work, "alerts.csv")
+        alerts.to_csv(alerts_csv, index=False)
+        mentor_files = [os.path.join(data_dir, f"Mentor_Contacts_Institute{i}.csv")
+                        for i in range(1, institutes + 1)]
+
+        mentors, runs = timed(lambda: notifier.load_mentors(mentor_files), repeat)
+        record(results, "load_mentors", runs, len(mentors))
+        # sms_stub only prints the message; output is swallowed so the console is not timed
+        sms_key, notifier.SMS_API_KEY = notifier.SMS_API_KEY, "benchmark"
+        try:
+            for name, digest in [("send_to_mentors", True), ("send_to_mentors (per alert)", False)]:
+                with quiet:
+                    (sent, failed), runs = timed(lambda: notifier.send_to_mentors(
+                        alerts_csv, mentor_files, channel="sms_stub", digest=digest), repeat)
+                record(results, name, runs, len(sent) + len(failed))
+                if failed:
+                    print(f"⚠️ {len(failed)} stub sends failed")
+        finally:
+            notifier.SMS_API_KEY = sms_key
+    finally:
+        model_bundle.MODEL_TYPES.clear()
+        model_bundle.MODEL_TYPES.update(saved_types)
+        model_bundle.clear_cache()
+        shutil.rmtree(work, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "scale": {"institutes": institutes, "students_per_institute": students, "weeks": weeks},
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "cpu_count": os.cpu_count(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+def compare(old, new):
+    """Print stage medians of two result files side by side."""
+    print(f"\n{'stage':<28s} {'before s':>10s} {'after s':>10s} {'speedup':>8s}")
+    for name, after in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        speedup = before["seconds"] / after["seconds"] if after["seconds"] else float("inf")
+        print(f"{name:<28s} {before['seconds']:10.4f} {after['seconds']:10.4f} {speedup:7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the pipeline stages on synthetic data.")
+    parser.add_argument("--institutes", type=int, default=2)
+    parser.add_argument("--students", type=int, default=2000, help="students per institute")
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage (the median is reported)")
+    parser.add_argument("--output", default=None, help="JSON file to write (default: benchmarks/results/)")
+    parser.add_argument("--compare", metavar="JSON", default=None, help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    report = run(args.institutes, args.students, args.weeks, args.repeat)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"pipeline_{args.institutes}x{args.students}x{args.weeks}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
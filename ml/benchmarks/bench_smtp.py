@@ -0,0 +1,70 @@
+"""
+Benchmark: email delivery rate, one connection per message vs. the SMTP pool
+and the concurrent dispatcher.
+
+Runs notifications/smtp_sink.py on a free local port and sends the same
+messages three ways:
+
+    per-message   connect + EHLO + AUTH + send + QUIT for every message
+                  (what send_email did before the pool; a pool with max_per_session=1)
+    pooled        SMTPPool sessions reused for up to --per-session messages
+    dispatched    the pool behind a Dispatcher sending on --workers sessions at once
+                  (no rate limit, so the sink latency is the only bound)
+
+--latency-ms delays every server reply to stand in for the round trip to a
+real provider; with 0 the handshake is nearly free and the gap mostly shows
+the per-connection CPU cost. No STARTTLS (the sink does not offer it), so
+the real-world gap is larger than measured here.
+
+    python benchmarks/bench_smtp.py --messages 500 --latency-ms 5
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+sys.path.insert(0, os.path.join(REPO_DIR, "notifications"))
+
+from notifier import ChannelLimit, Dispatcher, SMTPPool, build_email
+from smtp_sink import SMTPSink
+
+
+def rate(port, messages, size, per_session, workers=0):
+    pool = SMTPPool("127.0.0.1", port, user="desk@example.org", password="x", size=size,
+                    starttls=False, max_per_session=per_session, timeout=10)
+    start = time.perf_counter()
+    if workers:
+        with Dispatcher({"email": ChannelLimit(concurrency=workers)}, smtp_pool=pool) as dispatcher:
+            _, failed = dispatcher.collect([
+                dispatcher.submit("email", i, f"mentor{i}@example.org", f"Digest body {i}\n" * 8,
+                                  subject="At-risk students: weekly digest") for i in range(messages)])
+        failed = len(failed)
+    else:
+        emails = [build_email(f"mentor{i}@example.org", "At-risk students: weekly digest",
+                              f"Digest body {i}\n" * 8) for i in range(messages)]
+        failed = sum(not pool.send(msg)[0] for msg in emails)
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return messages / elapsed, pool.connections_opened, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-message SMTP connections with the pool.")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=2, help="delay before every sink reply")
+    parser.add_argument("--per-session", type=int, default=100, help="pool: messages per session")
+    parser.add_argument("--workers", type=int, default=4, help="dispatched: sessions sending at once")
+    args = parser.parse_args()
+
+    with SMTPSink(latency_ms=args.latency_ms) as sink:
+        print(f"{args.messages} messages, {args.latency_ms} ms per reply\n")
+        print(f"{'mode':<14s} {'msgs/s':>9s} {'connections':>12s} {'failed':>7s} {'speedup':>6s}")
+        before = None
+        modes = [("per-message", 1, 1, 0), ("pooled", 1, args.per_session, 0),
+                 ("dispatched", args.workers, args.per_session, args.workers)]
+        for mode, size, per_session, workers in modes:
+            msgs_per_s, connections, failed = rate(sink.port, args.messages, size, per_session, workers)
+            before = before or msgs_per_s
+            print(f"{mode:<14s} {msgs_per_s:9.1f} {connections:12d} {failed:7d}  {msgs_per_s / before:5.1f}x")
@@ -0,0 +1,157 @@
+"""
+Synthetic data in the ml/data/ schemas, at any institute x student x week scale.
+
+Writes the same five CSVs per institute as the real data:
+
+    Students_InstituteN.csv                student_id, student_name, mentor_id, parent_id, institute_id
+    Parents_InstituteN.csv                 parent_id, parent_name, student_id, institute_id
+    Mentors_InstituteN.csv                 mentor_id, mentor_name, institute_id
+    Attendance_Wide_Format_InstituteN.csv  student_id, mentor_id, parent_id, Week_1..W_Attendance,
+                                           Attendance_Decline_Score, Is_Declining_Attendance,
+                                           Average_Attendance, Lowest/Highest_Week_Attendance
+    Weekly_Scores_InstituteN.csv           score_id, student_id, subject_name, week_id,
+                                           test_score, max_score, institute_id
+
+IDs follow the real layout (institute i: students i*S+k, mentors 2i*S+k,
+parents (2i+1)*S+k, with S = 100000 or the next power of ten that fits the
+students). The decline score is mean(first 3 weeks) - mean(last 3 weeks),
+and students with a score of 15 or more are labelled as declining, like
+the real data. With contacts=True, Mentor_Contacts_InstituteN.csv and
+Parent_Contacts_InstituteN.csv are written too, with the id, name, email and
+phone columns notifications/notifier.py reads (data_loader ignores them).
+
+    python benchmarks/synthetic_data.py OUT_DIR --institutes 4 --students 5000 --weeks 16
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = np.array(["Aarav", "Advik", "Aidan", "Ananya", "Anjali", "Anuj", "Asha", "Divya", "Ishaan",
+                        "Kabir", "Kavita", "Kiara", "Lakshmi", "Meera", "Neha", "Prachi", "Radha", "Rahul",
+                        "Ravi", "Riya", "Rohan", "Shreya", "Sunita", "Tanvi", "Vikram", "Zoya"])
+LAST_NAMES = np.array(["Ali", "Arora", "Bansal", "Chowdhury", "Dutta", "Goel", "Hussain", "Iyer", "Khan",
+                       "Malhotra", "Mehta", "Mittal", "Patel", "Pillai", "Roy", "Sastry", "Sharma", "Verma"])
+SUBJECTS = np.array(["English", "Chemistry", "Biology", "Hindi", "Physics", "History",
+                     "Mathematics", "Computer Science"])
+
+
+def _names(rng, n):
+    first = FIRST_NAMES[rng.integers(len(FIRST_NAMES), size=n)]
+    last = LAST_NAMES[rng.integers(len(LAST_NAMES), size=n)]
+    return np.char.add(np.char.add(first.astype(str), " "), last.astype(str))
+
+def id_span(students):
+    """ID block per institute: 100000, or the next power of ten above the student count."""
+    return max(10 ** 5, 10 ** len(str(students)))
+
+def institute_tables(institute, students=2000, weeks=12, mentors=25, subjects_per_week=3,
+                     decline_rate=0.11, contacts=False, seed=42):
+    """
+    The five tables of one institute.
+
+    Returns:
+        dict: table name (as in data_loader.TABLES, plus the contact tables) -> DataFrame
+    """
+    rng = np.random.default_rng([seed, institute])
+    span = id_span(students)
+    k = np.arange(1, students + 1)
+    student_ids = institute * span + k
+    mentor_ids = 2 * institute * span + np.arange(1, mentors + 1)
+    parent_ids = (2 * institute + 1) * span + k
+    student_mentor = mentor_ids[(k - 1) % mentors]
+
+    students_df = pd.DataFrame({
+        "student_id": student_ids, "student_name": _names(rng, students),
+        "mentor_id": student_mentor, "parent_id": parent_ids, "institute_id": institute,
+    })
+    mentors_df = pd.DataFrame({"mentor_id": mentor_ids, "mentor_name": _names(rng, mentors),
+                               "institute_id": institute})
+    parents_df = pd.DataFrame({"parent_id": parent_ids, "parent_name": _names(rng, students),
+                               "student_id": student_ids, "institute_id": institute})
+
+    # Attendance: a per-student baseline, a linear drop for decliners, weekly noise
+    baseline = rng.normal(82, 8, size=students)
+    drop = np.where(rng.random(students) < decline_rate, rng.uniform(20, 40, size=students), 0.0)
+    progress = np.linspace(0, 1, weeks)
+    attendance = baseline[:, None] - drop[:, None] * progress + rng.normal(0, 6, size=(students, weeks))
+    attendance = np.clip(np.rint(attendance), 30, 100).astype(int)
+    head = min(3, weeks)
+    decline = np.round(attendance[:, :head].mean(axis=1) - attendance[:, -head:].mean(axis=1), 2)
+
+    attendance_df = pd.DataFrame({"student_id": student_ids, "mentor_id": student_mentor,
+                                  "parent_id": parent_ids})
+    for w in range(weeks):
+        attendance_df[f"Week_{w + 1}_Attendance"] = attendance[:, w]
+    attendance_df["Attendance_Decline_Score"] = decline
+    attendance_df["Is_Declining_Attendance"] = np.where(decline >= 15, "Yes", "No")
+    attendance_df["Average_Attendance"] = np.round(attendance.mean(axis=1), 2)
+    attendance_df["Lowest_Week_Attendance"] = attendance.min(axis=1)
+    attendance_df["Highest_Week_Attendance"] = attendance.max(axis=1)
+
+    # Weekly scores: subjects_per_week random subjects per student per week, ordered week -> student
+    n = weeks * students * subjects_per_week
+    subject_idx = np.argsort(rng.random((weeks * students, len(SUBJECTS))), axis=1)[:, :subjects_per_week]
+    ability = np.repeat(np.tile(rng.normal(77, 8, size=students), weeks), subjects_per_week)
+    scores_df = pd.DataFrame({
+        "score_id": np.arange(1, n + 1),
+        "student_id": np.repeat(np.tile(student_ids, weeks), subjects_per_week),
+        "subject_name": SUBJECTS[subject_idx.ravel()],
+        "week_id": np.repeat(np.arange(1, weeks + 1), students * subjects_per_week),
+        "test_score": np.clip(np.rint(ability + rng.normal(0, 10, size=n)), 0, 100).astype(int),
+        "max_score": 100,
+        "institute_id": institute,
+    })
+
+    tables = {
+        "Weekly_Scores": scores_df,
+        "Students": students_df,
+        "Parents": parents_df,
+        "Mentors": mentors_df,
+        "Attendance_Wide_Format": attendance_df,
+    }
+    if contacts:
+        # Separate files: extra columns in Mentors/Parents would become model features
+        tables["Mentor_Contacts"] = pd.DataFrame({
+            "mentor_id": mentor_ids, "mentor_name": mentors_df["mentor_name"],
+            "mentor_email": [f"mentor{m}@example.org" for m in mentor_ids],
+            "mentor_phone": [f"+91{m:010d}" for m in mentor_ids]})
+        tables["Parent_Contacts"] = pd.DataFrame({
+            "parent_id": parent_ids, "parent_name": parents_df["parent_name"],
+            "parent_email": [f"parent{p}@example.org" for p in parent_ids],
+            "parent_phone": [f"+91{p:010d}" for p in parent_ids]})
+    return tables
+
+def generate(out_dir, institutes=2, students=2000, weeks=12, mentors=25, subjects_per_week=3,
+             decline_rate=0.11, contacts=False, seed=42):
+    """
+    Write <Table>_Institute<N>.csv for institutes 1..institutes into out_dir.
+
+    Returns:
+        dict: table name -> total rows written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rows = {}
+    for institute in range(1, institutes + 1):
+        tables = institute_tables(institute, students, weeks, mentors, subjects_per_week,
+                                  decline_rate, contacts, seed)
+        for table, df in tables.items():
+            df.to_csv(os.path.join(out_dir, f"{table}_Institute{institute}.csv"), index=False)
+            rows[table] = rows.get(table, 0) + len(df)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic institute CSVs in the ml/data schemas.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--institutes", type=int, default=2)
+    parser.add_argument("--students", type=int, default=2000, help="students per institute")
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--mentors", type=int, default=25, help="mentors per institute")
+    parser.add_argument("--contacts", action="store_true", help="also write mentor/parent contact files for the notifier")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    written = generate(args.out_dir, args.institutes, args.students, args.weeks, args.mentors,
+                       contacts=args.contacts, seed=args.seed)
+    print(f"✅ Wrote {args.institutes} institutes to {args.out_dir}: {written}")
@@ -0,0 +1,123 @@
+"""
+Vectorized attendance-trend features over any number of weeks.
+
+The wide attendance table is loaded into one students x weeks float array
+(Week_1_Attendance .. Week_N_Attendance, whatever N is) and every feature is
+computed for all students at once with NumPy. Missing weeks (NaN) are
+ignored rather than treated as zero attendance.
+
+Features (fixed width, independent of the number of weeks):
+    Attendance_Slope          least-squares slope, attendance points per week
+    Recent_Attendance_Mean    mean of the last `recent_weeks` weeks
+    Baseline_Attendance_Mean  mean of the weeks before that
+    Recent_Attendance_Drop    baseline minus recent (positive = declining)
+    Min_Rolling_Attendance    lowest `recent_weeks`-week rolling mean
+    Longest_Low_Streak        longest run of weeks below `low_threshold` (a missing week ends a run)
+"""
+import re
+
+import numpy as np
+
+WEEK_PATTERN = re.compile(r"^Week_(\d+)_Attendance$")
+
+TREND_COLUMNS = [
+    "Attendance_Slope",
+    "Recent_Attendance_Mean",
+    "Baseline_Attendance_Mean",
+    "Recent_Attendance_Drop",
+    "Min_Rolling_Attendance",
+    "Longest_Low_Streak",
+]
+
+
+def week_columns(df):
+    """Week_N_Attendance columns of df, ordered by N."""
+    weeks = [(int(m.group(1)), c) for c in df.columns if (m := WEEK_PATTERN.match(c))]
+    return [c for _, c in sorted(weeks)]
+
+def attendance_matrix(df):
+    """Students x weeks float32 array of the Week_N_Attendance columns (NaN where missing)."""
+    cols = week_columns(df)
+    if not cols:
+        return np.empty((len(df), 0), dtype=np.float32)
+    return df[cols].to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+# ========== Kernels ==========
+def _nanmean(values, axis=1):
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=axis)
+    sums = np.where(valid, values, 0).sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def slope(matrix):
+    """Per-row least-squares slope of attendance against week number."""
+    valid = ~np.isnan(matrix)
+    weeks = np.arange(matrix.shape[1], dtype=np.float64)
+    w = valid.astype(np.float64)
+    n = w.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = (w * weeks).sum(axis=1) / n
+        y_mean = np.where(valid, matrix, 0).sum(axis=1) / n
+        dx = (weeks[None, :] - x_mean[:, None]) * w
+        dy = np.where(valid, matrix - y_mean[:, None], 0)
+        return (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+def rolling_mean(matrix, window):
+    """Students x (weeks - window + 1) rolling means, via one cumulative sum."""
+    if matrix.shape[1] < window:
+        return np.empty((matrix.shape[0], 0), dtype=np.float64)
+    valid = ~np.isnan(matrix)
+    pad = np.zeros((matrix.shape[0], 1))
+    sums = np.concatenate([pad, np.cumsum(np.where(valid, matrix, 0), axis=1)], axis=1)
+    counts = np.concatenate([pad, np.cumsum(valid, axis=1)], axis=1)
+    win_sums = sums[:, window:] - sums[:, :-window]
+    win_counts = counts[:, window:] - counts[:, :-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(win_counts > 0, win_sums / win_counts, np.nan)
+
+def longest_streak(mask):
+    """Length of the longest run of True per row."""
+    if mask.shape[1] == 0:
+        return np.zeros(mask.shape[0], dtype=np.int64)
+    run = np.cumsum(mask, axis=1)
+    # Running total at the last False position, carried forward; subtracting it
+    # restarts the count after every False.
+    reset = np.maximum.accumulate(np.where(mask, 0, run), axis=1)
+    return (run - reset).max(axis=1)
+
+def trend_features(matrix, recent_weeks=3, low_threshold=60.0):
+    """
+    Compute every trend feature for all students.
+
+    Args:
+        matrix: Students x weeks attendance array (see attendance_matrix)
+        recent_weeks: Size of the "recent" window and of the rolling mean
+        low_threshold: Attendance below this counts towards the low streak
+
+    Returns:
+        dict: feature name -> 1D array, one value per student
+    """
+    recent_weeks = max(1, min(recent_weeks, matrix.shape[1]))
+    recent = _nanmean(matrix[:, -recent_weeks:])
+    baseline = _nanmean(matrix[:, :-recent_weeks]) if matrix.shape[1] > recent_weeks else recent
+    rolling = rolling_mean(matrix, recent_weeks)
+    if rolling.shape[1]:
+        min_rolling = np.where(np.isnan(rolling), np.inf, rolling).min(axis=1)
+        min_rolling[np.isinf(min_rolling)] = np.nan
+    else:
+        min_rolling = np.full(matrix.shape[0], np.nan)
+    return {
+        "Attendance_Slope": slope(matrix),
+        "Recent_Attendance_Mean": recent,
+        "Baseline_Attendance_Mean": baseline,
+        "Recent_Attendance_Drop": baseline - recent,
+        "Min_Rolling_Attendance": min_rolling,
+        "Longest_Low_Streak": longest_streak(matrix < low_threshold),
+    }
+
+def add_trend_features(df, recent_weeks=3, low_threshold=60.0):
+    """Return df with the TREND_COLUMNS appended (computed from its Week_N_Attendance columns)."""
+    features = trend_features(attendance_matrix(df), recent_weeks, low_threshold)
+    return df.assign(**features)
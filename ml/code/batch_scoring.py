@@ -0,0 +1,211 @@
+"""
+Chunked, sharded batch scoring that writes alerts.csv for notifications/notifier.py.
+
+    python code/batch_scoring.py                               # every institute
+    python code/batch_scoring.py --chunk-size 2000 --workers 4 --min-level High
+
+The population is partitioned by institute_id and each institute shard is
+scored in its own worker process. A worker pages through its shard in the
+feature store chunk_size students at a time (FeatureStore.iter_chunks),
+scores each chunk with the compiled model (inference.score_rows) and appends
+the chunk's alert rows to a per-shard part file straight away. The parent
+then streams the part files, in institute order, into alerts.csv and swaps
+it into place atomically. No process ever holds more than one chunk of
+students, so memory stays flat however many students there are.
+
+Every scored chunk is also folded into the risk rollup (risk_rollup.py:
+counts, mean Risk_Score and Risk_Level histogram per institute, mentor and
+week) unless rollup_path is None / --no-rollup is given.
+
+The message columns are rendered from the English email templates in
+notifications/templates/ (notifications/message_templates.py), the same
+text the notifier sends. alerts.csv columns (the first four are the ones the
+notifier reads; the names let it re-render per channel and language):
+    mentor_id, parent_id, message_mentor, message_parent,
+    student_id, institute_id, Risk_Score, Risk_Level,
+    student_name, mentor_name, parent_name
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from compiled_model import RISK_LEVELS
+from feature_store import FeatureStore
+from inference import score_rows
+from paths import ALERTS_PATH, FEATURE_STORE_PATH, NOTIFICATIONS_DIR, ROLLUP_PATH
+from risk_rollup import RiskRollup
+
+# Message text is kept once, as templates next to the notifier
+if NOTIFICATIONS_DIR not in sys.path:
+    sys.path.append(NOTIFICATIONS_DIR)
+from message_templates import render  # noqa: E402
+
+ALERT_COLUMNS = ["mentor_id", "parent_id", "message_mentor", "message_parent",
+                 "student_id", "institute_id", "Risk_Score", "Risk_Level",
+                 "student_name", "mentor_name", "parent_name"]
+DEFAULT_CHUNK_SIZE = 5000
+
+
+# ========== Alert Rows ==========
+def alert_rows(chunk, risk_scores, risk_levels, min_level="Medium"):
+    """
+    Alert rows for the students of one scored chunk at or above min_level.
+
+    Args:
+        chunk: Feature store rows (raw names, as returned by iter_chunks)
+        risk_scores: Probability of declining attendance per row
+        risk_levels: Risk_Level per row
+        min_level: Lowest Risk_Level that raises an alert ("Low", "Medium" or "High")
+
+    Returns:
+        DataFrame with ALERT_COLUMNS
+    """
+    keep = np.isin(risk_levels, RISK_LEVELS[list(RISK_LEVELS).index(min_level):])
+    rows = chunk.loc[keep, ["student_id", "student_name", "mentor_id", "parent_id",
+                            "mentor_name", "parent_name", "institute_id"]]
+    risk_scores = np.asarray(risk_scores)[keep]
+    risk_levels = np.asarray(risk_levels)[keep]
+
+    alerts = pd.DataFrame({
+        "mentor_id": rows["mentor_id"].to_numpy(),
+        "parent_id": rows["parent_id"].to_numpy(),
+        "message_mentor": None,
+        "message_parent": None,
+        "student_id": rows["student_id"].to_numpy(),
+        "institute_id": rows["institute_id"].to_numpy(),
+        "Risk_Score": risk_scores,
+        "Risk_Level": risk_levels,
+        "student_name": rows["student_name"].to_numpy(),
+        "mentor_name": rows["mentor_name"].to_numpy(),
+        "parent_name": rows["parent_name"].to_numpy(),
+    }, columns=ALERT_COLUMNS)
+    alerts["message_mentor"] = render(alerts, "mentor", "email")
+    alerts["message_parent"] = render(alerts, "parent", "email")
+    return alerts
+
+
+# ========== Worker Side ==========
+def score_shard(institute_id, part_path, chunk_size=DEFAULT_CHUNK_SIZE, model_type="logistic",
+                min_level="Medium", store_path=FEATURE_STORE_PATH, rollup_path=ROLLUP_PATH, week=None):
+    """
+    Score one institute chunk by chunk, appending its alert rows to part_path (no header)
+    and adding the chunk's scores to the rollup at rollup_path (None: no rollup), under
+    week if given, else each student's own latest week in the data.
+
+    Returns:
+        (institute_id, students scored, alerts written)
+    """
+    scored = alerts = 0
+    rollup = RiskRollup(rollup_path) if rollup_path is not None else None
+    try:
+        with FeatureStore(store_path) as store, open(part_path, "w", newline="", encoding="utf-8") as out:
+            for chunk in store.iter_chunks(chunk_size, institute_id=institute_id):
+                _, risk_scores, risk_levels = score_rows(chunk, model_type)
+                rows = alert_rows(chunk, risk_scores, risk_levels, min_level)
+                rows.to_csv(out, header=False, index=False, float_format="%.4f")
+                if rollup is not None:
+                    rollup.add(chunk, risk_scores, risk_levels, week)
+                scored += len(chunk)
+                alerts += len(rows)
+    finally:
+        if rollup is not None:
+            rollup.close()
+    return institute_id, scored, alerts
+
+
+# ========== Driver ==========
+def run(output=ALERTS_PATH, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None, model_type="logistic",
+        min_level="Medium", institutes=None, store_path=FEATURE_STORE_PATH, rollup_path=ROLLUP_PATH, week=None):
+    """
+    Score every stored student and write alerts.csv.
+
+    Args:
+        output: alerts.csv path (replaced atomically when the run finishes)
+        chunk_size: Students per scoring chunk in each worker
+        max_workers: Process pool size (defaults to one per institute, capped at the CPU count)
+        model_type: "logistic", "tree", "best" or "online"
+        min_level: Lowest Risk_Level that gets an alert
+        institutes: Only these institute ids (None for every institute in the store)
+        store_path: Feature store to read from
+        rollup_path: Risk rollup to add the scores to (None to skip it)
+        week: week_id the scores are filed under in the rollup (default: each student's
+              latest week with attendance, see risk_rollup.data_weeks)
+
+    Returns:
+        dict with per-institute (students, alerts) counts and totals
+    """
+    if min_level not in RISK_LEVELS:
+        raise ValueError(f"min_level must be one of {list(RISK_LEVELS)}, got {min_level!r}")
+    with FeatureStore(store_path) as store:
+        shards = store.institutes()
+    if institutes is not None:
+        shards = [i for i in shards if i in set(institutes)]
+    if max_workers is None:
+        max_workers = max(1, min(len(shards), os.cpu_count() or 1))
+
+    out_dir = os.path.dirname(os.path.abspath(output))
+    os.makedirs(out_dir, exist_ok=True)
+    parts_dir = tempfile.mkdtemp(prefix="alerts-", dir=out_dir)
+    per_institute = {}
+    try:
+        parts = {i: os.path.join(parts_dir, f"institute_{i}.csv") for i in shards}
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(score_shard, i, parts[i], chunk_size, model_type, min_level, store_path,
+                                   rollup_path, week)
+                       for i in shards]
+            for future in futures:
+                institute_id, scored, alerts = future.result()
+                per_institute[institute_id] = {"students": scored, "alerts": alerts}
+
+        # Stream the parts into one file, in institute order, without reading them into memory
+        tmp = os.path.join(parts_dir, "alerts.csv")
+        with open(tmp, "w", newline="", encoding="utf-8") as out:
+            out.write(",".join(ALERT_COLUMNS) + "\n")
+            for i in shards:
+                with open(parts[i], encoding="utf-8") as part:
+                    shutil.copyfileobj(part, out)
+        os.replace(tmp, output)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    return {
+        "institutes": per_institute,
+        "students": sum(v["students"] for v in per_institute.values()),
+        "alerts": sum(v["alerts"] for v in per_institute.values()),
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score all students and write alerts.csv for the notifier.")
+    parser.add_argument("--output", default=ALERTS_PATH, help="alerts.csv path")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="students per scoring chunk")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--model-type", default="logistic", help="logistic, tree, best or online")
+    parser.add_argument("--min-level", default="Medium", choices=list(RISK_LEVELS),
+                        help="lowest Risk_Level that raises an alert")
+    parser.add_argument("--institutes", type=int, nargs="+", default=None, help="only these institute ids")
+    parser.add_argument("--week", type=int, default=None,
+                        help="rollup week_id for every student (default: each one's latest week in the data)")
+    parser.add_argument("--no-rollup", action="store_true", help="do not update the risk rollup")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    summary = run(output=args.output, chunk_size=args.chunk_size, max_workers=args.workers,
+                  model_type=args.model_type, min_level=args.min_level, institutes=args.institutes,
+                  rollup_path=None if args.no_rollup else ROLLUP_PATH, week=args.week)
+    for institute_id, counts in summary["institutes"].items():
+        print(f"Institute {institute_id}: {counts['alerts']} alerts from {counts['students']} students")
+    print(f"✅ {summary['alerts']} alerts for {summary['students']} students written to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
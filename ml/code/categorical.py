@@ -0,0 +1,102 @@
+"""
+Persisted categorical vocabularies for the name columns.
+
+A CategoryEncoder is fit once at training time (the sorted vocabulary, so
+known values get exactly the codes LabelEncoder would give them) and saved
+in the model bundle. Encoding is a hash-table lookup per value, O(n) in the
+batch size and independent of which values a batch happens to contain:
+
+    known value      -> its position in the training vocabulary (0 .. n-1)
+    anything else    -> unknown_code (n), one explicit bucket for unseen names
+
+The hash table (a pandas Index) is built on first use and cached on the
+encoder, so a bundle cached per process pays for it once. It is not pickled.
+"""
+import numpy as np
+import pandas as pd
+
+
+class CategoryEncoder:
+    def __init__(self, vocabulary):
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self._index = None
+
+    @classmethod
+    def fit(cls, values):
+        """Sorted distinct values (as strings) become the vocabulary."""
+        return cls(np.unique(pd.Series(values).astype(str).to_numpy()))
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    @property
+    def unknown_code(self):
+        return len(self.vocabulary)
+
+    def encode(self, values):
+        """
+        Codes for a column of values.
+
+        Args:
+            values: Series / array of raw values (converted to str like at fit time)
+
+        Returns:
+            int32 array; values outside the vocabulary get unknown_code
+        """
+        if self._index is None:
+            self._index = pd.Index(self.vocabulary)
+        codes = self._index.get_indexer(pd.Series(values).astype(str).to_numpy())
+        codes[codes < 0] = self.unknown_code
+        return codes.astype(np.int32, copy=False)
+
+    def __getstate__(self):
+        return {"vocabulary": self.vocabulary}
+
+    def __setstate__(self, state):
+        self.vocabulary = state["vocabulary"]
+        self._index = None
+
+
+def as_encoder(vocabulary):
+    """CategoryEncoder for a bundle entry; older bundles stored the bare sorted vocabulary."""
+    if isinstance(vocabulary, CategoryEncoder):
+        return vocabulary
+    return CategoryEncoder(vocabulary)
+
+def fit_encoders(df, columns, max_cardinality=None):
+    """
+    One encoder per categorical column present in df.
+
+    Args:
+        columns: Candidate categorical columns
+        max_cardinality: Columns with more distinct values than this get no
+                         encoder (0 drops every name column)
+
+    Returns:
+        {column: CategoryEncoder}
+    """
+    encoders = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        encoder = CategoryEncoder.fit(df[col])
+        if max_cardinality is not None and len(encoder) > max_cardinality:
+            continue
+        encoders[col] = encoder
+    return encoders
+
+def encode_columns(df, encoders, columns):
+    """
+    Encode `columns` of df in place with the given encoders.
+
+    Categorical columns without an encoder were dropped at training time
+    (high cardinality) and are removed from df.
+    """
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if col in encoders:
+            df[col] = as_encoder(encoders[col]).encode(df[col])
+        else:
+            del df[col]
+    return df
@@ -0,0 +1,101 @@
+"""
+Compiled pure-NumPy scoring for the trained models.
+
+compile_model() turns a fitted estimator plus its StandardScaler into a dict
+of flat NumPy arrays, and score() runs a contiguous float32 feature matrix
+through it in one pass, returning label, probability and Risk_Level. No
+pandas, no sklearn and no per-call validation on the hot path.
+
+    linear (LogisticRegression, SGDClassifier with log loss):
+        the scaler folds into the weights:  w = coef / scale
+                                            b = intercept - sum(coef * mean / scale)
+        p = sigmoid(X @ w + b)
+
+    tree (DecisionTreeClassifier):
+        flattened feature / threshold / left / right / leaf-probability arrays,
+        traversed for all rows at once (one vectorized step per tree level).
+        Inputs are scaled and cast to float32 first, exactly like sklearn does,
+        so splits land on the same side of every threshold.
+
+The compiled arrays are stored in the model bundle under "compiled", so they
+are memory-mapped together with the rest of the bundle.
+"""
+import numpy as np
+
+RISK_LEVELS = np.array(["Low", "Medium", "High"], dtype=object)
+
+
+# ========== Export ==========
+def compile_model(model, scaler):
+    """Flatten a fitted binary classifier and its scaler into NumPy arrays."""
+    mean = np.asarray(scaler.mean_, dtype=np.float64)
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    if hasattr(model, "tree_"):
+        tree = model.tree_
+        value = tree.value[:, 0, :]
+        proba = value / value.sum(axis=1, keepdims=True)
+        positive = list(model.classes_).index(1)
+        return {
+            "kind": "tree",
+            "mean": mean,
+            "scale": scale,
+            "feature": tree.feature.astype(np.intp),
+            "threshold": tree.threshold.astype(np.float64),
+            "left": tree.children_left.astype(np.intp),
+            "right": tree.children_right.astype(np.intp),
+            "proba": np.ascontiguousarray(proba[:, positive], dtype=np.float64),
+            "depth": int(tree.max_depth),
+        }
+
+    if hasattr(model, "coef_"):
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        sign = 1.0 if list(model.classes_).index(1) == 1 else -1.0
+        return {
+            "kind": "linear",
+            "weights": sign * coef / scale,
+            "bias": float(sign * (model.intercept_[0] - np.sum(coef * mean / scale))),
+        }
+
+    raise TypeError(f"Cannot compile {type(model).__name__}")
+
+
+# ========== Scoring ==========
+def _tree_proba(compiled, X):
+    # sklearn scales in float64 and then evaluates splits on float32 inputs
+    Xs = ((X - compiled["mean"]) / compiled["scale"]).astype(np.float32)
+    feature, threshold = compiled["feature"], compiled["threshold"]
+    left, right = compiled["left"], compiled["right"]
+    rows = np.arange(len(Xs))
+    node = np.zeros(len(Xs), dtype=np.intp)
+    for _ in range(compiled["depth"]):
+        f = feature[node]
+        leaf = f < 0
+        if leaf.all():
+            break
+        go_left = Xs[rows, np.where(leaf, 0, f)] <= threshold[node]
+        node = np.where(leaf, node, np.where(go_left, left[node], right[node]))
+    return compiled["proba"][node]
+
+def score(compiled, X):
+    """
+    Score a feature matrix with a compiled model.
+
+    Args:
+        compiled: Output of compile_model()
+        X: (n_samples, n_features) matrix in training feature order; float32
+           C-contiguous input avoids a conversion copy
+
+    Returns:
+        (labels int8, probabilities float64, Risk_Level object array)
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    if compiled["kind"] == "linear":
+        logits = X @ compiled["weights"] + compiled["bias"]
+        proba = 1.0 / (1.0 + np.exp(-logits))
+        labels = (logits > 0).astype(np.int8)
+    else:
+        proba = _tree_proba(compiled, X)
+        labels = (proba > 0.5).astype(np.int8)
+    levels = RISK_LEVELS[(proba > 0.3).astype(np.intp) + (proba > 0.7)]
+    return labels, proba, levels
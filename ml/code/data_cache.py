@@ -0,0 +1,242 @@
+"""
+Columnar on-disk cache for the source CSVs in ml/data/.
+
+Each CSV is parsed once and stored as one .npy file per column under
+ml/data/.cache/<csv name>/, together with a meta.json describing the source
+file (size, mtime, sha1) and the pinned dtype of every column. Later loads
+skip text parsing entirely and only touch the columns that are asked for.
+
+Pinned dtypes:
+    *_id columns                      -> int32
+    Week_N / Lowest / Highest attendance -> uint8
+    test_score, max_score             -> int16
+    subject_name, Is_Declining_Attendance -> category
+A column keeps the dtype pandas parsed it with if its values do not fit
+(e.g. NaNs in an ID column), so the cache never changes the data.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from paths import CACHE_DIR
+
+CACHE_VERSION = 1
+
+ID_PATTERN = re.compile(r".*_id$")
+ATTENDANCE_PATTERN = re.compile(r"^(Week_\d+|Lowest_Week|Highest_Week)_Attendance$")
+SCORE_COLUMNS = {"test_score", "max_score"}
+CATEGORICAL_COLUMNS = {"subject_name", "Is_Declining_Attendance"}
+
+
+# ========== Dtype Pinning ==========
+def _pinned_dtype(col):
+    if ID_PATTERN.match(col):
+        return "int32"
+    if ATTENDANCE_PATTERN.match(col):
+        return "uint8"
+    if col in SCORE_COLUMNS:
+        return "int16"
+    if col in CATEGORICAL_COLUMNS:
+        return "category"
+    return None
+
+def _fits(series, dtype):
+    """True if every value of an integer column can be stored losslessly in dtype."""
+    if not pd.api.types.is_integer_dtype(series.dtype):
+        return False
+    if len(series) == 0:
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= series.min() and series.max() <= info.max
+
+def pin_dtypes(df):
+    """Return a copy of df with the compact dtypes described in the module docstring."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        target = _pinned_dtype(col)
+        if target == "category":
+            s = s.astype("category")
+        elif target is not None and _fits(s, target):
+            s = s.astype(target)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+# ========== Cache Files ==========
+def _file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _cache_dir_for(path, cache_dir):
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0])
+
+def _read_meta(entry_dir):
+    try:
+        with open(os.path.join(entry_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+def _write_meta(entry_dir, meta):
+    # Written last and atomically: readers only ever see a complete entry.
+    tmp = os.path.join(entry_dir, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, os.path.join(entry_dir, "meta.json"))
+
+def _is_fresh(path, entry_dir, meta):
+    """Cheap size/mtime check first; fall back to the content hash if only mtime moved."""
+    st = os.stat(path)
+    if meta["size"] != st.st_size:
+        return False
+    if meta["mtime_ns"] == st.st_mtime_ns:
+        return True
+    if _file_digest(path) != meta["sha1"]:
+        return False
+    # Same bytes, new mtime (e.g. a fresh git checkout): just remember the new mtime.
+    meta["mtime_ns"] = st.st_mtime_ns
+    _write_meta(entry_dir, meta)
+    return True
+
+def build_cache(path, cache_dir=CACHE_DIR):
+    """Parse one CSV and write its columnar cache entry. Returns the entry's meta dict."""
+    st = os.stat(path)
+    digest = _file_digest(path)
+    df = pin_dtypes(pd.read_csv(path, encoding="utf-8"))
+
+    entry_dir = _cache_dir_for(path, cache_dir)
+    os.makedirs(entry_dir, exist_ok=True)
+    old_files = set(os.listdir(entry_dir)) - {"meta.json"}
+    tag = digest[:12]
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        info = {"name": col}
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            info["kind"] = "category"
+            info["codes"] = f"{i}_{tag}.codes.npy"
+            info["categories"] = f"{i}_{tag}.cats.npy"
+            np.save(os.path.join(entry_dir, info["codes"]), s.cat.codes.to_numpy())
+            np.save(os.path.join(entry_dir, info["categories"]),
+                    np.asarray(s.cat.categories.astype(str), dtype=str))
+        elif pd.api.types.is_numeric_dtype(s.dtype):
+            info["kind"] = "numeric"
+            info["file"] = f"{i}_{tag}.npy"
+            np.save(os.path.join(entry_dir, info["file"]), s.to_numpy())
+        else:
+            # Free text (names): fixed-width unicode so np.load never needs pickle.
+            info["kind"] = "string"
+            info["file"] = f"{i}_{tag}.npy"
+            info["has_nulls"] = bool(s.isna().any())
+            np.save(os.path.join(entry_dir, info["file"]),
+                    np.asarray(s.fillna("").astype(str), dtype=str))
+        columns.append(info)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": digest,
+        "rows": len(df),
+        "columns": columns,
+    }
+    _write_meta(entry_dir, meta)
+
+    # Unchanged content gets the same file names again: only remove what this build did not write
+    written = {info[k] for info in columns for k in ("file", "codes", "categories") if k in info}
+    for name in old_files - written:
+        try:
+            os.remove(os.path.join(entry_dir, name))
+        except OSError:
+            pass
+    return meta
+
+def _load_column(entry_dir, info, mmap_mode):
+    if info["kind"] == "category":
+        codes = np.load(os.path.join(entry_dir, info["codes"]), mmap_mode=mmap_mode)
+        cats = np.load(os.path.join(entry_dir, info["categories"]))
+        return pd.Categorical.from_codes(np.asarray(codes), categories=cats.astype(object))
+    values = np.load(os.path.join(entry_dir, info["file"]), mmap_mode=mmap_mode)
+    if info["kind"] == "string":
+        values = values.astype(object)
+        if info.get("has_nulls"):
+            values[values == ""] = None
+    return values
+
+
+# ========== Public API ==========
+def read_csv_cached(path, columns=None, cache_dir=CACHE_DIR, mmap_mode=None):
+    """
+    Drop-in replacement for pd.read_csv(path) backed by the columnar cache.
+
+    Args:
+        path: Source CSV file
+        columns: Optional list of columns to load; others are never read from disk
+        cache_dir: Root of the cache (defaults to ml/data/.cache)
+        mmap_mode: Passed to np.load for numeric columns ("r" to memory-map)
+
+    Returns:
+        DataFrame with pinned dtypes
+    """
+    entry_dir = _cache_dir_for(path, cache_dir)
+    meta = _read_meta(entry_dir)
+    if meta is None or not _is_fresh(path, entry_dir, meta):
+        meta = build_cache(path, cache_dir)
+
+    wanted = meta["columns"]
+    if columns is not None:
+        by_name = {c["name"]: c for c in wanted}
+        missing = [c for c in columns if c not in by_name]
+        if missing:
+            raise KeyError(f"Columns not in {os.path.basename(path)}: {missing}")
+        wanted = [by_name[c] for c in columns]
+
+    data = {c["name"]: _load_column(entry_dir, c, mmap_mode) for c in wanted}
+    return pd.DataFrame(data, copy=False)
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """Remove every cache entry (they are rebuilt on the next read)."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+# ========== Benchmark ==========
+if __name__ == "__main__":
+    import glob
+    import tracemalloc
+
+    from paths import DATA_DIR
+
+    def measure(fn):
+        tracemalloc.start()
+        start = time.perf_counter()
+        df = fn()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return df, elapsed, peak
+
+    files = sorted(glob.glob(os.path.join(DATA_DIR, "*.csv")))
+    for path in files:
+        read_csv_cached(path)  # warm the cache
+
+    print(f"{'file':45s} {'csv s':>8s} {'cache s':>8s} {'csv MB':>8s} {'cache MB':>9s} {'peak x':>7s}")
+    for path in files:
+        csv_df, csv_t, csv_peak = measure(lambda: pd.read_csv(path, encoding="utf-8"))
+        npy_df, npy_t, npy_peak = measure(lambda: read_csv_cached(path))
+        print(f"{os.path.basename(path):45s} {csv_t:8.4f} {npy_t:8.4f} "
+              f"{csv_df.memory_usage(deep=True).sum() / 1e6:8.2f} "
+              f"{npy_df.memory_usage(deep=True).sum() / 1e6:9.2f} "
+              f"{csv_peak / max(npy_peak, 1):7.1f}")
@@ -0,0 +1,93 @@
+"""
+N-institute loader for the *_InstituteN.csv shards in ml/data/.
+
+Shards are discovered by file name, so onboarding an institute is just a
+matter of dropping its five CSVs into the data directory. All shards of all
+tables are read concurrently in one thread pool (both pd.read_csv and the
+.npy cache release the GIL for the heavy lifting, and threads avoid pickling
+frames back from worker processes), then each table is concatenated once.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from paths import DATA_DIR
+from data_cache import read_csv_cached
+
+# Order matches the tuple returned by load_data()
+TABLES = ("Weekly_Scores", "Students", "Parents", "Mentors", "Attendance_Wide_Format")
+
+SHARD_PATTERN = re.compile(r"^(?P<table>.+)_Institute(?P<institute>\d+)\.csv$")
+
+
+def discover_shards(data_dir=DATA_DIR, institutes=None):
+    """
+    Find every <Table>_Institute<N>.csv shard.
+
+    Args:
+        data_dir: Directory to scan
+        institutes: Optional iterable of institute ids to keep (N in the file name)
+
+    Returns:
+        dict: table name -> list of (institute_id, path), sorted by institute_id
+    """
+    keep = None if institutes is None else {int(i) for i in institutes}
+    shards = {table: [] for table in TABLES}
+    for name in os.listdir(data_dir):
+        m = SHARD_PATTERN.match(name)
+        if not m or m.group("table") not in shards:
+            continue
+        institute = int(m.group("institute"))
+        if keep is not None and institute not in keep:
+            continue
+        shards[m.group("table")].append((institute, os.path.join(data_dir, name)))
+    for table in shards:
+        shards[table].sort()
+    return shards
+
+def _read_shard(path, use_cache):
+    if use_cache:
+        # The cache lives next to its CSVs (ml/data/.cache for the real data)
+        return read_csv_cached(path, cache_dir=os.path.join(os.path.dirname(path), ".cache"))
+    return pd.read_csv(path, encoding="utf-8")
+
+def _concat(frames):
+    """Concatenate shards once, keeping categorical columns categorical across shards."""
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            # pd.concat falls back to object when categories differ between shards
+            cats = union_categoricals([f[col] for f in frames if col in f]).categories
+            frames = [f.assign(**{col: f[col].cat.set_categories(cats)}) if col in f else f
+                      for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+def load_tables(data_dir=DATA_DIR, institutes=None, use_cache=True, max_workers=None):
+    """
+    Read every table across all (or selected) institutes.
+
+    Args:
+        data_dir: Directory holding the *_InstituteN.csv shards
+        institutes: Optional iterable of institute ids to load; None loads all
+        use_cache: Read through the columnar cache (see data_cache.py)
+        max_workers: Thread pool size (defaults to ThreadPoolExecutor's own default)
+
+    Returns:
+        dict: table name -> DataFrame
+    """
+    shards = discover_shards(data_dir, institutes)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {table: [pool.submit(_read_shard, path, use_cache) for _, path in files]
+                   for table, files in shards.items()}
+        return {table: _concat([f.result() for f in fs]) for table, fs in futures.items()}
+
+def load_data(data_dir=DATA_DIR, institutes=None, use_cache=True, max_workers=None):
+    """Same tables as load_tables(), as the (scores, students, parents, mentors, attendance) tuple."""
+    tables = load_tables(data_dir, institutes, use_cache, max_workers)
+    return tuple(tables[t] for t in TABLES)
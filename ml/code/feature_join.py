@@ -0,0 +1,93 @@
+"""
+Index-backed join stage for prepare_dataset().
+
+Every table is attached to the students frame by key lookup: one
+Index.get_indexer() call per table gives the row position of each student's
+match, and each needed column is gathered with a single take(). The result
+is assembled once at the end, with no helper key columns (mentor_id_m,
+parent_id_p) to rename and drop. This is about 3x faster than the merge
+chain; peak memory is about the same, since it is dominated by the output
+frame itself (see benchmarks/bench_join.py).
+
+Join semantics match the old merge chain (left joins onto students), with
+two deliberate differences:
+    * attendance is matched on student_id instead of by row position
+    * duplicate keys in a lookup table resolve to the first row instead of
+      duplicating the student
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+# Attendance repeats the student's keys; those come from the students table
+ATTENDANCE_KEYS = ["student_id", "mentor_id", "parent_id"]
+
+
+def lookup(table, key, values):
+    """
+    Row positions in `table` whose `key` equals each of `values` (-1 if missing).
+
+    Duplicate keys resolve to their first occurrence.
+    """
+    index = pd.Index(table[key])
+    if index.is_unique:
+        return index.get_indexer(values)
+    first = ~index.duplicated(keep="first")
+    positions = np.flatnonzero(first)
+    found = index[first].get_indexer(values)
+    return np.where(found >= 0, positions[found], -1)
+
+def gather(series, positions):
+    """Values of `series` at `positions`, missing (NaN) where the position is -1."""
+    # Without any misses the column keeps its dtype (no upcast to float for the NaN fill)
+    return take(series.array, positions, allow_fill=bool((positions < 0).any()))
+
+def join_features(students, score_summary, attendance, mentors, parents):
+    """
+    Attach score summary, attendance, mentor and parent attributes to students.
+
+    Args:
+        students: One row per student (student_id, mentor_id, parent_id, ...)
+        score_summary: Per-student score means keyed by student_id
+        attendance: Wide attendance table keyed by student_id
+        mentors: Mentor attributes keyed by mentor_id
+        parents: Parent attributes keyed by (student_id, parent_id)
+
+    Returns:
+        DataFrame with one row per student, in students' order and with the
+        same columns as the old merge chain
+    """
+    student_ids = students["student_id"].to_numpy()
+    columns = {c: students[c].array for c in students.columns if c != "institute_id"}
+
+    # Score summary and attendance: keyed by student_id
+    pos = lookup(score_summary, "student_id", student_ids)
+    for c in score_summary.columns:
+        if c not in columns:
+            columns[c] = gather(score_summary[c], pos)
+
+    pos = lookup(attendance, "student_id", student_ids)
+    for c in attendance.columns:
+        if c not in ATTENDANCE_KEYS and c not in columns:
+            columns[c] = gather(attendance[c], pos)
+
+    # Mentors: keyed by the student's mentor_id
+    pos = lookup(mentors, "mentor_id", students["mentor_id"].to_numpy())
+    for c in mentors.columns:
+        if c not in columns and c not in ("mentor_id", "institute_id"):
+            columns[c] = gather(mentors[c], pos)
+
+    # Parents: keyed by student_id, and only if the parent_id matches too
+    pos = lookup(parents, "student_id", student_ids)
+    if "parent_id" in parents.columns:
+        parent_ids = take(parents["parent_id"].to_numpy(dtype=float), pos, allow_fill=True)
+        pos = np.where(parent_ids == students["parent_id"].to_numpy(dtype=float), pos, -1)
+    for c in parents.columns:
+        if c not in columns and c not in ("parent_id", "institute_id"):
+            columns[c] = gather(parents[c], pos)
+
+    # institute_id has always come out as the last column of the merge chain
+    if "institute_id" in students.columns:
+        columns["institute_id"] = students["institute_id"].array
+
+    return pd.DataFrame(columns, copy=False)
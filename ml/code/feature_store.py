@@ -0,0 +1,305 @@
+"""
+Persistent per-student feature store (SQLite, stdlib only).
+
+Each feature-set version gets its own wide table, features_<version>, with
+one column per feature and student_id as the primary key, so:
+    * training reads a whole version in one query (read_all)
+    * scoring fetches one student's row by primary key (get)
+    * sync() only writes students whose source row hash changed, and drops
+      students that are no longer in the source
+    * batch jobs page through one institute at a time (iter_chunks), using an
+      (institute_id, student_id) index so every page is an index range scan
+
+The rows stored are the output of feature_join.join_features() (names are
+kept as text; encoding happens at training / scoring time). The raw
+Week_N_Attendance columns grow as the term goes on: sync() adds a week the
+table does not have yet with ALTER TABLE, any other schema change needs a
+new FEATURE_SET_VERSION.
+"""
+import json
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from attendance_features import WEEK_PATTERN
+from paths import FEATURE_STORE_PATH
+
+FEATURE_SET_VERSION = "v2"  # v2: attendance trend features
+GET_CHUNK = 900
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+def _week_number(column):
+    match = WEEK_PATTERN.match(column)
+    return int(match.group(1)) if match else None
+
+def _canonical(df):
+    """
+    df with dtype-independent values: numbers as float64, everything else as text.
+
+    The same data loaded from the columnar cache (uint8 / int32 / category),
+    parsed straight from CSV (int64 / object) or read back from SQLite then
+    hashes the same.
+    """
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype(object)
+        if pd.api.types.is_bool_dtype(s.dtype) or pd.api.types.is_numeric_dtype(s.dtype):
+            out[c] = s.astype(np.float64)
+        else:
+            text = s.astype(str).astype(object)
+            text[s.isna().to_numpy()] = None
+            out[c] = text
+    return pd.DataFrame(out, index=df.index)
+
+def row_hashes(df):
+    """Stable 64-bit hash of every row's values (student_id included), whatever the dtypes."""
+    # Stored as signed ints: SQLite INTEGER is 64-bit signed
+    return pd.util.hash_pandas_object(_canonical(df), index=False).to_numpy().view(np.int64)
+
+
+class FeatureStore:
+    def __init__(self, path=FEATURE_STORE_PATH, version=FEATURE_SET_VERSION):
+        self.path = path
+        self.version = version
+        self.table = _quote(f"features_{version}")
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS feature_sets ("
+            " version TEXT PRIMARY KEY, columns TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.columns = self._load_columns()
+        self.last_deleted = 0       # students the latest sync() removed
+        if self.columns is not None:
+            self._create_index()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ========== Schema ==========
+    def _load_columns(self):
+        row = self.conn.execute(
+            "SELECT columns FROM feature_sets WHERE version = ?", (self.version,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _create(self, df):
+        cols = [f"{_quote(c)} {_sql_type(df[c].dtype)}" for c in df.columns if c != "student_id"]
+        with self.conn:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f" student_id INTEGER PRIMARY KEY, row_hash INTEGER NOT NULL, {', '.join(cols)})"
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO feature_sets VALUES (?, ?, ?)",
+                (self.version, json.dumps(list(df.columns)), time.time()),
+            )
+        self.columns = list(df.columns)
+        self._create_index()
+
+    def _add_weeks(self, features):
+        """
+        Add the Week_N_Attendance columns of features the table lacks.
+
+        Week columns stay together, ordered by N, where the table had them.
+
+        Raises:
+            ValueError: features differ from the stored schema in anything but week columns
+        """
+        stored_weeks = [c for c in self.columns if _week_number(c) is not None]
+        if [c for c in features.columns if _week_number(c) is None] != \
+                [c for c in self.columns if c not in stored_weeks]:
+            raise ValueError(
+                f"Feature columns differ from feature set {self.version}; "
+                f"bump FEATURE_SET_VERSION to store a new schema"
+            )
+        added = [c for c in features.columns if _week_number(c) is not None and c not in stored_weeks]
+        if not added:
+            return
+        weeks = sorted(stored_weeks + added, key=_week_number)
+        columns, placed = [], False
+        for c in self.columns if stored_weeks else features.columns:
+            if _week_number(c) is None:
+                columns.append(c)
+            elif not placed:
+                columns += weeks
+                placed = True
+        with self.conn:
+            for c in added:
+                self.conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {_quote(c)} {_sql_type(features[c].dtype)}")
+            self.conn.execute("UPDATE feature_sets SET columns = ?, updated_at = ? WHERE version = ?",
+                              (json.dumps(columns), time.time(), self.version))
+        self.columns = columns
+
+    def _create_index(self):
+        if "institute_id" in self.columns:
+            index = _quote(f"features_{self.version}_institute")
+            with self.conn:
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index} ON {self.table} (institute_id, student_id)")
+
+    # ========== Writes ==========
+    def _changed(self, features):
+        """(mask of rows that are new or differ from the stored row, row hashes)."""
+        hashes = row_hashes(features)
+        if self.columns is None:
+            return np.ones(len(features), dtype=bool), hashes
+        stored = pd.read_sql_query(f"SELECT student_id, row_hash FROM {self.table}", self.conn)
+        pos = pd.Index(stored["student_id"]).get_indexer(features["student_id"].to_numpy())
+        stored_hashes = np.append(stored["row_hash"].to_numpy(dtype=np.int64), 0)
+        # pos == -1 picks the padding slot; those rows are new anyway
+        return (pos < 0) | (stored_hashes[pos] != hashes), hashes
+
+    def changed_rows(self, features):
+        """Rows of `features` that sync() would write (new or changed students)."""
+        return features[self._changed(features)[0]]
+
+    def sync(self, features, delete_missing=True):
+        """
+        Upsert students whose feature row is new or changed.
+
+        Args:
+            features: DataFrame with one row per student, including student_id
+            delete_missing: Delete stored students absent from features. Only the
+                            institutes present in features are touched, so syncing
+                            one institute leaves the others alone.
+
+        Returns:
+            int: number of students written (the number deleted is in self.last_deleted)
+
+        Raises:
+            ValueError: features have other columns than the feature set, beyond
+                        Week_N_Attendance columns (which are added as they appear)
+        """
+        if self.columns is None:
+            self._create(features)
+        elif list(features.columns) != self.columns:
+            self._add_weeks(features)
+            # Weeks the store has but features lack are stored as missing
+            features = features.reindex(columns=self.columns)
+
+        self.last_deleted = self._delete_missing(features) if delete_missing else 0
+        changed, hashes = self._changed(features)
+        if not changed.any():
+            return 0
+
+        rows = features[changed].astype(object).where(features[changed].notna(), None)
+        rows.insert(1, "row_hash", hashes[changed].tolist())
+        placeholders = ", ".join("?" * rows.shape[1])
+        names = ", ".join(_quote(c) for c in rows.columns)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({names}) VALUES ({placeholders})",
+                rows.itertuples(index=False, name=None),
+            )
+            self.conn.execute("UPDATE feature_sets SET updated_at = ? WHERE version = ?",
+                              (time.time(), self.version))
+        return int(changed.sum())
+
+    def _delete_missing(self, features):
+        where, params = "", []
+        if "institute_id" in self.columns and "institute_id" in features.columns:
+            institutes = pd.unique(features["institute_id"].dropna()).tolist()
+            where = f" WHERE institute_id IN ({', '.join('?' * len(institutes))})"
+            params = [int(i) for i in institutes]
+        stored = pd.read_sql_query(f"SELECT student_id FROM {self.table}{where}", self.conn, params=params)
+        gone = stored.loc[~stored["student_id"].isin(features["student_id"]), "student_id"].tolist()
+        if gone:
+            with self.conn:
+                self.conn.executemany(f"DELETE FROM {self.table} WHERE student_id = ?", [(i,) for i in gone])
+                self.conn.execute("UPDATE feature_sets SET updated_at = ? WHERE version = ?",
+                                  (time.time(), self.version))
+        return len(gone)
+
+    # ========== Reads ==========
+    def _select(self):
+        if self.columns is None:
+            raise LookupError(f"Feature set {self.version} has not been written yet")
+        return f"SELECT {', '.join(_quote(c) for c in self.columns)} FROM {self.table}"
+
+    def read_all(self):
+        """Every stored student for this version (bulk read for training)."""
+        return pd.read_sql_query(self._select() + " ORDER BY student_id", self.conn)
+
+    def get(self, student_ids):
+        """
+        Feature rows for the given students, in the order asked for.
+
+        Args:
+            student_ids: A single id or an iterable of ids
+
+        Returns:
+            DataFrame; students not in the store are left out
+        """
+        if np.isscalar(student_ids):
+            student_ids = [student_ids]
+        ids = [int(i) for i in student_ids]
+        if not ids:
+            return pd.DataFrame(columns=self.columns)
+        # Primary-key lookups, chunked to stay under SQLite's bound-parameter limit
+        chunks = []
+        for start in range(0, len(ids), GET_CHUNK):
+            chunk = ids[start:start + GET_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            chunks.append(pd.read_sql_query(
+                self._select() + f" WHERE student_id IN ({placeholders})", self.conn, params=chunk))
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        order = {sid: i for i, sid in enumerate(ids)}
+        return df.iloc[np.argsort(df["student_id"].map(order).to_numpy(), kind="stable")] \
+                 .reset_index(drop=True)
+
+    def institutes(self):
+        """Distinct institute_id values stored for this version."""
+        if self.columns is None:
+            return []
+        return [r[0] for r in self.conn.execute(
+            f"SELECT DISTINCT institute_id FROM {self.table} ORDER BY institute_id")]
+
+    def iter_chunks(self, chunk_size=5000, institute_id=None):
+        """
+        Stream stored students in student_id order, chunk_size rows at a time.
+
+        Pages are fetched by keyset (student_id > last id seen), so each page
+        costs the same however deep into the table it is and only one page is
+        held in memory.
+
+        Args:
+            chunk_size: Rows per DataFrame yielded
+            institute_id: Only this institute's students (None for all)
+
+        Yields:
+            DataFrame chunks with the store's columns
+        """
+        where, params = "student_id > ?", []
+        if institute_id is not None:
+            where, params = "institute_id = ? AND student_id > ?", [int(institute_id)]
+        query = self._select() + f" WHERE {where} ORDER BY student_id LIMIT ?"
+        last = -1
+        while True:
+            chunk = pd.read_sql_query(query, self.conn, params=[*params, last, int(chunk_size)])
+            if chunk.empty:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            last = int(chunk["student_id"].iloc[-1])
@@ -0,0 +1,173 @@
+"""
+Lightweight scoring entry point.
+
+    from inference import predict_risk
+
+Importing this module only pulls in the standard library; pandas and the
+feature helpers are imported on the first call, and the model bundle is
+loaded once per process (see model_bundle.py). Training code (sklearn
+estimators, matplotlib, model search) lives in try1.py / train.py and is
+never imported here.
+"""
+
+
+def _feature_matrix(df_pred, bundle):
+    """Raw feature rows -> float32 matrix in the bundle's training feature order."""
+    import numpy as np
+    import pandas as pd
+    from attendance_features import TREND_COLUMNS, add_trend_features
+    from categorical import encode_columns
+
+    encoders = bundle.get("encoders")
+
+    # Rows built by hand only carry the raw Week_N columns
+    if any(c not in df_pred.columns for c in TREND_COLUMNS):
+        df_pred = add_trend_features(df_pred)
+
+    # Encode name columns with the vocabularies saved at training time (one hash
+    # lookup per value; names the model never saw go to the unknown bucket)
+    names = ["student_name", "mentor_name", "parent_name"]
+    if encoders is not None:
+        encode_columns(df_pred, encoders, [c for c in names if c in bundle["feature_names"]])
+    else:
+        # Bundle without encoders: same codes as LabelEncoder.fit_transform
+        for col in names:
+            if col in df_pred.columns:
+                df_pred[col] = pd.factorize(df_pred[col].astype(str), sort=True)[0]
+
+    # Fill missing values
+    df_pred = df_pred.fillna(0)
+
+    # Exactly the training features, in training order (IDs and label are left out)
+    missing = [c for c in bundle["feature_names"] if c not in df_pred.columns]
+    if missing:
+        raise ValueError(f"Input data is missing feature columns: {missing}")
+    return df_pred[bundle["feature_names"]].to_numpy(dtype=np.float32)
+
+def score_rows(rows, model_type="logistic"):
+    """
+    Score raw feature rows (as stored in the feature store) without building a results frame.
+
+    Args:
+        rows: DataFrame with the feature columns; it is not modified
+        model_type: "logistic", "tree", "best" or "online"
+
+    Returns:
+        (labels, risk scores, Risk_Level array)
+
+    Raises:
+        FileNotFoundError: no model has been trained for model_type
+        ValueError: rows lack feature columns the model was trained on
+    """
+    import numpy as np
+    from compiled_model import score
+    from instrumentation import stage
+    from model_bundle import bundle_path_for, get_bundle
+
+    # Trained models come from the bundle cached in this process (loaded once)
+    bundle = get_bundle(bundle_path_for(model_type))
+    model = bundle["models"][model_type]
+    with stage("predict.features", rows=len(rows)):
+        X_pred = _feature_matrix(rows.copy(), bundle)
+
+    compiled = bundle.get("compiled", {}).get(model_type)
+    if compiled is not None:
+        # Scaler folded into the model: one NumPy pass gives label, score and level
+        with stage("predict", rows=len(X_pred)):
+            return score(compiled, X_pred)
+
+    # Bundles saved before compiled scoring existed
+    with stage("predict", rows=len(X_pred)):
+        X_pred_scaled = bundle["scaler"].transform(X_pred)
+        predictions = model.predict(X_pred_scaled)
+        risk_scores = model.predict_proba(X_pred_scaled)[:, 1]  # Probability of declining attendance
+        risk_levels = np.where(risk_scores > 0.7, 'High', np.where(risk_scores > 0.3, 'Medium', 'Low'))
+    return predictions, risk_scores, risk_levels
+
+def predict_risk(new_data, model_type="logistic", cache=None):
+    """
+    Predict risk of declining attendance for new students
+    
+    Args:
+        new_data: DataFrame with student information
+        model_type: "logistic", "tree", "best" (model search) or "online"
+                    (see model_bundle.MODEL_TYPES)
+        cache: Optional prediction_cache.PredictionCache; rows already scored
+               with the current model version are served from it
+    
+    Returns:
+        DataFrame with predictions and risk scores
+    """
+    # If new_data has the same structure as training data, process it
+    if 'student_id' not in new_data.columns:
+        print("❌ Input data should contain student information columns")
+        return None
+
+    try:
+        scorer = score_rows if cache is None else cache.score_rows
+        predictions, risk_scores, risk_levels = scorer(new_data, model_type)
+    except FileNotFoundError:
+        print("❌ Model files not found. Please train the model first.")
+        return None
+    except ValueError as e:
+        print(f"❌ {e}")
+        return None
+
+    # Create results DataFrame
+    results = new_data.copy()
+    results['Risk_Prediction'] = predictions
+    results['Risk_Score'] = risk_scores
+    results['Risk_Level'] = risk_levels
+    
+    return results
+
+def score_matrix(X, model_type="logistic"):
+    """
+    Fastest scoring path: an already encoded feature matrix straight into the compiled model.
+
+    Args:
+        X: (n_samples, n_features) array in the bundle's feature_names order,
+           ideally C-contiguous float32
+        model_type: "logistic", "tree", "best" or "online"
+
+    Returns:
+        (labels, risk scores, Risk_Level array)
+    """
+    from compiled_model import compile_model, score
+    from model_bundle import bundle_path_for, get_bundle
+
+    bundle = get_bundle(bundle_path_for(model_type))
+    compiled = bundle.get("compiled", {}).get(model_type)
+    if compiled is None:
+        compiled = compile_model(bundle["models"][model_type], bundle["scaler"])
+        bundle.setdefault("compiled", {})[model_type] = compiled
+    return score(compiled, X)
+
+def predict_risk_for_students(student_ids, model_type="logistic", store=None, cache=None):
+    """
+    Predict risk for students already in the feature store, by ID.
+
+    Args:
+        student_ids: A single student_id or a list of them
+        model_type: "logistic", "tree", "best" or "online"
+        store: Optional open FeatureStore (one is opened and closed otherwise)
+        cache: Optional PredictionCache (see predict_risk)
+
+    Returns:
+        DataFrame with predictions and risk scores, or None if no student was found
+    """
+    from feature_store import FeatureStore
+
+    own_store = store is None
+    if own_store:
+        store = FeatureStore()
+    try:
+        rows = store.get(student_ids)
+    finally:
+        if own_store:
+            store.close()
+
+    if rows.empty:
+        print("❌ None of the requested students are in the feature store")
+        return None
+    return predict_risk(rows, model_type=model_type, cache=cache)
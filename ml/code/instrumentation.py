@@ -0,0 +1,245 @@
+"""
+Stage-level instrumentation for the pipeline (standard library only).
+
+    from instrumentation import stage, instrument
+
+    with stage("join") as s:
+        df = join_features(...)
+        s.rows = len(df)
+
+    @instrument("encode", rows=len)       # rows taken from the return value
+    def encode_features(df, encoders=None): ...
+
+Every finished stage records wall time, CPU time (process-wide), the peak
+traced memory above what was allocated when the stage started (tracemalloc;
+nested stages are accounted correctly) and a row count. Records are
+aggregated per stage name and can be exported with snapshot() (JSON-ready
+dict), to_prometheus() (text exposition format) or write_snapshot(path), and
+each record is also emitted as one JSON line to a log file or the
+"pipeline.metrics" logger.
+
+Instrumentation is off by default. Disabled, stage() hands back one shared
+no-op context manager and instrument() one flag check per call, so the
+wrapped code pays well under a microsecond. Turn it on with enable(), or set
+PIPELINE_METRICS=1 (and optionally PIPELINE_METRICS_LOG=path) in the
+environment.
+
+Memory is only measured while this module owns tracemalloc: enable() starts
+it, disable() stops it again, and measuring resets its peak. If the caller
+is already tracing, its tracemalloc session is left alone and stages are
+recorded without peak memory.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger("pipeline.metrics")
+
+_lock = threading.Lock()
+_local = threading.local()
+_enabled = False
+_trace_memory = True
+_owns_tracing = False   # tracemalloc was started by enable(), so its peak is ours to reset
+_log_path = None
+_stats = {}   # stage name -> aggregated counters
+
+
+# ========== Switches ==========
+def enable(log_path=None, trace_memory=True):
+    """
+    Start recording stages.
+
+    Args:
+        log_path: Append one JSON line per finished stage to this file
+                  (otherwise records go to the "pipeline.metrics" logger at DEBUG)
+        trace_memory: Track peak memory with tracemalloc (slows allocation-heavy code;
+                      skipped if something else is already tracing)
+    """
+    global _enabled, _trace_memory, _owns_tracing, _log_path
+    _trace_memory = trace_memory
+    _log_path = log_path
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _owns_tracing = True
+    _enabled = True
+
+def disable():
+    global _enabled, _owns_tracing
+    _enabled = False
+    if _owns_tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _owns_tracing = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+# ========== Recording ==========
+class _NullStage:
+    """What stage() returns while disabled: enters, exits and accepts .rows, nothing else."""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+
+class Stage:
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.peak_abs = 0
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.tracing = _trace_memory and _owns_tracing and tracemalloc.is_tracing()
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak reached so far to the enclosing stages before resetting it
+            for parent in stack:
+                parent.peak_abs = max(parent.peak_abs, peak)
+            tracemalloc.reset_peak()
+            self.start_mem = self.peak_abs = current
+        stack.append(self)
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        stack = _local.stack
+        stack.pop()
+        peak = None
+        if self.tracing and tracemalloc.is_tracing():
+            self.peak_abs = max(self.peak_abs, tracemalloc.get_traced_memory()[1])
+            for parent in stack:
+                parent.peak_abs = max(parent.peak_abs, self.peak_abs)
+            peak = self.peak_abs - self.start_mem
+        _record({
+            "stage": self.name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_mem_bytes": peak,
+            "rows": None if self.rows is None else int(self.rows),
+            "ok": exc_type is None,
+            "ts": time.time(),
+        })
+        return False
+
+def _record(rec):
+    with _lock:
+        s = _stats.setdefault(rec["stage"], {
+            "calls": 0, "errors": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0,
+            "peak_mem_bytes": 0, "last_wall_s": 0.0,
+        })
+        s["calls"] += 1
+        s["errors"] += not rec["ok"]
+        s["wall_s"] += rec["wall_s"]
+        s["cpu_s"] += rec["cpu_s"]
+        s["rows"] += rec["rows"] or 0
+        s["peak_mem_bytes"] = max(s["peak_mem_bytes"], rec["peak_mem_bytes"] or 0)
+        s["last_wall_s"] = rec["wall_s"]
+        line = json.dumps(rec)
+        if _log_path is not None:
+            with open(_log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    if _log_path is None:
+        logger.debug(line)
+
+def stage(name, rows=None):
+    """Context manager timing one stage; set .rows on the yielded object to record a row count."""
+    if not _enabled:
+        return _NULL_STAGE
+    return Stage(name, rows)
+
+def instrument(name=None, rows=None):
+    """
+    Decorator form of stage().
+
+    Args:
+        name: Stage name (defaults to the function name)
+        rows: Optional callable applied to the return value to get the row count
+              (e.g. len, or lambda result: len(result[0]))
+    """
+    def decorate(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Stage(stage_name) as s:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    s.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+# ========== Export ==========
+def snapshot():
+    """{"stages": {name: counters}} with totals in seconds and bytes."""
+    with _lock:
+        return {"created_at": time.time(), "stages": {name: dict(s) for name, s in _stats.items()}}
+
+def to_prometheus(prefix="pipeline_stage"):
+    """Snapshot in the Prometheus text exposition format."""
+    metrics = [
+        ("calls_total", "counter", "Finished runs of the stage", "calls"),
+        ("errors_total", "counter", "Runs that raised", "errors"),
+        ("seconds_total", "counter", "Wall-clock seconds spent in the stage", "wall_s"),
+        ("cpu_seconds_total", "counter", "Process CPU seconds spent in the stage", "cpu_s"),
+        ("rows_total", "counter", "Rows processed by the stage", "rows"),
+        ("peak_memory_bytes", "gauge", "Largest traced memory peak above the stage's start", "peak_mem_bytes"),
+        ("last_seconds", "gauge", "Wall-clock seconds of the latest run", "last_wall_s"),
+    ]
+    stages = snapshot()["stages"]
+    lines = []
+    for suffix, kind, help_text, key in metrics:
+        metric = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, s in sorted(stages.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}{{stage="{label}"}} {s[key]}')
+    return "\n".join(lines) + "\n"
+
+def write_snapshot(path):
+    """Write the snapshot as Prometheus text (.prom / .txt) or JSON (anything else)."""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(to_prometheus())
+        else:
+            json.dump(snapshot(), f, indent=2)
+
+def summary_table():
+    """Human-readable per-stage table, slowest first."""
+    stages = snapshot()["stages"]
+    lines = [f"{'stage':<20s} {'calls':>6s} {'wall s':>9s} {'cpu s':>9s} {'peak MB':>9s} {'rows':>10s}"]
+    for name, s in sorted(stages.items(), key=lambda kv: -kv[1]["wall_s"]):
+        lines.append(f"{name:<20s} {s['calls']:>6d} {s['wall_s']:9.3f} {s['cpu_s']:9.3f} "
+                     f"{s['peak_mem_bytes'] / 1e6:9.1f} {s['rows']:>10d}")
+    return "\n".join(lines)
+
+
+if os.getenv("PIPELINE_METRICS", "") not in ("", "0"):
+    enable(log_path=os.getenv("PIPELINE_METRICS_LOG") or None)
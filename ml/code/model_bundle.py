@@ -0,0 +1,144 @@
+"""
+Versioned model bundles with an in-process cache.
+
+A bundle is one joblib file in ml/models/ holding everything scoring needs:
+
+    {
+        "version": "20250101120000-1a2b3c4d",
+        "models": {"logistic": ..., "tree": ...},
+        "scaler": StandardScaler,
+        "encoders": {column: categorical.CategoryEncoder} or None,
+        "feature_names": [ordered feature columns],
+        "compiled": {model_type: flat NumPy arrays (compiled_model.py)},
+        "created_at": unix time,
+    }
+
+Bundles are written uncompressed and atomically (temp file + os.replace),
+with the version also written to a small <bundle>.version side file. Loading
+memory-maps the numpy arrays inside the pickle (mmap_mode="r"), and each
+process caches the loaded bundle per file, tagged with its version, so
+scoring calls after the first do no disk I/O or unpickling.
+refresh_bundle() picks up a bundle retrained by another process.
+
+Only the standard library is imported at module load (joblib on first use).
+"""
+import os
+import threading
+import time
+import uuid
+
+from paths import MODELS_DIR
+
+BUNDLE_PATH = os.path.join(MODELS_DIR, "model_bundle.joblib")
+SEARCH_BUNDLE_PATH = os.path.join(MODELS_DIR, "search_bundle.joblib")
+ONLINE_BUNDLE_PATH = os.path.join(MODELS_DIR, "online_bundle.joblib")
+
+# model_type accepted by predict_risk -> bundle that holds it
+MODEL_TYPES = {
+    "logistic": BUNDLE_PATH,
+    "tree": BUNDLE_PATH,
+    "best": SEARCH_BUNDLE_PATH,
+    "online": ONLINE_BUNDLE_PATH,
+}
+
+_lock = threading.Lock()
+_bundles = {}   # path -> bundle currently served (its "version" key identifies it)
+
+
+def _version_path(path):
+    return path + ".version"
+
+def new_version():
+    return f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+def read_version(path):
+    """Version recorded next to a bundle file, or None if there is no bundle."""
+    try:
+        with open(_version_path(path), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _cache(path, bundle):
+    with _lock:
+        _bundles[path] = bundle
+
+
+# ========== Save / Load ==========
+def save_bundle(models, scaler, feature_names, encoders=None, path=BUNDLE_PATH, **extra):
+    """
+    Write a new bundle version atomically and make it the one this process serves.
+
+    Args:
+        models: {model_type: fitted estimator}
+        scaler: Fitted scaler applied before every model in the bundle
+        feature_names: Ordered feature columns the scaler/models were fit on
+        encoders: Optional {column: CategoryEncoder} for the categorical columns
+        path: Bundle file (defaults to ml/models/model_bundle.joblib)
+        **extra: Additional metadata stored in the bundle
+
+    Returns:
+        dict: the saved bundle
+    """
+    import joblib
+    from compiled_model import compile_model
+
+    bundle = {
+        "version": new_version(),
+        "models": dict(models),
+        "scaler": scaler,
+        "encoders": encoders,
+        "feature_names": list(feature_names),
+        # Flat NumPy form of every model for the fast scoring path (compiled_model.py)
+        "compiled": {name: compile_model(m, scaler) for name, m in models.items()},
+        "created_at": time.time(),
+        **extra,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    joblib.dump(bundle, tmp)          # uncompressed, so arrays can be memory-mapped on load
+    os.replace(tmp, path)
+    tmp = f"{_version_path(path)}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(bundle["version"])
+    os.replace(tmp, _version_path(path))
+
+    _cache(path, bundle)
+    return bundle
+
+def load_bundle(path=BUNDLE_PATH, mmap_mode="r"):
+    """Read a bundle from disk (no caching); raises FileNotFoundError if missing."""
+    import joblib
+
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+def get_bundle(path=BUNDLE_PATH, mmap_mode="r"):
+    """The bundle this process serves for `path`, loaded on first use and then cached."""
+    bundle = _bundles.get(path)
+    if bundle is None:
+        bundle = load_bundle(path, mmap_mode)
+        _cache(path, bundle)
+    return bundle
+
+def refresh_bundle(path=BUNDLE_PATH, mmap_mode="r"):
+    """Reload the bundle if its on-disk version differs from the cached one."""
+    version = read_version(path)
+    cached = _bundles.get(path)
+    if version is not None and (cached is None or cached["version"] != version):
+        _cache(path, load_bundle(path, mmap_mode))
+    return get_bundle(path, mmap_mode)
+
+def cached_version(path=BUNDLE_PATH):
+    """Version of the bundle currently cached for `path` (None if not loaded yet)."""
+    bundle = _bundles.get(path)
+    return None if bundle is None else bundle["version"]
+
+def clear_cache():
+    with _lock:
+        _bundles.clear()
+
+def bundle_path_for(model_type):
+    try:
+        return MODEL_TYPES[model_type]
+    except KeyError:
+        raise ValueError(f"Unknown model_type {model_type!r}; expected one of {sorted(MODEL_TYPES)}")
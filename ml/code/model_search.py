@@ -0,0 +1,192 @@
+"""
+Parallel hyperparameter search with k-fold cross-validation.
+
+Every (candidate, fold) pair is one task in a process pool. The raw
+feature matrix is written once to a temporary .npy file and memory-mapped
+by each worker, so it is never pickled per task. Each candidate is a
+StandardScaler + model pipeline, so the scaler of every fold is fit on that
+fold's training rows only and never sees the held-out rows. Folds are
+grouped by institute when institute ids are given (a model is always scored
+on an institute it was not trained on), otherwise stratified on the label.
+
+The time budget covers the whole search, refit included. Cross-validation
+stops early enough to leave room for refitting the current leader (its
+slowest fold fit, scaled to the full data); at that point queued tasks are
+cancelled and running workers are terminated rather than waited for.
+Candidates that have not finished all their folds are dropped from the
+leaderboard; the best finished one is refit on the full data.
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import GroupKFold, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+MODELS = {
+    "logistic": lambda **p: LogisticRegression(max_iter=1000, **p),
+    "tree": lambda **p: DecisionTreeClassifier(random_state=42, **p),
+}
+# Fit time of the refit relative to one fold's fit, on top of the (k-1)/k data ratio
+REFIT_MARGIN = 1.5
+
+
+def make_pipeline(model, params):
+    """StandardScaler + model, fit together so scaling only ever sees training rows."""
+    return Pipeline([("scaler", StandardScaler()), ("model", MODELS[model](**params))])
+
+DEFAULT_GRID = {
+    "logistic": {"C": [0.01, 0.1, 1.0, 10.0]},
+    "tree": {"max_depth": [3, 5, 8, None], "min_samples_leaf": [1, 5, 20]},
+}
+
+SCORERS = {"accuracy": accuracy_score, "f1": f1_score}
+
+
+# ========== Candidates and Folds ==========
+def expand_grid(grid):
+    """{"model": {param: [values]}} -> list of (model, params) candidates."""
+    candidates = []
+    for model, params in grid.items():
+        names = sorted(params)
+        for values in itertools.product(*(params[n] for n in names)):
+            candidates.append((model, dict(zip(names, values))))
+    return candidates
+
+def make_folds(y, groups=None, n_folds=5, random_state=42):
+    """List of (train_idx, test_idx); institute-grouped when there are at least two groups."""
+    if groups is not None and len(np.unique(groups)) >= 2:
+        n_splits = min(n_folds, len(np.unique(groups)))
+        return list(GroupKFold(n_splits=n_splits).split(np.zeros(len(y)), y, groups))
+    cv = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    return list(cv.split(np.zeros(len(y)), y))
+
+
+# ========== Worker Side ==========
+_shared = {}
+
+def _init_worker(x_path, y_path):
+    # Read-only memory maps: every worker shares the same pages of the matrix
+    _shared["X"] = np.load(x_path, mmap_mode="r")
+    _shared["y"] = np.load(y_path, mmap_mode="r")
+
+def _fit_fold(candidate_id, model, params, train_idx, test_idx, scoring):
+    X, y = _shared["X"], _shared["y"]
+    est = make_pipeline(model, params)
+    start = time.perf_counter()
+    est.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
+    y_pred = est.predict(X[test_idx])
+    return {
+        "candidate_id": candidate_id,
+        "score": SCORERS[scoring](y[test_idx], y_pred),
+        "accuracy": accuracy_score(y[test_idx], y_pred),
+        "fit_time": fit_time,
+    }
+
+def _abandon(pool):
+    """Stop a pool now: drop queued tasks and kill workers still busy with a fit."""
+    pool.shutdown(wait=False, cancel_futures=True)
+    # ProcessPoolExecutor has no public way to stop a running task before Python 3.14
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+
+
+# ========== Search ==========
+def search(X, y, groups=None, grid=None, n_iter=None, n_folds=5, scoring="f1",
+           max_workers=None, time_budget=None, random_state=42, mp_context=None):
+    """
+    Grid (or random) search with cross-validation across a process pool.
+
+    Args:
+        X: Unscaled feature matrix (n_samples x n_features); scaling is part of each candidate
+        y: Binary target
+        groups: Optional institute id per row for grouped folds
+        grid: {"logistic"|"tree": {param: [values]}}; defaults to DEFAULT_GRID
+        n_iter: If set, evaluate this many random candidates instead of the full grid
+        n_folds: Number of folds (capped at the number of institutes when grouped)
+        scoring: "f1" or "accuracy", used to rank candidates
+        max_workers: Process pool size
+        time_budget: Seconds for the whole search, final refit included
+        mp_context: multiprocessing context for the pool (default: the platform's start method)
+
+    Returns:
+        (leaderboard DataFrame sorted best-first, best StandardScaler + model Pipeline refit on all rows)
+
+    Raises:
+        TimeoutError: No candidate finished all folds within the budget
+    """
+    candidates = expand_grid(grid or DEFAULT_GRID)
+    if n_iter is not None and n_iter < len(candidates):
+        rng = np.random.default_rng(random_state)
+        picks = rng.choice(len(candidates), size=n_iter, replace=False)
+        candidates = [candidates[i] for i in sorted(picks)]
+    folds = make_folds(np.asarray(y), groups, n_folds, random_state)
+
+    tmp_dir = tempfile.mkdtemp(prefix="model_search_")
+    x_path, y_path = os.path.join(tmp_dir, "X.npy"), os.path.join(tmp_dir, "y.npy")
+    np.save(x_path, np.ascontiguousarray(X, dtype=np.float64))
+    np.save(y_path, np.asarray(y))
+
+    results = []
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    refit_scale = REFIT_MARGIN * len(folds) / max(1, len(folds) - 1)
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context,
+                               initializer=_init_worker, initargs=(x_path, y_path))
+    try:
+        pending = {
+            pool.submit(_fit_fold, cid, model, params, train_idx, test_idx, scoring)
+            for cid, (model, params) in enumerate(candidates)
+            for train_idx, test_idx in folds
+        }
+        reserve = 0.0   # time kept back for refitting the current leader
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - reserve - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            results.extend(f.result() for f in done)
+            leaderboard = _leaderboard(candidates, results, len(folds))
+            if not leaderboard.empty:
+                reserve = leaderboard["max_fit_time"].iloc[0] * refit_scale
+            if pending and deadline is not None and time.monotonic() >= deadline - reserve:
+                break
+    finally:
+        # Folds still queued or running when time is up are not waited for
+        _abandon(pool)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    leaderboard = _leaderboard(candidates, results, len(folds))
+    if leaderboard.empty:
+        raise TimeoutError("No candidate finished all folds within the time budget")
+
+    # Fits in the time kept back above (the leader's slowest fold, scaled to all rows)
+    best = leaderboard.iloc[0]
+    best_model = make_pipeline(best["model"], candidates[int(best["candidate_id"])][1])
+    best_model.fit(X, y)
+    return leaderboard.drop(columns="max_fit_time"), best_model
+
+def _leaderboard(candidates, results, n_folds):
+    if not results:
+        return pd.DataFrame()
+    per_fold = pd.DataFrame(results)
+    summary = per_fold.groupby("candidate_id").agg(
+        folds=("score", "size"),
+        mean_score=("score", "mean"),
+        std_score=("score", "std"),
+        mean_accuracy=("accuracy", "mean"),
+        mean_fit_time=("fit_time", "mean"),
+        max_fit_time=("fit_time", "max"),
+    ).reset_index()
+    summary = summary[summary["folds"] == n_folds]
+    summary.insert(1, "model", [candidates[c][0] for c in summary["candidate_id"]])
+    summary.insert(2, "params", [candidates[c][1] for c in summary["candidate_id"]])
+    return summary.sort_values(["mean_score", "mean_fit_time"], ascending=[False, True]) \
+                  .reset_index(drop=True)
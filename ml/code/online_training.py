@@ -0,0 +1,150 @@
+"""
+Online (incremental) training on new weekly feature rows.
+
+Instead of re-running load_data -> prepare_dataset -> train_model over all
+history, the online model is an SGD-trained logistic regression updated with
+partial_fit, and its StandardScaler keeps running mean/variance via
+partial_fit as well. Each run only touches the rows passed in, and the result
+is saved atomically as a new version of models/online_bundle.joblib.
+
+The online bundle keeps its own watermark: the hash of every feature row it
+has been trained on (feature_store.row_hashes), so which students are new or
+changed does not depend on what train.py has already synced to the feature
+store. Name vocabularies are taken once, from the full model bundle if there
+is one or fitted on the first batch otherwise, and saved with the online
+bundle so every later batch is encoded the same way.
+
+    python code/online_training.py     # fold students whose features changed
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from feature_store import row_hashes
+from model_bundle import BUNDLE_PATH, ONLINE_BUNDLE_PATH, load_bundle, save_bundle
+import try1
+
+CLASSES = np.array([0, 1])
+
+
+def load_online_artifacts(path=ONLINE_BUNDLE_PATH):
+    """
+    Saved online state, or fresh unfitted state on the first run.
+
+    Returns:
+        (model, scaler, encoders, trained) where trained is a Series of row
+        hash by student_id for every row the model has seen (empty at first)
+    """
+    if os.path.exists(path):
+        # Not memory-mapped: partial_fit updates the arrays in place
+        bundle = load_bundle(path, mmap_mode=None)
+        trained = bundle.get("trained_rows") or {"student_id": [], "hash": []}
+        trained = pd.Series(np.asarray(trained["hash"], dtype=np.int64),
+                            index=np.asarray(trained["student_id"], dtype=np.int64))
+        return bundle["models"]["online"], bundle["scaler"], bundle["encoders"], trained
+    model = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)
+    return model, StandardScaler(), None, pd.Series(dtype=np.int64)
+
+def changed_rows(features, trained):
+    """Rows of features whose hash differs from the one the online model last saw for that student."""
+    hashes = row_hashes(features)
+    seen = trained.reindex(features["student_id"].to_numpy(dtype=np.int64)).to_numpy()
+    changed = pd.isna(seen) | (seen != hashes)
+    return features[changed].reset_index(drop=True), hashes[changed]
+
+def partial_train(X, y, path=ONLINE_BUNDLE_PATH, epochs=5, encoders=None, trained=None, artifacts=None):
+    """
+    Update the online scaler and model with new rows only, then save a new bundle version.
+
+    Args:
+        X: Feature rows (same columns as training, see try1.split_features)
+        y: 0/1 target for those rows
+        epochs: Passes over the new rows (each is one partial_fit call)
+        encoders: Vocabularies X was encoded with, stored in the bundle
+        trained: Series of row hash by student_id to store as the bundle's watermark
+        artifacts: load_online_artifacts(path) if the caller already has it (default: loaded here)
+
+    Returns:
+        The saved bundle, or None if there was nothing to train on
+    """
+    model, scaler, _, _ = artifacts or load_online_artifacts(path)
+    if len(X) == 0:
+        return None
+
+    scaler.partial_fit(X)
+    X_scaled = scaler.transform(X)
+    y = np.asarray(y)
+    for _ in range(epochs):
+        model.partial_fit(X_scaled, y, classes=CLASSES)
+
+    extra = {}
+    if trained is not None:
+        extra["trained_rows"] = {"student_id": trained.index.to_numpy(dtype=np.int64),
+                                 "hash": trained.to_numpy(dtype=np.int64)}
+    return save_bundle({"online": model}, scaler, feature_names=X.columns, encoders=encoders,
+                       path=path, **extra)
+
+def update(features, path=ONLINE_BUNDLE_PATH, full_bundle_path=BUNDLE_PATH, epochs=5):
+    """
+    Fold the students of features that the online model has not seen as they are now.
+
+    Args:
+        features: Raw feature rows (try1.build_features / FeatureStore output)
+        full_bundle_path: Bundle whose encoders are reused on the first run, if it exists
+
+    Returns:
+        (rows trained on, saved bundle or None if nothing changed)
+    """
+    artifacts = load_online_artifacts(path)
+    _, _, encoders, trained = artifacts
+    new_rows, hashes = changed_rows(features, trained)
+    if not len(new_rows):
+        return new_rows, None
+    if encoders is None:
+        # First run: fix the vocabularies now so every later batch is encoded the same way
+        encoders = (load_bundle(full_bundle_path)["encoders"] if os.path.exists(full_bundle_path) else None) \
+            or try1.fit_encoders(new_rows)
+    X, y = try1.split_features(try1.encode_features(new_rows, encoders))
+    new = pd.Series(hashes, index=new_rows["student_id"].to_numpy(dtype=np.int64))
+    trained = pd.concat([trained[~trained.index.isin(new.index)], new[~new.index.duplicated(keep="last")]])
+    return new_rows, partial_train(X, y, path=path, epochs=epochs, encoders=encoders, trained=trained,
+                                   artifacts=artifacts)
+
+
+if __name__ == "__main__":
+    import time
+    import warnings
+
+    from sklearn.metrics import accuracy_score
+
+    import data_loader
+    from feature_store import FeatureStore
+    from inference import score_rows
+    from score_aggregator import ScoreAggregator
+
+    warnings.filterwarnings("ignore")
+    start = time.perf_counter()
+
+    scores, students, parents, mentors, attendance = try1.load_data()
+    sources = [path for _, path in data_loader.discover_shards()["Weekly_Scores"]]
+    score_agg = ScoreAggregator.load(sources=sources)
+    score_agg.fold_files(sources)
+    score_agg.save()
+    features = try1.build_features(scores, students, parents, mentors, attendance,
+                                   score_summary=score_agg.summary())
+
+    new_rows, bundle = update(features)
+    print(f"📥 {len(new_rows)} new or changed students since the last online update")
+    if bundle is None:
+        print("Online model already up to date, nothing written")
+    else:
+        labels, _, _ = score_rows(new_rows, "online")
+        y = (new_rows["Is_Declining_Attendance"] == "Yes").astype(int)
+        print(f"Accuracy on the new rows: {accuracy_score(y, labels):.4f}")
+        with FeatureStore() as store:
+            store.sync(new_rows, delete_missing=False)
+        print(f"✅ Online update done in {time.perf_counter() - start:.2f}s "
+              f"({ONLINE_BUNDLE_PATH}, version {bundle['version']})")
@@ -0,0 +1,13 @@
+import os
+
+# ========== Project Paths ==========
+# Resolved from this file so scripts work no matter which directory they are run from.
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ML_DIR, "data")
+MODELS_DIR = os.path.join(ML_DIR, "models")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+FEATURE_STORE_PATH = os.path.join(DATA_DIR, "features.db")
+OUTPUT_DIR = os.path.join(ML_DIR, "output")
+ALERTS_PATH = os.path.join(OUTPUT_DIR, "alerts.csv")
+ROLLUP_PATH = os.path.join(DATA_DIR, "risk_rollup.db")
+NOTIFICATIONS_DIR = os.path.join(os.path.dirname(ML_DIR), "notifications")
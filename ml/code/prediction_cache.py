@@ -0,0 +1,229 @@
+"""
+Bounded cache of risk predictions in front of the scorer.
+
+A prediction only changes when the student's feature row or the model
+changes, so entries are keyed by
+
+    (model_type, 64-bit hash of the input row)
+
+and tagged with the bundle version they were computed with. Lookups check
+the bundle's on-disk version (model_bundle.refresh_bundle) at most once
+every version_check_interval seconds, so a retrain in another process drops
+that model's entries and loads the new bundle within that interval (a
+retrain in this process is seen at once); lookups in between only compare
+against the bundle already in memory.
+
+    memory tier: LRU (OrderedDict) capped at max_entries, optional TTL in seconds
+    disk tier:   optional SQLite file (WAL) shared between processes and runs
+
+    from prediction_cache import PredictionCache
+    cache = PredictionCache(max_entries=50_000, ttl=7 * 24 * 3600)
+    results = predict_risk(rows, cache=cache)
+    cache.stats()    # hits, misses, evictions, expirations, invalidations, disk_hits
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+
+import numpy as np
+
+from feature_store import GET_CHUNK
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_VERSION_CHECK_INTERVAL = 1.0   # seconds between reads of a bundle's version file
+
+
+def input_hashes(rows):
+    """
+    Stable 64-bit hash per input row (blake2b of the sorted column names and the row's values in that order).
+
+    The names are part of the digest, so the same values under different
+    columns (a renamed or swapped feature) never share a cache entry.
+
+    Python's hash() is salted per process, and pandas' hash_pandas_object costs
+    milliseconds per call in fixed per-column overhead, which dwarfs scoring a
+    handful of rows; one object array and one digest per row keeps small
+    lookups cheap and the keys identical across processes for the disk tier.
+    """
+    names = np.asarray(rows.columns, dtype=str)
+    order = np.argsort(names, kind="stable")
+    header = repr(names[order].tolist()).encode()
+    values = rows.to_numpy(dtype=object)[:, order].tolist()
+    return np.fromiter(
+        (int.from_bytes(blake2b(header + repr(row).encode(), digest_size=8).digest(), "little", signed=True)
+         for row in values),
+        dtype=np.int64, count=len(values))
+
+
+class PredictionCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=None, disk_path=None,
+                 version_check_interval=DEFAULT_VERSION_CHECK_INTERVAL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._checked = {}              # model_type -> time.monotonic() of the last version file read
+        self._entries = OrderedDict()   # (model_type, row_hash) -> (label, score, level, stored_at)
+        self._versions = {}             # model_type -> bundle version of the cached entries
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.invalidations = self.disk_hits = 0
+
+        self._disk = None
+        if disk_path is not None:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " model_type TEXT NOT NULL, row_hash INTEGER NOT NULL, version TEXT NOT NULL,"
+                " label INTEGER NOT NULL, score REAL NOT NULL, level TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, PRIMARY KEY (model_type, row_hash))"
+            )
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+
+    # ========== Versioning ==========
+    def _current_version(self, model_type):
+        """Version of the bundle to serve; the version file is read at most every version_check_interval s."""
+        from model_bundle import bundle_path_for, get_bundle, refresh_bundle
+
+        path = bundle_path_for(model_type)
+        now = time.monotonic()
+        if now - self._checked.get(model_type, float("-inf")) < self.version_check_interval:
+            return get_bundle(path)["version"]
+        version = refresh_bundle(path)["version"]
+        self._checked[model_type] = now
+        return version
+
+    def _check_version(self, model_type, version):
+        """Drop entries computed with another bundle version of this model."""
+        if self._versions.get(model_type) == version:
+            return
+        stale = [key for key in self._entries if key[0] == model_type]
+        for key in stale:
+            del self._entries[key]
+        if self._disk is not None:
+            with self._disk:
+                self._disk.execute("DELETE FROM predictions WHERE model_type = ? AND version != ?",
+                                   (model_type, version))
+        if model_type in self._versions:
+            self.invalidations += 1
+        self._versions[model_type] = version
+
+    # ========== Tiers ==========
+    def _get_memory(self, model_type, hashes, now):
+        found = {}
+        for h in hashes:
+            key = (model_type, h)
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if self.ttl is not None and now - entry[3] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                continue
+            self._entries.move_to_end(key)
+            found[h] = entry
+        return found
+
+    def _get_disk(self, model_type, version, hashes, now):
+        found = {}
+        if self._disk is None or not hashes:
+            return found
+        oldest = now - self.ttl if self.ttl is not None else float("-inf")
+        for start in range(0, len(hashes), GET_CHUNK):
+            chunk = hashes[start:start + GET_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._disk.execute(
+                "SELECT row_hash, label, score, level, stored_at FROM predictions"
+                f" WHERE model_type = ? AND version = ? AND stored_at >= ? AND row_hash IN ({placeholders})",
+                [model_type, version, oldest, *chunk])
+            for h, label, score, level, stored_at in rows:
+                found[h] = (label, score, level, stored_at)
+        return found
+
+    def _put(self, model_type, entries):
+        for h, entry in entries.items():
+            self._entries[(model_type, h)] = entry
+            self._entries.move_to_end((model_type, h))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _put_disk(self, model_type, version, entries):
+        if self._disk is None or not entries:
+            return
+        with self._disk:
+            self._disk.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(model_type, h, version, *entry) for h, entry in entries.items()])
+
+    # ========== Scoring ==========
+    def score_rows(self, rows, model_type="logistic"):
+        """
+        Drop-in for inference.score_rows(): cached rows are served, the rest scored in one call.
+
+        Returns:
+            (labels, risk scores, Risk_Level array), in the order of rows
+        """
+        from inference import score_rows
+
+        # Picks up a bundle retrained by any process (within version_check_interval)
+        version = self._current_version(model_type)
+        hashes = input_hashes(rows).tolist()
+        now = time.time()
+
+        with self._lock:
+            self._check_version(model_type, version)
+            found = self._get_memory(model_type, hashes, now)
+            missing = [h for h in dict.fromkeys(hashes) if h not in found]
+            from_disk = self._get_disk(model_type, version, missing, now)
+            if from_disk:
+                self.disk_hits += len(from_disk)
+                self._put(model_type, from_disk)
+                found.update(from_disk)
+
+        todo = np.array([h not in found for h in hashes])
+        with self._lock:
+            self.hits += int(len(hashes) - todo.sum())
+            self.misses += int(todo.sum())
+
+        if todo.any():
+            labels, scores, levels = score_rows(rows[todo], model_type)
+            fresh = {h: (int(l), float(s), str(v), now)
+                     for h, l, s, v in zip(np.asarray(hashes)[todo].tolist(), labels, scores, levels)}
+            with self._lock:
+                self._put(model_type, fresh)
+                self._put_disk(model_type, version, fresh)
+            found.update(fresh)
+
+        entries = [found[h] for h in hashes]
+        return (np.array([e[0] for e in entries], dtype=np.int8),
+                np.array([e[1] for e in entries], dtype=np.float64),
+                np.array([e[2] for e in entries], dtype=object))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            if self._disk is not None:
+                with self._disk:
+                    self._disk.execute("DELETE FROM predictions")
+
+    def stats(self):
+        """Counters since the cache was created, plus the current size and hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,228 @@
+"""
+Materialized risk rollup per (institute_id, mentor_id, week), kept up to date as scores are written.
+
+    from risk_rollup import RiskRollup
+    with RiskRollup() as rollup:
+        rollup.add(chunk, risk_scores, risk_levels)          # after scoring a chunk
+        rollup.query(institute_id=1, week=12)                # High-risk count per mentor in week 12
+        rollup.query(institute_id=1, by=("institute_id", "week"))   # institute trend
+
+`week` is the data's week_id (the N of Week_N_Attendance), not the date the
+scores were written: a student's scores are filed under the latest week
+with attendance recorded in its row, so re-running batch scoring later, or
+on a backfilled term, lands in the right week.
+
+Each cell stores the number of students scored, the sum of their
+Risk_Score and a Low / Medium / High histogram, so the mean and any
+coarser rollup (per institute, per week, ...) are SUM()s over cells. A
+query touches a few hundred rows of a small SQLite file instead of
+rescoring everyone.
+
+Updates are incremental: add() works out, for the rows passed in, how each
+cell changes and applies those deltas with one UPSERT per cell touched.
+The latest score per (student_id, week) is kept alongside, so scoring a
+student again for the same week (a second batch run, a retrained model, a
+mentor reassignment) replaces its previous contribution instead of
+counting it twice. Each add() is one transaction; several batch-scoring
+processes can write to the same file.
+
+    python code/risk_rollup.py --institute 1            # per-mentor table, latest week
+    python code/risk_rollup.py --by institute_id week --all-weeks   # trend per institute
+"""
+import argparse
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from attendance_features import WEEK_PATTERN, week_columns
+from compiled_model import RISK_LEVELS
+from paths import ROLLUP_PATH
+
+KEYS = ("institute_id", "mentor_id", "week")
+LEVEL_COLUMNS = [level.lower() for level in RISK_LEVELS]
+SCHEMA_VERSION = 1      # stored as PRAGMA user_version, for a future migration to check
+
+
+def data_weeks(rows):
+    """
+    Week each row's scores belong to: the latest week with attendance recorded (0 if none).
+
+    Raises:
+        ValueError: rows have no Week_N_Attendance columns
+    """
+    columns = week_columns(rows)
+    if not columns:
+        raise ValueError("rows have no Week_N_Attendance columns to take the week from; pass week=")
+    numbers = np.array([int(WEEK_PATTERN.match(c).group(1)) for c in columns], dtype=np.int64)
+    present = rows[columns].notna().to_numpy()
+    last = present.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+    return np.where(present.any(axis=1), numbers[last], 0)
+
+
+class RiskRollup:
+    def __init__(self, path=ROLLUP_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        levels = ", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in LEVEL_COLUMNS)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollup ("
+            " institute_id INTEGER NOT NULL, mentor_id INTEGER NOT NULL, week INTEGER NOT NULL,"
+            f" students INTEGER NOT NULL, sum_risk REAL NOT NULL, {levels},"
+            " PRIMARY KEY (institute_id, mentor_id, week)) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS rollup_week ON rollup (week, institute_id)")
+        # Latest contribution of every student to every week, so rescoring replaces instead of adds
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS student_scores ("
+            " student_id INTEGER NOT NULL, week INTEGER NOT NULL, institute_id INTEGER NOT NULL,"
+            " mentor_id INTEGER NOT NULL, risk_score REAL NOT NULL, risk_level INTEGER NOT NULL,"
+            " PRIMARY KEY (student_id, week)) WITHOUT ROWID"
+        )
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ========== Updates ==========
+    def add(self, rows, risk_scores, risk_levels, week=None):
+        """
+        Fold one batch of freshly scored students into the rollup.
+
+        Args:
+            rows: DataFrame with student_id, institute_id and mentor_id (e.g. a feature store chunk)
+            risk_scores: Risk_Score per row
+            risk_levels: Risk_Level per row ("Low", "Medium" or "High")
+            week: week_id for every row (default: each row's own, see data_weeks;
+                  rows without any attendance are left out)
+
+        Returns:
+            Number of rollup cells changed
+        """
+        new = pd.DataFrame({
+            "student_id": rows["student_id"].to_numpy(dtype=np.int64),
+            "institute_id": rows["institute_id"].to_numpy(dtype=np.int64),
+            "mentor_id": rows["mentor_id"].to_numpy(dtype=np.int64),
+            "risk_score": np.asarray(risk_scores, dtype=np.float64),
+            "risk_level": pd.Categorical(np.asarray(risk_levels), categories=RISK_LEVELS).codes.astype(np.int64),
+            "week": data_weeks(rows) if week is None else np.full(len(rows), int(week), dtype=np.int64),
+        })
+        if (new["risk_level"] < 0).any():
+            raise ValueError(f"risk_levels must be one of {list(RISK_LEVELS)}")
+        new = new[new["week"] > 0].drop_duplicates("student_id", keep="last")
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Scores these students already have in their weeks (usually all one week)
+            old = [self._previous(ids.tolist(), int(w)) for w, ids in new.groupby("week", sort=False)["student_id"]]
+            old = pd.concat(old, ignore_index=True) if old else pd.DataFrame()
+            # +1 for every new score, -1 for the score it replaces
+            deltas = pd.concat([new.assign(sign=1), old.assign(sign=-1)], ignore_index=True)
+            cells = self._cell_deltas(deltas)
+            self.conn.executemany(
+                f"INSERT INTO rollup (institute_id, mentor_id, week, students, sum_risk, {', '.join(LEVEL_COLUMNS)})"
+                f" VALUES (?, ?, ?, ?, ?, {', '.join('?' * len(LEVEL_COLUMNS))})"
+                " ON CONFLICT (institute_id, mentor_id, week) DO UPDATE SET"
+                " students = students + excluded.students, sum_risk = sum_risk + excluded.sum_risk, "
+                + ", ".join(f"{c} = {c} + excluded.{c}" for c in LEVEL_COLUMNS),
+                cells.itertuples(index=False, name=None))
+            self.conn.execute("DELETE FROM rollup WHERE students = 0")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO student_scores"
+                " (student_id, week, institute_id, mentor_id, risk_score, risk_level) VALUES (?, ?, ?, ?, ?, ?)",
+                new[["student_id", "week", "institute_id", "mentor_id", "risk_score", "risk_level"]]
+                .itertuples(index=False, name=None))
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return len(cells)
+
+    def _previous(self, student_ids, week):
+        """Scores already recorded for week for student_ids (fetched in chunks under SQLite's variable limit)."""
+        parts = []
+        for start in range(0, len(student_ids), 900):
+            ids = student_ids[start:start + 900]
+            parts.append(pd.read_sql_query(
+                "SELECT student_id, institute_id, mentor_id, risk_score, risk_level, week FROM student_scores"
+                f" WHERE week = ? AND student_id IN ({', '.join('?' * len(ids))})", self.conn, params=[week, *ids]))
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    @staticmethod
+    def _cell_deltas(deltas):
+        """Signed changes per (institute_id, mentor_id, week): students, sum_risk and one column per level."""
+        deltas = deltas.astype({"sign": np.int64, "risk_level": np.int64})
+        for code, column in enumerate(LEVEL_COLUMNS):
+            deltas[column] = (deltas["risk_level"] == code) * deltas["sign"]
+        deltas["sum_risk"] = deltas["risk_score"] * deltas["sign"]
+        cells = deltas.groupby(list(KEYS), sort=False).agg(
+            students=("sign", "sum"), sum_risk=("sum_risk", "sum"), **{c: (c, "sum") for c in LEVEL_COLUMNS})
+        cells = cells.reset_index()
+        # Rescoring with the same cell and level changes nothing worth writing
+        changed = (cells[["students", *LEVEL_COLUMNS]] != 0).any(axis=1) | (cells["sum_risk"].abs() > 1e-12)
+        cells = cells[changed]
+        return cells.astype({"institute_id": object, "mentor_id": object, "week": object, "students": object,
+                             **{c: object for c in LEVEL_COLUMNS}})   # Python ints for sqlite3
+
+    # ========== Queries ==========
+    def query(self, institute_id=None, mentor_id=None, week=None, since=None, by=KEYS):
+        """
+        Rolled-up risk, grouped by any of institute_id / mentor_id / week.
+
+        Args:
+            institute_id, mentor_id, week: Only these cells (None for all)
+            since: Only weeks from this week_id on
+            by: Keys to group by (the rest are summed over)
+
+        Returns:
+            DataFrame with the by columns, students, mean_risk, Low, Medium, High
+        """
+        by = list(by)
+        if not set(by) <= set(KEYS):
+            raise ValueError(f"by must be a subset of {KEYS}, got {by}")
+        where, params = [], []
+        for column, value in (("institute_id", institute_id), ("mentor_id", mentor_id), ("week", week)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("week >= ?")
+            params.append(since)
+        select = ", ".join(by + ["SUM(students) AS students", "SUM(sum_risk) / SUM(students) AS mean_risk"]
+                           + [f"SUM({c}) AS {level}" for c, level in zip(LEVEL_COLUMNS, RISK_LEVELS)])
+        sql = f"SELECT {select} FROM rollup"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if by:
+            sql += f" GROUP BY {', '.join(by)} ORDER BY {', '.join(by)}"
+        out = pd.read_sql_query(sql, self.conn, params=params)
+        return out[out["students"].notna()].reset_index(drop=True)
+
+    def weeks(self):
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT week FROM rollup ORDER BY week")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the risk rollup written by batch scoring.")
+    parser.add_argument("--db", default=ROLLUP_PATH)
+    parser.add_argument("--institute", type=int, default=None)
+    parser.add_argument("--mentor", type=int, default=None)
+    parser.add_argument("--week", type=int, default=None, help="week_id (default: the latest one)")
+    parser.add_argument("--all-weeks", action="store_true", help="every week instead of one")
+    parser.add_argument("--by", nargs="+", default=list(KEYS), choices=list(KEYS))
+    args = parser.parse_args()
+    with RiskRollup(args.db) as rollup:
+        week = None if args.all_weeks else args.week or (rollup.weeks() or [None])[-1]
+        start = time.perf_counter()
+        table = rollup.query(args.institute, args.mentor, week, by=args.by)
+        print(table.to_string(index=False))
+        print(f"⏱️ {len(table)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
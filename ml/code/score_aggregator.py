@@ -0,0 +1,209 @@
+"""
+Incremental per-student aggregation of Weekly_Scores.
+
+prepare_dataset() only needs the mean test_score / max_score per student.
+Means are sums over counts, so instead of re-running a groupby over every
+score row ever recorded we keep running sums and counts per student, persist
+them, and fold in only the rows added since the last run.
+
+The weekly score files are appended to in place, so the state remembers,
+per source file, how many bytes have been folded in and a SHA-1 of those
+bytes. fold_files() checks that each file still starts with exactly those
+bytes and parses only what comes after them: O(new rows), however long the
+file has grown. A file whose folded part changed (a corrected score, a
+truncated or replaced file) starts the aggregate over from all files, and
+so does loading it for a different set of files (a removed institute,
+another data directory).
+
+Usage:
+    agg = ScoreAggregator.load(sources=weekly_score_paths)
+    agg.fold_files(weekly_score_paths)  # O(rows appended since the last run)
+    agg.save()
+    score_summary = agg.summary()       # same columns as the groupby in prepare_dataset
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from paths import CACHE_DIR
+
+DEFAULT_STATE_PATH = os.path.join(CACHE_DIR, "score_aggregate.npz")
+SCORE_COLUMNS = ["student_id", "test_score", "max_score"]
+HASH_BLOCK = 1 << 20
+
+
+def _read_appended(path, saved):
+    """
+    Bytes of path after the part already folded in.
+
+    Args:
+        saved: What was recorded for path last time ({offset, sha1, size, mtime_ns}), or None
+
+    Returns:
+        (header line, appended bytes, new record for path), or None if the first
+        saved["offset"] bytes are no longer the ones folded in
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        header = f.readline()
+        offset = saved["offset"] if saved else 0
+        if saved:
+            if st.st_size < offset:
+                return None
+            if st.st_size == offset and st.st_mtime_ns == saved["mtime_ns"]:
+                return header, b"", saved                   # untouched since the last run
+            if st.st_size > offset and not saved["newline"]:
+                return None                                 # the last folded row was extended
+        f.seek(0)
+        digest = hashlib.sha1()
+        remaining = offset
+        while remaining:
+            block = f.read(min(HASH_BLOCK, remaining))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+        if saved and digest.hexdigest() != saved["sha1"]:
+            return None
+        appended = f.read()
+    digest.update(appended)
+    end = offset + len(appended)
+    newline = appended.endswith(b"\n") if appended else saved["newline"] if saved else True
+    record = {"offset": end, "sha1": digest.hexdigest(), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+              "newline": newline}
+    if offset == 0:
+        appended = appended[len(header):]
+    return header, appended, record
+
+
+class ScoreAggregator:
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self.student_ids = np.empty(0, dtype=np.int64)   # kept sorted
+        self.sum_test = np.empty(0, dtype=np.float64)
+        self.sum_max = np.empty(0, dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.sources = {}                                # {absolute path: what has been folded in}
+
+    # ========== Persistence ==========
+    @classmethod
+    def load(cls, path=DEFAULT_STATE_PATH, sources=None):
+        """
+        Load saved state, or start empty if nothing has been saved yet.
+
+        Args:
+            sources: Paths of the score files about to be folded in. The saved
+                     state is discarded unless every file it was built from is
+                     among them (None: no check).
+        """
+        agg = cls(path)
+        if not os.path.exists(path):
+            return agg
+        with np.load(path) as state:
+            saved = json.loads(str(state["sources"])) if "sources" in state else None
+            if not isinstance(saved, dict) or not all(isinstance(v, dict) for v in saved.values()):
+                return agg                                   # written by an older version
+            if sources is not None and not set(saved) <= {os.path.abspath(p) for p in sources}:
+                return agg
+            agg.student_ids = state["student_ids"]
+            agg.sum_test = state["sum_test"]
+            agg.sum_max = state["sum_max"]
+            agg.counts = state["counts"]
+            agg.sources = saved
+        return agg
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, student_ids=self.student_ids, sum_test=self.sum_test,
+                     sum_max=self.sum_max, counts=self.counts,
+                     sources=np.array(json.dumps(self.sources, sort_keys=True)))
+        os.replace(tmp, self.path)
+
+    # ========== Updates ==========
+    def fold_files(self, paths):
+        """
+        Fold in the rows appended to each score file since it was last folded in.
+
+        If a file no longer starts with the bytes already folded in, the
+        aggregate is rebuilt from scratch from all of paths.
+
+        Returns:
+            int: number of rows folded in
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        reads = []
+        for path in paths:
+            read = _read_appended(path, self.sources.get(path))
+            if read is None:
+                self.__init__(self.path)
+                return self.fold_files(paths)
+            reads.append((path, read))
+        folded = 0
+        for path, (header, appended, record) in reads:
+            if appended.strip():
+                rows = pd.read_csv(io.BytesIO(header + appended), usecols=SCORE_COLUMNS, encoding="utf-8")
+                folded += self.update(rows)
+            self.sources[path] = record
+        return folded
+
+    def update(self, rows):
+        """
+        Add score rows to the running sums (every row counts: pass only new ones).
+
+        Returns:
+            int: number of rows folded in
+        """
+        if len(rows) == 0:
+            return 0
+
+        ids, inverse = np.unique(rows["student_id"].to_numpy(dtype=np.int64), return_inverse=True)
+        add_test = np.bincount(inverse, weights=rows["test_score"].to_numpy(dtype=np.float64))
+        add_max = np.bincount(inverse, weights=rows["max_score"].to_numpy(dtype=np.float64))
+        add_count = np.bincount(inverse).astype(np.int64)
+
+        pos = np.searchsorted(self.student_ids, ids)
+        known = pos < len(self.student_ids)
+        known[known] = self.student_ids[pos[known]] == ids[known]
+
+        self.sum_test[pos[known]] += add_test[known]
+        self.sum_max[pos[known]] += add_max[known]
+        self.counts[pos[known]] += add_count[known]
+
+        if not known.all():
+            # New students: append and restore sorted order (rare after the first week)
+            new = ~known
+            student_ids = np.concatenate([self.student_ids, ids[new]])
+            order = np.argsort(student_ids, kind="stable")
+            self.student_ids = student_ids[order]
+            self.sum_test = np.concatenate([self.sum_test, add_test[new]])[order]
+            self.sum_max = np.concatenate([self.sum_max, add_max[new]])[order]
+            self.counts = np.concatenate([self.counts, add_count[new]])[order]
+        return len(rows)
+
+    # ========== Output ==========
+    def summary(self):
+        """Per-student score summary, matching the groupby in prepare_dataset()."""
+        counts = np.maximum(self.counts, 1)
+        summary = pd.DataFrame({
+            "student_id": self.student_ids,
+            "test_score": self.sum_test / counts,
+            "max_score": self.sum_max / counts,
+        })
+        summary["avg_score_ratio"] = summary["test_score"] / summary["max_score"]
+        return summary
+
+
+if __name__ == "__main__":
+    # Fold whatever was appended to the weekly score files into the saved aggregate:
+    #   python code/score_aggregator.py data/Weekly_Scores_Institute1.csv ...
+    agg = ScoreAggregator.load(sources=sys.argv[1:])
+    folded = agg.fold_files(sys.argv[1:])
+    agg.save()
+    print(f"✅ Folded {folded} new rows; aggregate covers {len(agg.student_ids)} students")
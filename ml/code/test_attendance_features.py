@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attendance_features import TREND_COLUMNS, longest_streak, slope, trend_features
+from try1 import split_features
+
+
+def _matrix(rows):
+    return np.array(rows, dtype=np.float32)
+
+def test_slope_ignores_missing_weeks():
+    out = slope(_matrix([[100, 90, np.nan, 70], [50, 40, 80, 30], [np.nan] * 4]))
+    assert out[:2] == pytest.approx([-10.0, -2.0]) and np.isnan(out[2])
+
+def test_recent_drop_and_rolling_minimum():
+    features = trend_features(_matrix([[100, 100, 90, 60, 60, 60], [80, np.nan, 80, 70, np.nan, 70]]))
+    assert features["Recent_Attendance_Mean"] == pytest.approx([60.0, 70.0])
+    assert features["Baseline_Attendance_Mean"] == pytest.approx([96.6667, 80.0], rel=1e-4)
+    assert features["Recent_Attendance_Drop"] == pytest.approx([36.6667, 10.0], rel=1e-4)
+    assert features["Min_Rolling_Attendance"] == pytest.approx([60.0, 70.0])
+
+def test_low_streak_is_broken_by_good_and_missing_weeks():
+    mask = _matrix([[50, 40, 80, 30], [50, np.nan, 40, 30], [90, 90, 90, 90]]) < 60
+    assert longest_streak(mask).tolist() == [2, 2, 0]
+    assert longest_streak(np.zeros((2, 0), dtype=bool)).tolist() == [0, 0]
+
+def test_short_semesters_still_give_every_feature():
+    one_week = trend_features(_matrix([[80]]))
+    assert one_week["Recent_Attendance_Mean"].tolist() == [80.0] and one_week["Recent_Attendance_Drop"].tolist() == [0.0]
+    assert np.isnan(one_week["Attendance_Slope"][0])
+    no_weeks = trend_features(np.empty((2, 0), dtype=np.float32))
+    assert set(no_weeks) == set(TREND_COLUMNS) and all(len(v) == 2 for v in no_weeks.values())
+
+def test_model_features_do_not_depend_on_the_number_of_weeks():
+    def semester(weeks):
+        df = pd.DataFrame({"student_id": [1, 2], "Average_Attendance": [80.0, 60.0],
+                           "Is_Declining_Attendance": ["No", "Yes"]})
+        for week in range(1, weeks + 1):
+            df[f"Week_{week}_Attendance"] = [80, 60]
+        return df.assign(**trend_features(df.filter(like="Week_").to_numpy(dtype=np.float32)))
+    assert split_features(semester(12))[0].columns.tolist() == split_features(semester(16))[0].columns.tolist()
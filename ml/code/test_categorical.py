@@ -0,0 +1,50 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from categorical import CategoryEncoder, as_encoder, encode_columns, fit_encoders
+
+
+NAMES = pd.Series(["Ravi", "Asha", "Meera", "Asha", "Kabir"])
+
+def test_known_values_match_label_encoder():
+    encoder = CategoryEncoder.fit(NAMES)
+    assert (encoder.encode(NAMES) == LabelEncoder().fit_transform(NAMES)).all()
+
+def test_unknown_values_share_one_bucket():
+    encoder = CategoryEncoder.fit(NAMES)
+    codes = encoder.encode(["Zoya", "Asha", np.nan])
+    assert codes.tolist() == [encoder.unknown_code, 0, encoder.unknown_code]
+
+def test_codes_do_not_depend_on_batch():
+    encoder = CategoryEncoder.fit(NAMES)
+    assert encoder.encode(NAMES[:2]).tolist() == encoder.encode(NAMES).tolist()[:2]
+
+def test_pickle_keeps_vocabulary_only():
+    encoder = CategoryEncoder.fit(NAMES)
+    encoder.encode(NAMES)
+    restored = pickle.loads(pickle.dumps(encoder))
+    assert restored._index is None
+    assert (restored.encode(NAMES) == encoder.encode(NAMES)).all()
+
+def test_bare_vocabulary_from_older_bundles():
+    assert as_encoder(np.array(["Asha", "Ravi"], dtype=object)).encode(["Ravi"]).tolist() == [1]
+
+def test_high_cardinality_columns_are_dropped():
+    df = pd.DataFrame({"student_name": NAMES, "mentor_name": ["M1"] * 5, "score": range(5)})
+    encoders = fit_encoders(df, ["student_name", "mentor_name"], max_cardinality=2)
+    assert list(encoders) == ["mentor_name"]
+    encoded = encode_columns(df.copy(), encoders, ["student_name", "mentor_name"])
+    assert list(encoded.columns) == ["mentor_name", "score"]
+
+
+if __name__ == "__main__":
+    test_known_values_match_label_encoder()
+    test_unknown_values_share_one_bucket()
+    test_codes_do_not_depend_on_batch()
+    test_pickle_keeps_vocabulary_only()
+    test_bare_vocabulary_from_older_bundles()
+    test_high_cardinality_columns_are_dropped()
+    print("✅ Category encoders OK")
@@ -0,0 +1,55 @@
+import warnings
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from compiled_model import compile_model, score
+from try1 import load_data, prepare_dataset, split_features
+
+warnings.filterwarnings("ignore")
+
+
+def _dataset():
+    X, y = split_features(prepare_dataset(*load_data()))
+    scaler = StandardScaler().fit(X)
+    return X, y, scaler
+
+def _check_parity(model, X, scaler):
+    X_scaled = scaler.transform(X)
+    expected_labels = model.predict(X_scaled)
+    expected_proba = model.predict_proba(X_scaled)[:, 1]
+
+    labels, proba, levels = score(compile_model(model, scaler), X.to_numpy(dtype=np.float32))
+
+    assert np.allclose(proba, expected_proba, atol=1e-5)
+    # Labels and levels may only differ for scores sitting right on a cut-off
+    decided = np.abs(expected_proba - 0.5) > 1e-5
+    assert (labels[decided] == expected_labels[decided]).all()
+    expected_levels = np.where(expected_proba > 0.7, "High", np.where(expected_proba > 0.3, "Medium", "Low"))
+    clear = (np.abs(expected_proba - 0.3) > 1e-5) & (np.abs(expected_proba - 0.7) > 1e-5)
+    assert (levels[clear] == expected_levels[clear]).all()
+
+def test_logistic_matches_sklearn():
+    X, y, scaler = _dataset()
+    model = LogisticRegression(max_iter=1000).fit(scaler.transform(X), y)
+    _check_parity(model, X, scaler)
+
+def test_sgd_matches_sklearn():
+    X, y, scaler = _dataset()
+    model = SGDClassifier(loss="log_loss", random_state=42).fit(scaler.transform(X), y)
+    _check_parity(model, X, scaler)
+
+def test_tree_matches_sklearn():
+    X, y, scaler = _dataset()
+    for depth in (3, 5, None):
+        model = DecisionTreeClassifier(max_depth=depth, random_state=42).fit(scaler.transform(X), y)
+        _check_parity(model, X, scaler)
+
+
+if __name__ == "__main__":
+    test_logistic_matches_sklearn()
+    test_sgd_matches_sklearn()
+    test_tree_matches_sklearn()
+    print("✅ Compiled scoring matches sklearn")
@@ -0,0 +1,25 @@
+import os
+
+import pandas as pd
+
+from data_cache import build_cache, read_csv_cached
+
+
+def test_rebuilding_unchanged_content_keeps_the_cache_loadable(tmp_path):
+    path = tmp_path / "Students_Institute1.csv"
+    pd.DataFrame({"student_id": [1, 2, 3], "student_name": ["A", None, "C"],
+                  "Week_1_Attendance": [90, 80, 70]}).to_csv(path, index=False)
+    cache_dir = str(tmp_path / "cache")
+    first = build_cache(str(path), cache_dir)
+    second = build_cache(str(path), cache_dir)      # e.g. after a corrupt meta.json
+    assert second["columns"] == first["columns"]
+
+    df = read_csv_cached(str(path), cache_dir=cache_dir)
+    assert df["student_id"].tolist() == [1, 2, 3] and df["student_name"].isna().tolist() == [False, True, False]
+
+    # Changed content replaces the old column files instead of piling up next to them
+    pd.DataFrame({"student_id": [4], "student_name": ["D"], "Week_1_Attendance": [60]}).to_csv(path, index=False)
+    build_cache(str(path), cache_dir)
+    entry_dir = os.path.dirname(next(tmp_path.glob("cache/*/meta.json")))
+    assert len(os.listdir(entry_dir)) == 4
+    assert read_csv_cached(str(path), cache_dir=cache_dir)["student_id"].tolist() == [4]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_store import FeatureStore, row_hashes
+
+
+def _features(n=6):
+    return pd.DataFrame({
+        "student_id": np.arange(1, n + 1, dtype=np.int64),
+        "institute_id": np.array([1, 1, 1, 2, 2, 2][:n], dtype=np.int64),
+        "student_name": [f"S{i}" for i in range(1, n + 1)],
+        "Week_1_Attendance": np.array([90, 80, 70, 60, 50, 40][:n], dtype=np.int64),
+        "Attendance_Slope": [0.5, -1.0, np.nan, 0.0, 2.5, -0.5][:n],
+    })
+
+@pytest.fixture
+def store(tmp_path):
+    with FeatureStore(str(tmp_path / "features.db")) as store:
+        yield store
+
+def test_sync_writes_only_changed_rows_and_reads_back(store):
+    features = _features()
+    assert store.sync(features) == 6 and store.sync(features) == 0
+    features.loc[2, "Week_1_Attendance"] = 10
+    assert store.sync(features) == 1
+    assert store.get([3, 1])["student_id"].tolist() == [3, 1]
+    assert store.get(3)["Week_1_Attendance"].tolist() == [10]
+    assert [len(c) for c in store.iter_chunks(chunk_size=2, institute_id=2)] == [2, 1]
+
+def test_hashes_ignore_dtypes(store):
+    features = _features()
+    compact = features.astype({"student_id": np.int32, "institute_id": np.int32, "Week_1_Attendance": np.uint8,
+                               "student_name": "category"})
+    assert (row_hashes(features) == row_hashes(compact)).all()
+    store.sync(features)
+    assert store.sync(compact) == 0
+    # Rows read back from SQLite hash the same as well
+    assert (row_hashes(store.read_all()) == row_hashes(features)).all()
+
+def test_students_missing_from_the_source_are_deleted_per_institute(store):
+    store.sync(_features())
+    institute_1 = _features()[lambda df: (df["institute_id"] == 1) & (df["student_id"] != 2)]
+    store.sync(institute_1)
+    assert store.last_deleted == 1
+    assert store.read_all()["student_id"].tolist() == [1, 3, 4, 5, 6]
+    store.sync(institute_1.iloc[:1], delete_missing=False)
+    assert store.last_deleted == 0 and len(store.read_all()) == 5
+
+def test_new_weeks_are_added_to_the_schema(store):
+    store.sync(_features())
+    week_2 = _features()
+    week_2.insert(4, "Week_2_Attendance", np.array([85, 75, 65, 55, 45, 35], dtype=np.int64))
+    assert store.sync(week_2) == 6
+    assert store.columns == list(week_2.columns)
+    assert store.get(2)["Week_2_Attendance"].tolist() == [75]
+    # Reopened stores see the new column; a source without it stores the week as missing
+    with FeatureStore(store.path) as reopened:
+        assert reopened.columns == store.columns
+        assert reopened.sync(_features()) == 6
+        assert reopened.read_all()["Week_2_Attendance"].isna().all()
+
+def test_other_schema_changes_need_a_new_version(store):
+    store.sync(_features())
+    with pytest.raises(ValueError, match="FEATURE_SET_VERSION"):
+        store.sync(_features().assign(Attendance_Drop=0.0))
@@ -0,0 +1,75 @@
+import json
+import tracemalloc
+
+import pytest
+
+import instrumentation
+from instrumentation import instrument, stage
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    log = tmp_path / "stages.jsonl"
+    instrumentation.reset()
+    instrumentation.enable(log_path=str(log))
+    yield log
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_disabled_records_nothing():
+    instrumentation.reset()
+    with stage("load") as s:
+        s.rows = 10
+    assert instrumentation.snapshot()["stages"] == {}
+
+def test_stage_records_time_memory_and_rows(metrics):
+    with stage("join") as s:
+        data = [bytes(1000) for _ in range(1000)]
+        s.rows = len(data)
+    record = instrumentation.snapshot()["stages"]["join"]
+    assert record["calls"] == 1 and record["rows"] == 1000
+    assert record["wall_s"] > 0 and record["peak_mem_bytes"] >= 1_000_000
+    assert json.loads(metrics.read_text().splitlines()[0])["stage"] == "join"
+
+def test_nested_peak_reaches_the_outer_stage(metrics):
+    with stage("outer"):
+        with stage("inner"):
+            data = bytearray(5_000_000)
+        del data
+    stages = instrumentation.snapshot()["stages"]
+    assert stages["outer"]["peak_mem_bytes"] >= stages["inner"]["peak_mem_bytes"] >= 5_000_000
+
+def test_decorator_counts_rows_and_errors(metrics):
+    @instrument("encode", rows=len)
+    def encode(values):
+        if not values:
+            raise ValueError("empty")
+        return values
+
+    encode([1, 2, 3])
+    with pytest.raises(ValueError):
+        encode([])
+    record = instrumentation.snapshot()["stages"]["encode"]
+    assert record["calls"] == 2 and record["errors"] == 1 and record["rows"] == 3
+
+def test_prometheus_text(metrics):
+    with stage("fit.tree", rows=5):
+        pass
+    text = instrumentation.to_prometheus()
+    assert "# TYPE pipeline_stage_seconds_total counter" in text
+    assert 'pipeline_stage_rows_total{stage="fit.tree"} 5' in text
+
+def test_a_callers_own_tracemalloc_session_is_left_alone():
+    tracemalloc.start()
+    try:
+        data = bytearray(5_000_000)
+        del data
+        instrumentation.enable()
+        with stage("load"):
+            pass
+        instrumentation.disable()
+        assert tracemalloc.is_tracing() and tracemalloc.get_traced_memory()[1] >= 5_000_000
+        assert instrumentation.snapshot()["stages"]["load"]["peak_mem_bytes"] == 0     # not measured
+    finally:
+        tracemalloc.stop()
+        instrumentation.reset()
@@ -0,0 +1,44 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+import model_search
+
+
+class SlowModel(ClassifierMixin, BaseEstimator):
+    def __init__(self, seconds=5.0):
+        self.seconds = seconds
+
+    def fit(self, X, y):
+        time.sleep(self.seconds)
+        self.classes_ = np.unique(y)
+        return self
+
+    def predict(self, X):
+        return np.zeros(len(X), dtype=int)
+
+def _data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(loc=50, scale=10, size=(n, 3))
+    return X, (X[:, 0] + X[:, 1] > 100).astype(int)
+
+def test_best_candidate_is_a_scaled_pipeline():
+    X, y = _data()
+    leaderboard, best = model_search.search(X, y, grid={"logistic": {"C": [0.1, 1.0]}}, n_folds=3, max_workers=1)
+    assert list(best.named_steps) == ["scaler", "model"] and len(leaderboard) == 2
+    assert best.named_steps["scaler"].mean_ == pytest.approx(X.mean(axis=0))
+
+# Workers must inherit the patched MODELS, which only a forked child does
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs the fork start method")
+def test_time_budget_does_not_wait_for_running_fits(monkeypatch):
+    monkeypatch.setitem(model_search.MODELS, "slow", lambda **p: SlowModel(**p))
+    X, y = _data()
+    start = time.monotonic()
+    leaderboard, best = model_search.search(
+        X, y, grid={"logistic": {"C": [1.0]}, "slow": {"seconds": [30.0]}}, n_folds=2, max_workers=2,
+        time_budget=3.0, mp_context=multiprocessing.get_context("fork"))
+    assert time.monotonic() - start < 6.0
+    assert leaderboard["model"].tolist() == ["logistic"] and best.predict(X[:5]).shape == (5,)
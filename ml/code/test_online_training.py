@@ -0,0 +1,79 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_bundle
+import online_training
+import try1
+from inference import score_rows
+
+warnings.filterwarnings("ignore")
+
+
+def _features(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    attendance = rng.uniform(40, 100, size=n)
+    return pd.DataFrame({
+        "student_id": np.arange(n), "institute_id": 1, "mentor_id": np.arange(n) % 5,
+        "parent_id": np.arange(n) + 1000,
+        "student_name": [f"S{i}" for i in range(n)], "mentor_name": [f"M{i % 5}" for i in range(n)],
+        "Average_Attendance": attendance, "test_score": rng.uniform(0, 100, size=n),
+        "Is_Declining_Attendance": np.where(attendance < 70, "Yes", "No"),
+    })
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    full, online = str(tmp_path / "model_bundle.joblib"), str(tmp_path / "online_bundle.joblib")
+    monkeypatch.setitem(model_bundle.MODEL_TYPES, "logistic", full)
+    monkeypatch.setitem(model_bundle.MODEL_TYPES, "online", online)
+    yield full, online
+    model_bundle.clear_cache()
+
+def test_online_update_after_training(paths):
+    full, online = paths
+    features = _features()
+    encoders = try1.fit_encoders(features)
+    try1.train_model(try1.encode_features(features, encoders), encoders=encoders,
+                     models_dir=os.path.dirname(full))
+
+    # Training first must not hide the rows from the online model
+    new_rows, bundle = online_training.update(features, path=online, full_bundle_path=full)
+    assert len(new_rows) == len(features) and bundle is not None and os.path.exists(online)
+    assert set(bundle["encoders"]) == set(encoders)
+    labels, risk_scores, _ = score_rows(features, "online")
+    assert len(labels) == len(features) and ((risk_scores >= 0) & (risk_scores <= 1)).all()
+
+    # Nothing changed: nothing trained, nothing written
+    new_rows, bundle = online_training.update(features, path=online, full_bundle_path=full)
+    assert len(new_rows) == 0 and bundle is None
+
+    features.loc[3, "Average_Attendance"] = 10.0
+    new_rows, bundle = online_training.update(features, path=online, full_bundle_path=full)
+    assert new_rows["student_id"].tolist() == [3] and bundle is not None
+
+def test_first_run_without_full_bundle_fits_and_keeps_encoders(paths):
+    _, online = paths
+    features = _features()
+    _, bundle = online_training.update(features, path=online, full_bundle_path=online + ".missing")
+    assert bundle["encoders"] is not None
+    first = bundle["encoders"]["student_name"]
+
+    # A later batch with unseen names reuses the saved vocabulary instead of refitting
+    more = _features(20, seed=1).assign(student_id=lambda d: d["student_id"] + 500,
+                                        student_name=lambda d: "New" + d["student_name"])
+    _, bundle = online_training.update(more, path=online, full_bundle_path=online + ".missing")
+    assert list(bundle["encoders"]["student_name"].vocabulary) == list(first.vocabulary)
+
+def test_update_reads_the_online_bundle_once(paths, monkeypatch):
+    _, online = paths
+    online_training.update(_features(), path=online, full_bundle_path=online + ".missing")
+    loads = []
+    load = online_training.load_online_artifacts
+    monkeypatch.setattr(online_training, "load_online_artifacts", lambda path: (loads.append(path), load(path))[1])
+    features = _features()
+    features.loc[3, "Average_Attendance"] = 10.0
+    _, bundle = online_training.update(features, path=online, full_bundle_path=online + ".missing")
+    assert bundle is not None and loads == [online]
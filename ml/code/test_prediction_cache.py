@@ -0,0 +1,84 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+import model_bundle
+from inference import score_rows
+from prediction_cache import PredictionCache, input_hashes
+
+warnings.filterwarnings("ignore")
+
+
+def _rows(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"student_id": np.arange(n), "a": rng.normal(size=n), "b": rng.normal(size=n)})
+
+def _train(path, seed=0):
+    rows = _rows(200, seed)
+    X, y = rows[["a", "b"]], (rows["a"] + rows["b"] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    return model_bundle.save_bundle({"logistic": model}, scaler, feature_names=["a", "b"], path=path)
+
+@pytest.fixture
+def bundle_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "bundle.joblib")
+    monkeypatch.setitem(model_bundle.MODEL_TYPES, "logistic", path)
+    _train(path)
+    yield path
+    model_bundle.clear_cache()
+
+def test_second_call_is_served_from_cache(bundle_path):
+    cache = PredictionCache()
+    rows = _rows()
+    first = cache.score_rows(rows)
+    second = cache.score_rows(rows)
+    assert cache.stats()["misses"] == len(rows) and cache.stats()["hits"] == len(rows)
+    expected = score_rows(rows)
+    for got in (first, second):
+        assert (got[0] == expected[0]).all() and np.allclose(got[1], expected[1])
+        assert (got[2] == expected[2]).all()
+
+def test_retraining_invalidates(bundle_path):
+    cache = PredictionCache()
+    rows = _rows()
+    cache.score_rows(rows)
+    _train(bundle_path, seed=1)
+    model_bundle.clear_cache()   # as if another process had retrained
+    cache.score_rows(rows)
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["misses"] == 2 * len(rows)
+
+def test_lru_eviction(bundle_path):
+    cache = PredictionCache(max_entries=10)
+    cache.score_rows(_rows(30))
+    assert cache.stats()["entries"] == 10 and cache.stats()["evictions"] == 20
+
+def test_disk_tier_survives_a_new_cache(bundle_path, tmp_path):
+    disk = str(tmp_path / "predictions.db")
+    rows = _rows()
+    PredictionCache(disk_path=disk).score_rows(rows)
+    cache = PredictionCache(disk_path=disk)
+    cache.score_rows(rows)
+    assert cache.stats()["disk_hits"] == len(rows) and cache.stats()["misses"] == 0
+
+def test_column_names_are_part_of_the_key():
+    rows = _rows(5)
+    swapped = rows.rename(columns={"a": "b", "b": "a"})
+    assert not (input_hashes(rows) == input_hashes(swapped)).any()
+    assert (input_hashes(rows) == input_hashes(rows[["b", "student_id", "a"]])).all()
+
+def test_version_file_is_read_at_most_once_per_interval(bundle_path, monkeypatch):
+    reads = []
+    refresh = model_bundle.refresh_bundle
+    monkeypatch.setattr(model_bundle, "refresh_bundle", lambda path: (reads.append(path), refresh(path))[1])
+    cache = PredictionCache(version_check_interval=60)
+    for _ in range(5):
+        cache.score_rows(_rows())
+    assert len(reads) == 1
+    PredictionCache(version_check_interval=0).score_rows(_rows())
+    assert len(reads) == 2
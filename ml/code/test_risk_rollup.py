@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_rollup import RiskRollup, data_weeks
+
+
+@pytest.fixture
+def rollup(tmp_path):
+    with RiskRollup(str(tmp_path / "rollup.db")) as rollup:
+        yield rollup
+
+def _rows(mentors):
+    return pd.DataFrame({"student_id": np.arange(len(mentors)), "institute_id": 1, "mentor_id": mentors})
+
+def test_counts_means_and_histograms(rollup):
+    rollup.add(_rows([10, 10, 11]), [0.9, 0.2, 0.5], ["High", "Low", "Medium"], week=12)
+    cells = rollup.query(week=12)
+    assert cells["mentor_id"].tolist() == [10, 11] and cells["students"].tolist() == [2, 1]
+    assert cells["mean_risk"].tolist() == pytest.approx([0.55, 0.5])
+    assert cells[["Low", "Medium", "High"]].values.tolist() == [[1, 0, 1], [0, 1, 0]]
+
+def test_rescoring_replaces_instead_of_adding(rollup):
+    rollup.add(_rows([10, 10, 11]), [0.9, 0.2, 0.5], ["High", "Low", "Medium"], week=12)
+    # Student 1 is rescored and moves to mentor 11; the other two are unchanged
+    assert rollup.add(_rows([10, 11, 11]), [0.9, 0.8, 0.5], ["High", "High", "Medium"], week=12) == 2
+    cells = rollup.query(week=12).set_index("mentor_id")
+    assert cells["students"].to_dict() == {10: 1, 11: 2}
+    assert cells.loc[11, ["Low", "Medium", "High"]].tolist() == [0, 1, 1]
+    assert cells.loc[11, "mean_risk"] == pytest.approx(0.65)
+
+def test_trend_rolls_up_over_mentors(rollup):
+    rollup.add(_rows([10, 11]), [0.2, 0.4], ["Low", "Medium"], week=11)
+    rollup.add(_rows([10, 11]), [0.8, 0.9], ["High", "High"], week=12)
+    trend = rollup.query(institute_id=1, by=("institute_id", "week"))
+    assert trend["week"].tolist() == [11, 12]
+    assert trend["mean_risk"].tolist() == pytest.approx([0.3, 0.85]) and trend["High"].tolist() == [0, 2]
+    assert rollup.query(since=12, by=())["students"].tolist() == [2]
+    with pytest.raises(ValueError):
+        rollup.query(by=("student_id",))
+
+def test_week_comes_from_the_data(rollup):
+    rows = _rows([10, 10, 11]).assign(Week_1_Attendance=[90.0, 80.0, None], Week_2_Attendance=[85.0, None, None])
+    assert data_weeks(rows).tolist() == [2, 1, 0]
+    rollup.add(rows, [0.9, 0.2, 0.5], ["High", "Low", "Medium"])
+    # Student 2 has no attendance yet, so no week to file it under
+    assert rollup.query(by=("week",))[["week", "students"]].values.tolist() == [[1, 1], [2, 1]]
+    with pytest.raises(ValueError, match="week="):
+        rollup.add(_rows([10]), [0.5], ["Medium"])
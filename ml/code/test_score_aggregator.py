@@ -0,0 +1,49 @@
+import pandas as pd
+
+import score_aggregator
+from score_aggregator import ScoreAggregator
+
+COLUMNS = ["student_id", "institute_id", "week_id", "test_score", "max_score"]
+
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+
+def _append(path, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, mode="a", header=False, index=False)
+
+def _fold(state, paths):
+    agg = ScoreAggregator.load(state, sources=paths)
+    folded = agg.fold_files(paths)
+    agg.save()
+    return folded, agg.summary().set_index("student_id")["test_score"].to_dict()
+
+def test_new_files_fold_in_and_changed_files_rebuild(tmp_path):
+    state = str(tmp_path / "agg.npz")
+    week1, week2 = tmp_path / "Weekly_Scores_Institute1.csv", tmp_path / "Weekly_Scores_Institute2.csv"
+    _write(week1, [(1, 1, 1, 50, 100), (1, 1, 2, 70, 100)])
+    assert _fold(state, [week1]) == (2, {1: 60})
+
+    _write(week2, [(2, 2, 1, 80, 100)])
+    assert _fold(state, [week1, week2]) == (1, {1: 60, 2: 80})
+    assert _fold(state, [week1, week2]) == (0, {1: 60, 2: 80})
+
+    # A corrected score for a row already folded in is picked up, not skipped
+    _write(week1, [(1, 1, 1, 100, 100), (1, 1, 2, 70, 100)])
+    assert _fold(state, [week1, week2]) == (3, {1: 85, 2: 80})
+
+    # A narrower run (one institute) does not reuse state built from more files
+    assert _fold(state, [week2]) == (1, {2: 80})
+
+def test_appended_rows_are_the_only_ones_read(tmp_path, monkeypatch):
+    state, path = str(tmp_path / "agg.npz"), tmp_path / "Weekly_Scores_Institute1.csv"
+    _write(path, [(1, 1, week, 50, 100) for week in range(1, 13)])
+    assert _fold(state, [path]) == (12, {1: 50})
+
+    parsed = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(score_aggregator.pd, "read_csv",
+                        lambda *args, **kwargs: parsed.append(read_csv(*args, **kwargs)) or parsed[-1])
+    _append(path, [(1, 1, 13, 100, 100), (2, 1, 13, 40, 100)])
+    assert _fold(state, [path]) == (2, {1: 50 * 12 / 13 + 100 / 13, 2: 40})
+    assert [len(rows) for rows in parsed] == [2]
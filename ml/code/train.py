@@ -0,0 +1,116 @@
+"""
+Headless training CLI.
+
+    python code/train.py                         # train both models, no plots
+    python code/train.py --plot tree.png         # also save the decision tree plot
+    python code/train.py --search --time-budget 120
+    python code/train.py --institutes 1 2 --no-demo
+    python code/train.py --drop-names            # no student/mentor/parent name features
+    python code/train.py --metrics metrics.prom  # per-stage time/CPU/memory (or .json)
+    python code/train.py --legacy-pickles        # also rewrite models/*.pkl
+
+Nothing here opens a window: plotting is opt-in and always written to a file.
+"""
+import argparse
+
+import data_loader
+import instrumentation
+from feature_store import FeatureStore
+from score_aggregator import ScoreAggregator
+import try1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the attendance risk models.")
+    parser.add_argument("--search", action="store_true",
+                        help="cross-validated hyperparameter search instead of the fixed models")
+    parser.add_argument("--n-iter", type=int, default=None,
+                        help="random search: number of candidates to try (default: full grid)")
+    parser.add_argument("--folds", type=int, default=5, help="cross-validation folds")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size for --search")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="seconds after which --search stops evaluating candidates")
+    parser.add_argument("--plot", metavar="PATH", default=None,
+                        help="save the decision tree plot to this image file")
+    parser.add_argument("--institutes", type=int, nargs="+", default=None,
+                        help="only train on these institute ids")
+    parser.add_argument("--max-name-cardinality", type=int, default=None,
+                        help="drop name columns with more distinct values than this from the features")
+    parser.add_argument("--drop-names", action="store_true",
+                        help="drop the student/mentor/parent name columns from the features")
+    parser.add_argument("--legacy-pickles", action="store_true",
+                        help="also overwrite models/logistic_model.pkl, decision_tree_model.pkl and scaler.pkl")
+    parser.add_argument("--no-cache", action="store_true", help="parse the CSVs instead of the columnar cache")
+    parser.add_argument("--no-demo", action="store_true", help="skip the prediction demo at the end")
+    parser.add_argument("--metrics", metavar="PATH", default=None,
+                        help="record per-stage wall/CPU time, peak memory and rows; write a "
+                             "Prometheus text (.prom) or JSON snapshot here")
+    parser.add_argument("--metrics-log", metavar="PATH", default=None,
+                        help="with --metrics, also append one JSON line per finished stage here")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics:
+        instrumentation.enable(log_path=args.metrics_log)
+
+    print("🚀 STARTING ATTENDANCE RISK PREDICTION SYSTEM")
+    print("="*60)
+
+    print("\n📊 Step 1: Loading data...")
+    scores, students, parents, mentors, attendance = try1.load_data(
+        use_cache=not args.no_cache, institutes=args.institutes)
+    print(f"Data loaded - Scores: {scores.shape}, Students: {students.shape}, Parents: {parents.shape}, Mentors: {mentors.shape}, Attendance: {attendance.shape}")
+
+    print("\n🔧 Step 2: Preparing dataset...")
+    # Only rows appended to the score files since the last run are read; it is rebuilt if one changed
+    with instrumentation.stage("aggregate") as s:
+        sources = [path for _, path in data_loader.discover_shards(institutes=args.institutes)["Weekly_Scores"]]
+        score_agg = ScoreAggregator.load(sources=sources)
+        s.rows = score_agg.fold_files(sources)
+        score_agg.save()
+    features = try1.build_features(scores, students, parents, mentors, attendance,
+                                   score_summary=score_agg.summary())
+
+    # Only students whose rows changed are rewritten; training reads the store in bulk
+    with FeatureStore() as store, instrumentation.stage("feature_store", rows=len(features)):
+        updated = store.sync(features)
+        print(f"Feature store {store.version}: {updated} of {len(features)} students updated, "
+              f"{store.last_deleted} removed")
+        raw = store.read_all()
+    if args.institutes is not None:
+        raw = raw[raw["institute_id"].isin(args.institutes)].reset_index(drop=True)
+    # Vocabularies are fit once here and saved in the model bundle
+    max_cardinality = 0 if args.drop_names else args.max_name_cardinality
+    encoders = try1.fit_encoders(raw, max_cardinality=max_cardinality)
+    dropped = [c for c in try1.CATEGORICAL_COLUMNS if c in raw.columns and c not in encoders]
+    if dropped:
+        print(f"Name columns left out of the features: {dropped}")
+    df = try1.encode_features(raw, encoders)
+    print("Final dataset shape:", df.shape)
+    print("Columns:", df.columns.tolist())
+
+    print("\n🤖 Step 3: Training models...")
+    if args.search:
+        try1.train_model_search(df, n_iter=args.n_iter, n_folds=args.folds,
+                                max_workers=args.workers, time_budget=args.time_budget,
+                                encoders=encoders)
+    else:
+        try1.train_model(df, plot_path=args.plot, encoders=encoders, legacy_pickles=args.legacy_pickles)
+
+    if not args.no_demo:
+        print("\n🎯 Step 4: Demonstrating risk prediction...")
+        try1.demo_prediction()
+
+    if args.metrics:
+        instrumentation.write_snapshot(args.metrics)
+        print("\n⏱️ Stage metrics:")
+        print(instrumentation.summary_table())
+        print(f"Snapshot written to {args.metrics}")
+
+    print("\n✅ SYSTEM READY FOR RISK PREDICTION!")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
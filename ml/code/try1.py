@@ -1,107 +1,157 @@
+import os
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier, plot_tree
+from sklearn.tree import DecisionTreeClassifier
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
-import matplotlib.pyplot as plt
+
+import categorical
+import data_loader
+from instrumentation import instrument, stage
+import model_search
+from paths import MODELS_DIR
+from model_bundle import BUNDLE_PATH, SEARCH_BUNDLE_PATH, save_bundle
+from feature_join import join_features
+from attendance_features import add_trend_features, week_columns
+# Scoring lives in the lightweight inference module; re-exported here for existing callers
+from inference import predict_risk, predict_risk_for_students
 
 # ========== Load CSV Data ==========
-def load_data():
-    # Scores
-    scores1 = pd.read_csv("data/Weekly_Scores_Institute1.csv", encoding='utf-8')
-    scores2 = pd.read_csv("data/Weekly_Scores_Institute2.csv", encoding='utf-8')
-    scores = pd.concat([scores1, scores2], ignore_index=True)
-
-    # Students
-    students1 = pd.read_csv("data/Students_Institute1.csv", encoding='utf-8')
-    students2 = pd.read_csv("data/Students_Institute2.csv", encoding='utf-8')
-    students = pd.concat([students1, students2], ignore_index=True)
-
-    # Parents
-    parents1 = pd.read_csv("data/Parents_Institute1.csv", encoding='utf-8')
-    parents2 = pd.read_csv("data/Parents_Institute2.csv", encoding='utf-8')
-    parents = pd.concat([parents1, parents2], ignore_index=True)
-
-    # Mentors
-    mentors1 = pd.read_csv("data/Mentors_Institute1.csv", encoding='utf-8')
-    mentors2 = pd.read_csv("data/Mentors_Institute2.csv", encoding='utf-8')
-    mentors = pd.concat([mentors1, mentors2], ignore_index=True)
-
-    # Attendance
-    att1 = pd.read_csv("data/Attendance_Wide_Format_Institute1.csv", encoding='utf-8')
-    att2 = pd.read_csv("data/Attendance_Wide_Format_Institute2.csv", encoding='utf-8')
-    attendance = pd.concat([att1, att2], ignore_index=True)
-
-    return scores, students, parents, mentors, attendance
+def load_data(use_cache=True, institutes=None, max_workers=None):
+    """
+    Load every *_InstituteN.csv shard in data/ (see data_loader.py).
+
+    Args:
+        use_cache: Read through the columnar cache in data/.cache (compact dtypes,
+                   no text parsing after the first run). False parses the CSVs directly.
+        institutes: Optional list of institute ids to load; None loads all of them
+        max_workers: Size of the thread pool used to read shards
+
+    Returns:
+        (scores, students, parents, mentors, attendance)
+    """
+    with stage("load") as s:
+        tables = data_loader.load_data(institutes=institutes, use_cache=use_cache,
+                                       max_workers=max_workers)
+        s.rows = len(tables[0])
+    return tables
 
 # ========== Feature Engineering ==========
-def prepare_dataset(scores, students, parents, mentors, attendance):
+def build_features(scores, students, parents, mentors, attendance, score_summary=None):
+    """
+    Merge all tables into one row per student, before encoding.
+
+    This is the row kept per student in the feature store.
+
+    Args:
+        score_summary: Optional precomputed per-student score means (e.g.
+                       ScoreAggregator.summary()); when given, `scores` is not scanned.
+    """
     # Aggregate student scores
-    score_summary = scores.groupby("student_id").agg({
-        "test_score": "mean",
-        "max_score": "mean"
-    }).reset_index()
-    score_summary["avg_score_ratio"] = score_summary["test_score"] / score_summary["max_score"]
-
-    # Merge with student info
-    df = students.merge(score_summary, on="student_id", how="left")
-
-    # Merge attendance (row-wise, but attendance also has student_id, mentor_id, parent_id)
-    # Drop duplicate columns from attendance before concatenating, but keep institute_id for later merge
-    attendance_clean = attendance.drop(columns=['student_id', 'mentor_id', 'parent_id'], errors='ignore')
-    df = pd.concat([df.reset_index(drop=True), attendance_clean.reset_index(drop=True)], axis=1)
-
-    # ---- Fix mentor_id duplication ----
-    # Ensure mentors DataFrame has unique columns before merging
-    mentors_clean = mentors.copy()
-    mentors_clean = mentors_clean.rename(columns={"mentor_id": "mentor_id_m"})
-    df = df.merge(mentors_clean, left_on="mentor_id", right_on="mentor_id_m", how="left")
-    df = df.drop(columns=["mentor_id_m"])  # drop helper key
-
-    # Merge with parent info
-    parents = parents.rename(columns={"parent_id": "parent_id_p"})
-    df = df.merge(parents, left_on=["student_id", "parent_id"],
-                         right_on=["student_id", "parent_id_p"],
-                         how="left")
-    df = df.drop(columns=["parent_id_p"])
+    if score_summary is None:
+        with stage("aggregate", rows=len(scores)):
+            score_summary = scores.groupby("student_id").agg({
+                "test_score": "mean",
+                "max_score": "mean"
+            }).reset_index()
+            score_summary["avg_score_ratio"] = score_summary["test_score"] / score_summary["max_score"]
+
+    # Attach scores, attendance, mentor and parent info by student_id lookup
+    with stage("join", rows=len(students)):
+        df = join_features(students, score_summary, attendance, mentors, parents)
+
+    # Slope / recent drop / low streak over however many weeks the semester has
+    with stage("trend_features", rows=len(df)):
+        return add_trend_features(df)
+
+CATEGORICAL_COLUMNS = ["student_name", "mentor_name", "parent_name", "subject_name"]
+
+def fit_encoders(df, max_cardinality=None):
+    """
+    Vocabulary per categorical column (categorical.CategoryEncoder), saved with the model.
+
+    Args:
+        max_cardinality: Name columns with more distinct values than this are
+                         dropped from the features (0 drops all of them)
+    """
+    return categorical.fit_encoders(df, CATEGORICAL_COLUMNS, max_cardinality=max_cardinality)
+
+@instrument("encode", rows=len)
+def encode_features(df, encoders=None):
+    """
+    Encode categorical columns and fill missing values (rows from build_features or the feature store).
+
+    Args:
+        encoders: Vocabularies from fit_encoders(); values outside them go to the
+                  encoder's unknown bucket and columns without one are dropped.
+                  None fits vocabularies on df itself.
+    """
+    df = df.copy()
 
     # Encode categorical columns
-    le = LabelEncoder()
-    for col in ["student_name", "mentor_name", "parent_name", "subject_name"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).fillna("Unknown")
-            df[col] = le.fit_transform(df[col])
-
-    # Clean up duplicate institute_id columns
-    if 'institute_id_x' in df.columns:
-        df = df.drop(columns=['institute_id_x', 'institute_id_y'])
-    
+    if encoders is None:
+        encoders = fit_encoders(df)
+    categorical.encode_columns(df, encoders, CATEGORICAL_COLUMNS)
+
     # Fill missing numeric values
     df = df.fillna(0)
 
     return df
 
-def train_model(df):
+def prepare_dataset(scores, students, parents, mentors, attendance, score_summary=None):
+    """Merge all tables into one encoded row per student (build_features + encode_features)."""
+    return encode_features(build_features(scores, students, parents, mentors, attendance,
+                                          score_summary=score_summary))
+
+def split_features(df):
+    """
+    Feature matrix X (IDs, target and per-week attendance dropped) and 0/1 target y.
+
+    The raw Week_N_Attendance columns stay in the feature store (for display) but
+    not in X: the trend features summarise them at a fixed width, so a semester
+    with any number of weeks gives the same columns.
+    """
     # Target - convert Yes/No to 1/0
     y = (df["Is_Declining_Attendance"] == "Yes").astype(int)
 
-    # Drop IDs and target
+    # Drop IDs, target and the week-by-week columns
     drop_cols = ["student_id", "mentor_id", "parent_id", "institute_id", "Is_Declining_Attendance"]
-    X = df.drop(columns=[c for c in drop_cols if c in df.columns])
+    X = df.drop(columns=[c for c in drop_cols if c in df.columns] + week_columns(df))
+    return X, y
+
+def train_model(df, plot_path=None, encoders=None, models_dir=MODELS_DIR, legacy_pickles=False):
+    """
+    Fit the logistic regression and decision tree models and save them.
+
+    Both models, the scaler, the encoders and the ordered feature list are
+    written as one bundle to models/ (see model_bundle.py).
+
+    Args:
+        df: Encoded dataset (prepare_dataset / encode_features output)
+        encoders: Vocabularies df was encoded with (fit_encoders), stored in the bundle
+        plot_path: If given, the fitted decision tree is drawn to this image file
+                   (matplotlib is only imported in that case; nothing is shown)
+        models_dir: Where the bundle and pickles are written (defaults to ml/models)
+        legacy_pickles: Also overwrite the individual logistic_model.pkl /
+                        decision_tree_model.pkl / scaler.pkl (committed to git)
+    """
+    X, y = split_features(df)
 
     # Scale features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    with stage("scale", rows=len(X)):
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
 
     # Split
     X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
 
     # Logistic Regression
     log_model = LogisticRegression(max_iter=1000)
-    log_model.fit(X_train, y_train)
+    with stage("fit.logistic", rows=len(X_train)):
+        log_model.fit(X_train, y_train)
     y_pred_log = log_model.predict(X_test)
     print("\n=== Logistic Regression ===")
     print("Accuracy:", accuracy_score(y_test, y_pred_log))
@@ -109,86 +159,75 @@ def train_model(df):
 
     # Decision Tree
     tree_model = DecisionTreeClassifier(max_depth=5, random_state=42)
-    tree_model.fit(X_train, y_train)
+    with stage("fit.tree", rows=len(X_train)):
+        tree_model.fit(X_train, y_train)
     y_pred_tree = tree_model.predict(X_test)
     print("\n=== Decision Tree ===")
     print("Accuracy:", accuracy_score(y_test, y_pred_tree))
     print(classification_report(y_test, y_pred_tree))
 
     # Save models
-    joblib.dump(log_model, "logistic_model.pkl")
-    joblib.dump(tree_model, "decision_tree_model.pkl")
-    joblib.dump(scaler, "scaler.pkl")
-    print("✅ Models saved: logistic_model.pkl, decision_tree_model.pkl, scaler.pkl")
+    bundle_path = os.path.join(models_dir, os.path.basename(BUNDLE_PATH))
+    with stage("save"):
+        bundle = save_bundle({"logistic": log_model, "tree": tree_model}, scaler,
+                             feature_names=X.columns, encoders=encoders, path=bundle_path)
+    print(f"✅ Model bundle saved: {bundle_path} (version {bundle['version']})")
+
+    # Individual pickles, for integrations that still load them directly
+    if legacy_pickles:
+        joblib.dump(log_model, os.path.join(models_dir, "logistic_model.pkl"))
+        joblib.dump(tree_model, os.path.join(models_dir, "decision_tree_model.pkl"))
+        joblib.dump(scaler, os.path.join(models_dir, "scaler.pkl"))
+        print("✅ Models saved to models/: logistic_model.pkl, decision_tree_model.pkl, scaler.pkl")
 
     # Plot Decision Tree for interpretation
-    plt.figure(figsize=(16, 8))
-    plot_tree(tree_model, filled=True, feature_names=X.columns.tolist(), class_names=["No Decline", "Decline"])
+    if plot_path:
+        plot_decision_tree(tree_model, X.columns.tolist(), plot_path)
+
+def plot_decision_tree(tree_model, feature_names, path):
+    """Render the decision tree to an image file (headless Agg backend)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from sklearn.tree import plot_tree
+
+    fig = plt.figure(figsize=(16, 8))
+    plot_tree(tree_model, filled=True, feature_names=feature_names, class_names=["No Decline", "Decline"])
     plt.title("Decision Tree for Attendance Prediction")
-    plt.show()
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+    print(f"🌳 Decision tree plot saved: {path}")
 
-# ========== Risk Prediction Function ==========
-def predict_risk(new_data, model_type="logistic"):
+def train_model_search(df, grid=None, n_iter=None, n_folds=5, scoring="f1",
+                       max_workers=None, time_budget=None, encoders=None):
     """
-    Predict risk of declining attendance for new students
-    
-    Args:
-        new_data: DataFrame with student information
-        model_type: "logistic" or "tree"
-    
+    Cross-validated hyperparameter search instead of the fixed two models.
+
+    Folds are grouped by institute_id when the data has more than one institute.
+    See model_search.search() for the arguments. The best model is saved as
+    model_type "best" in models/search_bundle.joblib.
+
     Returns:
-        DataFrame with predictions and risk scores
+        (leaderboard, best_model)
     """
-    # Load the trained models
-    try:
-        if model_type == "logistic":
-            model = joblib.load("logistic_model.pkl")
-        else:
-            model = joblib.load("decision_tree_model.pkl")
-        scaler = joblib.load("scaler.pkl")
-    except FileNotFoundError:
-        print("❌ Model files not found. Please train the model first.")
-        return None
-    
-    # Prepare the data (same preprocessing as training)
-    df_pred = new_data.copy()
-    
-    # If new_data has the same structure as training data, process it
-    if 'student_id' in df_pred.columns:
-        # Encode categorical columns (same as training)
-        le = LabelEncoder()
-        for col in ["student_name", "mentor_name", "parent_name"]:
-            if col in df_pred.columns:
-                df_pred[col] = df_pred[col].astype(str).fillna("Unknown")
-                # Note: In production, you should save the fitted label encoders
-                df_pred[col] = le.fit_transform(df_pred[col])
-        
-        # Fill missing values
-        df_pred = df_pred.fillna(0)
-        
-        # Drop ID columns for prediction
-        drop_cols = ["student_id", "mentor_id", "parent_id", "institute_id"]
-        X_pred = df_pred.drop(columns=[c for c in drop_cols if c in df_pred.columns])
-        
-        # Scale features
-        X_pred_scaled = scaler.transform(X_pred)
-        
-        # Make predictions
-        predictions = model.predict(X_pred_scaled)
-        probabilities = model.predict_proba(X_pred_scaled)
-        
-        # Create results DataFrame
-        results = new_data.copy()
-        results['Risk_Prediction'] = predictions
-        results['Risk_Score'] = probabilities[:, 1]  # Probability of declining attendance
-        results['Risk_Level'] = results['Risk_Score'].apply(
-            lambda x: 'High' if x > 0.7 else 'Medium' if x > 0.3 else 'Low'
-        )
-        
-        return results
-    else:
-        print("❌ Input data should contain student information columns")
-        return None
+    X, y = split_features(df)
+    groups = df["institute_id"].to_numpy() if "institute_id" in df.columns else None
+
+    # Unscaled: every candidate scales inside its own pipeline, fit on the training folds only
+    leaderboard, pipeline = model_search.search(
+        X.to_numpy(dtype=np.float64), y.to_numpy(), groups=groups, grid=grid, n_iter=n_iter,
+        n_folds=n_folds, scoring=scoring, max_workers=max_workers, time_budget=time_budget)
+    scaler, best_model = pipeline.named_steps["scaler"], pipeline.named_steps["model"]
+
+    print("\n=== Search Leaderboard ===")
+    print(leaderboard.head(10).to_string(index=False))
+
+    bundle = save_bundle({"best": best_model}, scaler, feature_names=X.columns,
+                         encoders=encoders, path=SEARCH_BUNDLE_PATH)
+    leaderboard_path = os.path.join(MODELS_DIR, "leaderboard.csv")
+    leaderboard.to_csv(leaderboard_path, index=False)
+    print(f"✅ Saved: {SEARCH_BUNDLE_PATH} (version {bundle['version']}), {leaderboard_path}")
+    return leaderboard, best_model
 
 def demo_prediction():
     """Demonstrate prediction on sample data"""
@@ -246,23 +285,6 @@ def demo_prediction():
 
 # ========== Run ==========
 if __name__ == "__main__":
-    print("🚀 STARTING ATTENDANCE RISK PREDICTION SYSTEM")
-    print("="*60)
-    
-    print("\n📊 Step 1: Loading data...")
-    scores, students, parents, mentors, attendance = load_data()
-    print(f"Data loaded - Scores: {scores.shape}, Students: {students.shape}, Parents: {parents.shape}, Mentors: {mentors.shape}, Attendance: {attendance.shape}")
-    
-    print("\n🔧 Step 2: Preparing dataset...")
-    df = prepare_dataset(scores, students, parents, mentors, attendance)
-    print("Final dataset shape:", df.shape)
-    print("Columns:", df.columns.tolist())
-    
-    print("\n🤖 Step 3: Training models...")
-    train_model(df)
-    
-    print("\n🎯 Step 4: Demonstrating risk prediction...")
-    demo_prediction()
-    
-    print("\n✅ SYSTEM READY FOR RISK PREDICTION!")
-    print("="*60)
\ No newline at end of file
+    # Same pipeline as the training CLI (see train.py for options)
+    from train import main
+    main()
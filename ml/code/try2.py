@@ -9,34 +9,24 @@ from sklearn.metrics import classification_report, accuracy_score
 import joblib
 import matplotlib.pyplot as plt
 
-# ========== Load CSV Data ==========
-def load_data():
-    # Scores
-    scores1 = pd.read_csv("data/Weekly_Scores_Institute1.csv", encoding='utf-8')
-    scores2 = pd.read_csv("data/Weekly_Scores_Institute2.csv", encoding='utf-8')
-    scores = pd.concat([scores1, scores2], ignore_index=True)
-
-    # Students
-    students1 = pd.read_csv("data/Students_Institute1.csv", encoding='utf-8')
-    students2 = pd.read_csv("data/Students_Institute2.csv", encoding='utf-8')
-    students = pd.concat([students1, students2], ignore_index=True)
+import data_loader
 
-    # Parents
-    parents1 = pd.read_csv("data/Parents_Institute1.csv", encoding='utf-8')
-    parents2 = pd.read_csv("data/Parents_Institute2.csv", encoding='utf-8')
-    parents = pd.concat([parents1, parents2], ignore_index=True)
-
-    # Mentors
-    mentors1 = pd.read_csv("data/Mentors_Institute1.csv", encoding='utf-8')
-    mentors2 = pd.read_csv("data/Mentors_Institute2.csv", encoding='utf-8')
-    mentors = pd.concat([mentors1, mentors2], ignore_index=True)
+# ========== Load CSV Data ==========
+def load_data(use_cache=True, institutes=None, max_workers=None):
+    """
+    Load every *_InstituteN.csv shard in data/ (see data_loader.py).
 
-    # Attendance
-    att1 = pd.read_csv("data/Attendance_Wide_Format_Institute1.csv", encoding='utf-8')
-    att2 = pd.read_csv("data/Attendance_Wide_Format_Institute2.csv", encoding='utf-8')
-    attendance = pd.concat([att1, att2], ignore_index=True)
+    Args:
+        use_cache: Read through the columnar cache in data/.cache (compact dtypes,
+                   no text parsing after the first run). False parses the CSVs directly.
+        institutes: Optional list of institute ids to load; None loads all of them
+        max_workers: Size of the thread pool used to read shards
 
-    return scores, students, parents, mentors, attendance
+    Returns:
+        (scores, students, parents, mentors, attendance)
+    """
+    return data_loader.load_data(institutes=institutes, use_cache=use_cache,
+                                 max_workers=max_workers)
 
 # ========== Feature Engineering ==========
 def prepare_dataset(scores, students, parents, mentors, attendance):
@@ -0,0 +1,195 @@
+"""
+Message templates, compiled once and rendered for a whole scored frame at a time.
+
+Templates live in notifications/templates/ as
+
+    <role>_<channel>.<language>.txt        e.g. mentor_email.en.txt, parent_sms.hi.txt
+
+with an optional first line "Subject: ..." (email) followed by the body.
+Placeholders use str.format syntax, {field} or {field:spec}, and are filled
+from the columns of the scored/alerts frame (student_name, student_id,
+mentor_name, parent_name, Risk_Level, Risk_Score, ...) plus the derived
+field risk_percent ("87%"). The "sms" templates serve both the twilio and
+sms_stub channels.
+
+A template is parsed once per version of its file (cached on path and
+mtime, so an edited template is picked up without a restart) into a single
+positional format string; rendering pulls each field column out as a list once and formats
+the rows in one pass, with no per-row DataFrame access (100k messages take
+a fraction of a second). Rows can carry their own
+language in a "language" column; languages without a template fall back to
+English. SMS bodies are cut to fit max_parts segments (160 / 153 characters
+per part, 70 / 67 once the text needs Unicode, e.g. Hindi), ending in "...";
+split_sms instead breaks a long multi-line digest into several messages.
+
+    from message_templates import render
+    alerts["message_parent"] = render(alerts, "parent", "email")
+"""
+import functools
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+DEFAULT_LANGUAGE = "en"
+SMS_CHANNELS = {"sms", "twilio", "sms_stub"}
+
+# Characters per SMS: (single message, per part of a multi-part message)
+GSM_LIMITS = (160, 153)
+UNICODE_LIMITS = (70, 67)
+
+
+# ========== Compiling ==========
+class Template:
+    def __init__(self, text, name="template"):
+        self.name = name
+        self.subject = None
+        if text.startswith("Subject:"):
+            first, _, text = text.partition("\n")
+            self.subject = first[len("Subject:"):].strip()
+        self.body = text.rstrip("\n")
+        # Compiled once: named fields become positional slots of one format string,
+        # e.g. "Dear {parent_name}, {student_name}'s" -> "Dear {0}, {1}'s"
+        parsed = list(string.Formatter().parse(self.body))
+        self.fields = list(dict.fromkeys(field for _, field, _, _ in parsed if field))
+        slots = []
+        for literal, field, spec, conversion in parsed:
+            slots.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is not None:
+                slots.append("{" + str(self.fields.index(field)) + (f"!{conversion}" if conversion else "")
+                             + (f":{spec}" if spec else "") + "}")
+        self._format = "".join(slots).format
+
+    def render(self, df):
+        """Message per row of df (a Series aligned with df.index)."""
+        values = _field_values(df, self.fields, self.name)
+        columns = [values[field].tolist() for field in self.fields]
+        fmt = self._format
+        return pd.Series([fmt(*row) for row in zip(*columns)] if columns else [self.body] * len(df),
+                         index=df.index, dtype=object)
+
+def _field_values(df, fields, name):
+    values, missing = {}, []
+    for field in fields:
+        if field in df:
+            values[field] = df[field]
+        elif field == "risk_percent" and "Risk_Score" in df:
+            score = pd.to_numeric(df["Risk_Score"], errors="coerce").fillna(0).to_numpy()
+            values[field] = pd.Series(np.rint(score * 100).astype(int), index=df.index).astype(str) + "%"
+        else:
+            missing.append(field)
+    if missing:
+        raise ValueError(f"Template {name} needs columns missing from the data: {missing}")
+    return values
+
+def template_channel(channel):
+    return "sms" if channel in SMS_CHANNELS else channel
+
+@functools.lru_cache(maxsize=None)
+def _compile(path, mtime_ns):
+    """Template parsed from path; mtime_ns is part of the cache key, so an edited file is reparsed."""
+    with open(path, encoding="utf-8") as f:
+        return Template(f.read(), name=os.path.basename(path))
+
+def load_template(role, channel, language=DEFAULT_LANGUAGE, template_dir=TEMPLATE_DIR):
+    """
+    Compiled template for role ("mentor"/"parent"), channel and language (English if missing).
+
+    Raises:
+        FileNotFoundError: No template for this role and channel at all
+    """
+    channel = template_channel(channel)
+    for lang in dict.fromkeys([language, DEFAULT_LANGUAGE]):
+        path = os.path.join(template_dir, f"{role}_{channel}.{lang}.txt")
+        try:
+            return _compile(path, os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(f"No {role}_{channel} template in {template_dir}")
+
+def subject_for(role, channel, language=DEFAULT_LANGUAGE):
+    return load_template(role, channel, language).subject
+
+
+# ========== Rendering ==========
+def _sms_limits(messages, max_parts):
+    """Characters allowed per message in max_parts segments (ASCII counted as GSM)."""
+    unicode = messages.str.contains(r"[^\x00-\x7f]", regex=True).to_numpy()
+    if max_parts == 1:
+        return np.where(unicode, UNICODE_LIMITS[0], GSM_LIMITS[0])
+    return np.where(unicode, UNICODE_LIMITS[1], GSM_LIMITS[1]) * max_parts
+
+def fit_sms(messages, max_parts=1):
+    """Cut messages to max_parts SMS segments (ASCII counted as GSM), marking cuts with "..."."""
+    messages = messages.astype(str)
+    limit = _sms_limits(messages, max_parts)
+    too_long = messages.str.len().to_numpy() > limit
+    if not too_long.any():
+        return messages
+    out = messages.copy()
+    for n in np.unique(limit[too_long]):
+        rows = too_long & (limit == n)
+        out[rows] = messages[rows].str.slice(0, int(n) - 3).str.rstrip() + "..."
+    return out
+
+def _pack_lines(message, limit):
+    """Whole lines of message packed greedily into pieces of at most limit characters."""
+    pieces, current = [], ""
+    for line in message.split("\n"):
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) <= limit or not current.strip():
+            current = candidate
+        else:
+            pieces.append(current.strip("\n"))
+            current = line
+    if current.strip():
+        pieces.append(current.strip("\n"))
+    return pieces
+
+def split_sms(messages, max_parts=1):
+    """
+    Split messages longer than max_parts SMS segments at line breaks into several messages.
+
+    Nothing is dropped: a digest listing more students than one message can
+    hold becomes several, and the returned Series repeats the index label of
+    the message they came from. Only a single line too long on its own is
+    cut (fit_sms).
+    """
+    messages = messages.astype(str)
+    limit = _sms_limits(messages, max_parts)
+    too_long = messages.str.len().to_numpy() > limit
+    if not too_long.any():
+        return messages
+    bodies, index = [], []
+    for label, message, n, split in zip(messages.index, messages.to_numpy(), limit, too_long):
+        pieces = _pack_lines(message, int(n)) if split else [message]
+        bodies.extend(pieces)
+        index.extend([label] * len(pieces))
+    return fit_sms(pd.Series(bodies, index=index, dtype=object), max_parts)
+
+def render(df, role, channel, language=None, max_parts=1, template_dir=TEMPLATE_DIR):
+    """
+    Render the role's message for every row of df.
+
+    Args:
+        df: Scored rows / alerts with the template's fields as columns
+        role: "mentor" or "parent"
+        channel: "email", "twilio", "sms_stub" (or "sms")
+        language: One language for every row; default: df["language"] if present, else English
+        max_parts: SMS only, segments a message may use before it is cut (None: never cut)
+
+    Returns:
+        Series of message bodies aligned with df.index
+    """
+    if language is None and "language" in df:
+        languages = df["language"].fillna(DEFAULT_LANGUAGE).astype(str)
+        out = pd.Series(None, index=df.index, dtype=object)
+        for lang, rows in languages.groupby(languages, sort=False).groups.items():
+            out.loc[rows] = load_template(role, channel, lang, template_dir).render(df.loc[rows])
+    else:
+        out = load_template(role, channel, language or DEFAULT_LANGUAGE, template_dir).render(df)
+    if template_channel(channel) == "sms" and max_parts:
+        out = fit_sms(out, max_parts)
+    return out
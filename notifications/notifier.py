@@ -1,192 +1,661 @@
-import os
-import smtplib
-import ssl
-import pandas as pd
-from email.message import EmailMessage
-from dataclasses import dataclass
-from typing import Optional
-
-# --- Config from environment (set these for the demo) ---
-SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
-SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USER = os.getenv("SMTP_USER", "")
-SMTP_PASS = os.getenv("SMTP_PASS", "")
-
-# Twilio-style SMS (optional demo)
-TWILIO_SID = os.getenv("TWILIO_SID", "")
-TWILIO_AUTH = os.getenv("TWILIO_AUTH", "")
-TWILIO_FROM = os.getenv("TWILIO_FROM", "")
-
-# MSG91 or generic SMS provider (optional demo)
-SMS_API_KEY = os.getenv("SMS_API_KEY", "")
-
-# --- Dataclasses ---
-@dataclass
-class Contact:
-    name: str
-    email: Optional[str]
-    phone: Optional[str]
-
-# --- Email / SMS helpers ---
-def send_email(to_email: str, subject: str, body: str, sender_name: str = "Counseling Desk"):
-    if not to_email:
-        return False, "missing email"
-    msg = EmailMessage()
-    msg["From"] = f"{sender_name} <{SMTP_USER}>"
-    msg["To"] = to_email
-    msg["Subject"] = subject
-    msg.set_content(body)
-    try:
-        context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls(context=context)
-            server.login(SMTP_USER, SMTP_PASS)
-            server.send_message(msg)
-        return True, "sent"
-    except Exception as e:
-        return False, str(e)
-
-def send_sms_twilio(to_phone: str, body: str):
-    if not (TWILIO_SID and TWILIO_AUTH and TWILIO_FROM and to_phone):
-        return False, "twilio not configured"
-    try:
-        # Lazy import to keep prototype minimal
-        from twilio.rest import Client
-        client = Client(TWILIO_SID, TWILIO_AUTH)
-        message = client.messages.create(body=body, from_=TWILIO_FROM, to=to_phone)
-        return True, message.sid
-    except Exception as e:
-        return False, str(e)
-
-# Stub for generic SMS vendor; implement requests.post if needed
-def send_sms_stub(to_phone: str, body: str):
-    if not (SMS_API_KEY and to_phone):
-        return False, "sms vendor not configured"
-    # For prototype: print to console to simulate
-    print(f"[SMS-> {to_phone}] {body[:120]}...")
-    return True, "stubbed"
-
-# --- Loading contacts ---
-def load_mentors(mentor_files):
-    dfs = []
-    for path in mentor_files:
-        df = pd.read_csv(path)
-        # Expected columns: mentor_id, mentor_name, mentor_email?, mentor_phone?
-        # If column headers differ slightly, adjust here but DO NOT modify file contents:
-        # e.g., 'mentorid' -> 'mentor_id'
-        cols = {c.lower(): c for c in df.columns}
-        def pick(name_variants, row):
-            for v in name_variants:
-                if v in cols:
-                    return row[cols[v]]
-            return None
-        out = []
-        for _, row in df.iterrows():
-            mid = pick(["mentor_id","mentorid"], row)
-            mname = pick(["mentor_name","mentorname"], row)
-            memail = pick(["mentor_email","email"], row)
-            mphone = pick(["mentor_phone","phone"], row)
-            out.append({"mentor_id": mid, "mentor_name": mname, "mentor_email": memail, "mentor_phone": mphone})
-        dfs.append(pd.DataFrame(out))
-    return pd.concat(dfs, ignore_index=True).drop_duplicates(subset=["mentor_id"])
-
-def load_parents(parent_files):
-    dfs = []
-    for path in parent_files:
-        df = pd.read_csv(path)
-        cols = {c.lower(): c for c in df.columns}
-        def pick(name_variants, row):
-            for v in name_variants:
-                if v in cols:
-                    return row[cols[v]]
-            return None
-        out = []
-        for _, row in df.iterrows():
-            pid = pick(["parent_id","parentid"], row)
-            pname = pick(["parent_name","parentname"], row)
-            pemail = pick(["parent_email","email"], row)
-            pphone = pick(["parent_phone","phone"], row)
-            out.append({"parent_id": pid, "parent_name": pname, "parent_email": pemail, "parent_phone": pphone})
-        dfs.append(pd.DataFrame(out))
-    return pd.concat(dfs, ignore_index=True).drop_duplicates(subset=["parent_id"])
-
-# --- Main senders ---
-def send_to_mentors(alerts_csv, mentor_files, channel="email"):
-    mentors = load_mentors(mentor_files)
-    alerts = pd.read_csv(alerts_csv)
-    # alerts must have: mentor_id, message_mentor
-    sent, failed = [], []
-    for _, row in alerts.iterrows():
-        mid = row.get("mentor_id") or row.get("mentorid")
-        msg = row.get("message_mentor")
-        if pd.isna(mid) or pd.isna(msg):
-            failed.append(("missing_fields", None))
-            continue
-        m = mentors[mentors["mentor_id"] == mid]
-        if m.empty:
-            failed.append(("mentor_not_found", int(mid)))
-            continue
-        memail = m.iloc[0].get("mentor_email")
-        mphone = m.iloc[0].get("mentor_phone")
-        ok = False
-        info = ""
-        if channel == "email":
-            ok, info = send_email(memail, subject="At-risk students: weekly digest", body=msg)
-        elif channel == "twilio":
-            ok, info = send_sms_twilio(mphone, body=msg)
-        elif channel == "sms_stub":
-            ok, info = send_sms_stub(mphone, body=msg)
-        else:
-            failed.append(("unknown_channel", channel))
-            continue
-        (sent if ok else failed).append((int(mid), info))
-    return sent, failed
-
-def send_to_parents(alerts_csv, parent_files, channel="email"):
-    parents = load_parents(parent_files)
-    alerts = pd.read_csv(alerts_csv)
-    # alerts must have: parent_id, message_parent
-    sent, failed = [], []
-    for _, row in alerts.iterrows():
-        pid = row.get("parent_id") or row.get("parentid")
-        msg = row.get("message_parent")
-        if pd.isna(pid) or pd.isna(msg):
-            failed.append(("missing_fields", None))
-            continue
-        p = parents[parents["parent_id"] == pid]
-        if p.empty:
-            failed.append(("parent_not_found", int(pid)))
-            continue
-        pemail = p.iloc[0].get("parent_email")
-        pphone = p.iloc[0].get("parent_phone")
-        ok = False
-        info = ""
-        if channel == "email":
-            ok, info = send_email(pemail, subject="Attendance support update", body=msg)
-        elif channel == "twilio":
-            ok, info = send_sms_twilio(pphone, body=msg)
-        elif channel == "sms_stub":
-            ok, info = send_sms_stub(pphone, body=msg)
-        else:
-            failed.append(("unknown_channel", channel))
-            continue
-        (sent if ok else failed).append((int(pid), info))
-    return sent, failed
-
-if __name__ == "__main__":
-    # Example usage (adjust paths):
-    # alerts.csv contains columns: mentor_id, parent_id, message_mentor, message_parent
-    ALERTS = "alerts.csv"
-
-    mentor_files = ["Mentors_Institute1.csv", "Mentors_Institute2.csv"]
-    parent_files = ["Parents_Institute1.csv", "Parents_Institute2.csv"]
-
-    print("Sending mentor notifications (email)...")
-    m_ok, m_fail = send_to_mentors(ALERTS, mentor_files, channel="email")
-    print("Mentor sent:", m_ok)
-    print("Mentor failed:", m_fail)
-
-    print("Sending parent notifications (email)...")
-    p_ok, p_fail = send_to_parents(ALERTS, parent_files, channel="email")
-    print("Parent sent:", p_ok)
-    print("Parent failed:", p_fail)
+import atexit
+import hashlib
+import json
+import os
+import queue
+import smtplib
+import ssl
+import threading
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.message import EmailMessage
+from dataclasses import dataclass
+from typing import Optional
+
+from message_templates import (DEFAULT_LANGUAGE, render as render_messages, split_sms, subject_for,
+                               template_channel)
+
+# --- Config from environment (set these for the demo) ---
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASS = os.getenv("SMTP_PASS", "")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"   # 0 for a local plain-text stand-in server
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_MAX_PER_SESSION = int(os.getenv("SMTP_MAX_PER_SESSION", "100"))  # providers cap messages per connection
+
+# Twilio-style SMS (optional demo)
+TWILIO_SID = os.getenv("TWILIO_SID", "")
+TWILIO_AUTH = os.getenv("TWILIO_AUTH", "")
+TWILIO_FROM = os.getenv("TWILIO_FROM", "")
+
+# MSG91 or generic SMS provider (optional demo)
+SMS_API_KEY = os.getenv("SMS_API_KEY", "")
+
+# Per-channel dispatch limits: messages/sec (0 = unlimited) and parallel sends
+EMAIL_RATE = float(os.getenv("EMAIL_RATE", "10"))
+EMAIL_CONCURRENCY = int(os.getenv("EMAIL_CONCURRENCY", str(SMTP_POOL_SIZE)))
+TWILIO_RATE = float(os.getenv("TWILIO_RATE", "1"))          # long-code numbers send ~1 msg/sec
+TWILIO_CONCURRENCY = int(os.getenv("TWILIO_CONCURRENCY", "4"))
+SMS_RATE = float(os.getenv("SMS_RATE", "0"))
+SMS_CONCURRENCY = int(os.getenv("SMS_CONCURRENCY", "4"))
+SMS_MAX_PARTS = int(os.getenv("SMS_MAX_PARTS", "2"))   # segments per templated SMS; longer digests are split
+
+# Contact cache (off unless set): a directory only the notifier's user can write to
+CONTACT_CACHE_DIR = os.getenv("CONTACT_CACHE_DIR") or None
+
+# --- Dataclasses ---
+@dataclass
+class Contact:
+    name: str
+    email: Optional[str]
+    phone: Optional[str]
+
+# --- SMTP connection pool ---
+# Start of the info of a send that failed after the server may have accepted the message
+AMBIGUOUS_DELIVERY = "delivery unconfirmed"
+
+class _Session(smtplib.SMTP):
+    """smtplib.SMTP that records whether the current message got as far as DATA."""
+    data_started = False
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+class SMTPPool:
+    """
+    A few authenticated SMTP sessions kept open and reused for many messages.
+
+    Each session pays for connect + STARTTLS + login once instead of once per
+    message. A session is recycled after max_per_session messages, and a send
+    that fails because the connection dropped before the message reached
+    DATA is retried once on a fresh session, so callers never see stale
+    connections. Once DATA has started the server may already have accepted
+    the message, so a drop or a timeout from then on (and any timeout) is
+    reported as a failure and never resent here. The info of a failure after
+    DATA starts with AMBIGUOUS_DELIVERY, so callers that retry (the outbox)
+    can tell it from a message that was never sent. Thread-safe: at most
+    `size` sessions exist, and callers beyond that wait for a free one.
+    """
+
+    # Errors that mean the session is unusable (vs. a refused sender / recipient / message).
+    # Every SMTPException is an OSError, so these are told apart explicitly.
+    DROPPED = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, smtplib.SMTPHeloError)
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, user=SMTP_USER, password=SMTP_PASS,
+                 size=SMTP_POOL_SIZE, starttls=SMTP_STARTTLS, max_per_session=SMTP_MAX_PER_SESSION,
+                 timeout=30):
+        self.host, self.port = host, port
+        self.user, self.password = user, password
+        self.starttls = starttls
+        self.max_per_session = max_per_session
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()          # (server, messages sent on it)
+        self._slots = threading.Semaphore(size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.reconnects = 0
+        self.messages_sent = 0
+
+    def _connect(self):
+        server = _Session(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls(context=ssl.create_default_context())
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _discard(server):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect(), 0
+
+    def _checkin(self, server, count):
+        if count >= self.max_per_session:
+            self._discard(server)
+        else:
+            self._idle.put((server, count))
+
+    def send(self, msg: EmailMessage):
+        """Send one message on a pooled session; returns (ok, info) like send_email."""
+        with self._slots:
+            server, count = None, 0
+            for attempt in range(2):
+                try:
+                    if server is None:
+                        server, count = self._checkout()
+                    server.data_started = False
+                    server.send_message(msg)
+                except OSError as e:
+                    if isinstance(e, smtplib.SMTPException) and not isinstance(e, self.DROPPED):
+                        # Refused login/sender/recipient/data: smtplib has already reset
+                        # the transaction, so the session (if any) is still good
+                        if server is not None:
+                            self._checkin(server, count)
+                        return False, str(e)
+                    # Dropped / timed-out session: throw it away
+                    data_started = server is not None and server.data_started
+                    if server is not None:
+                        server.close()
+                        server = None
+                    if data_started:
+                        return False, f"{AMBIGUOUS_DELIVERY}: {e}"
+                    # Retry once on a new session only if the message cannot have been accepted yet
+                    if attempt == 1 or isinstance(e, TimeoutError):
+                        return False, str(e)
+                    with self._lock:
+                        self.reconnects += 1
+                    continue
+                self._checkin(server, count + 1)
+                with self._lock:
+                    self.messages_sent += 1
+                return True, "sent"
+
+    def close(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(server)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        return {"connections_opened": self.connections_opened, "reconnects": self.reconnects,
+                "messages_sent": self.messages_sent}
+
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
+def get_smtp_pool() -> SMTPPool:
+    """Process-wide pool built from the SMTP_* settings (closed at exit)."""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is None:
+            _smtp_pool = SMTPPool()
+            atexit.register(_smtp_pool.close)
+        return _smtp_pool
+
+# --- Email / SMS helpers ---
+def build_email(to_email: str, subject: str, body: str, sender_name: str = "Counseling Desk"):
+    msg = EmailMessage()
+    msg["From"] = f"{sender_name} <{SMTP_USER}>"
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    msg.set_content(body)
+    return msg
+
+def send_email(to_email: str, subject: str, body: str, sender_name: str = "Counseling Desk",
+               pool: Optional[SMTPPool] = None):
+    if not to_email:
+        return False, "missing email"
+    msg = build_email(to_email, subject, body, sender_name)
+    try:
+        # Reuses an open, logged-in session instead of a new handshake per message
+        return (pool or get_smtp_pool()).send(msg)
+    except Exception as e:
+        return False, str(e)
+
+def send_sms_twilio(to_phone: str, body: str):
+    if not (TWILIO_SID and TWILIO_AUTH and TWILIO_FROM and to_phone):
+        return False, "twilio not configured"
+    try:
+        # Lazy import to keep prototype minimal
+        from twilio.rest import Client
+        client = Client(TWILIO_SID, TWILIO_AUTH)
+        message = client.messages.create(body=body, from_=TWILIO_FROM, to=to_phone)
+        return True, message.sid
+    except Exception as e:
+        return False, str(e)
+
+# Stub for generic SMS vendor; implement requests.post if needed
+def send_sms_stub(to_phone: str, body: str):
+    if not (SMS_API_KEY and to_phone):
+        return False, "sms vendor not configured"
+    # For prototype: print to console to simulate
+    print(f"[SMS-> {to_phone}] {body[:120]}...")
+    return True, "stubbed"
+
+# --- Concurrent dispatch ---
+@dataclass
+class ChannelLimit:
+    rate: float = 0.0        # messages per second, 0 = unlimited
+    burst: int = 1           # messages allowed back to back before the rate applies
+    concurrency: int = 1     # sends in flight at once
+
+CHANNEL_LIMITS = {
+    "email": ChannelLimit(EMAIL_RATE, burst=max(1, EMAIL_CONCURRENCY), concurrency=EMAIL_CONCURRENCY),
+    "twilio": ChannelLimit(TWILIO_RATE, concurrency=TWILIO_CONCURRENCY),
+    "sms_stub": ChannelLimit(SMS_RATE, concurrency=SMS_CONCURRENCY),
+}
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a send is allowed."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class Dispatcher:
+    """
+    Sends messages on several channels at once, each within its own limits.
+
+    Every channel gets a thread pool sized to its concurrency cap and a token
+    bucket for its rate, so throughput is bounded by the provider limits
+    rather than by the latency of one send after another. submit() returns a
+    Future resolving to (ok, (key, info)); collect() turns a list of those
+    into the (sent, failed) lists the senders return.
+    """
+
+    def __init__(self, limits: Optional[dict] = None, smtp_pool: Optional[SMTPPool] = None):
+        self.limits = {**CHANNEL_LIMITS, **(limits or {})}
+        self.smtp_pool = smtp_pool
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def _channel(self, name):
+        with self._lock:
+            if name not in self._channels:
+                limit = self.limits[name]
+                self._channels[name] = (
+                    TokenBucket(limit.rate, limit.burst),
+                    ThreadPoolExecutor(max_workers=max(1, limit.concurrency), thread_name_prefix=f"notify-{name}"),
+                )
+            return self._channels[name]
+
+    def _send(self, channel, to, subject, body):
+        if channel == "email":
+            return send_email(to, subject=subject, body=body, pool=self.smtp_pool)
+        if channel == "twilio":
+            return send_sms_twilio(to, body=body)
+        return send_sms_stub(to, body=body)
+
+    def submit(self, channel: str, key, to, body: str, subject: str = "") -> Future:
+        if channel not in self.limits:
+            raise ValueError(f"unknown channel: {channel}")
+        bucket, executor = self._channel(channel)
+
+        def run():
+            bucket.acquire()
+            try:
+                ok, info = self._send(channel, to, subject, body)
+            except Exception as e:
+                ok, info = False, str(e)
+            return ok, (key, info)
+        return executor.submit(run)
+
+    @staticmethod
+    def collect(outcomes):
+        """(sent, failed) in submission order; non-Future outcomes are failures recorded up front."""
+        sent, failed = [], []
+        for outcome in outcomes:
+            if isinstance(outcome, Future):
+                ok, item = outcome.result()
+                (sent if ok else failed).append(item)
+            else:
+                failed.append(outcome)
+        return sent, failed
+
+    def shutdown(self):
+        with self._lock:
+            channels, self._channels = self._channels, {}
+        for _, executor in channels.values():
+            executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+_dispatcher = None
+
+def get_dispatcher() -> Dispatcher:
+    """Process-wide dispatcher, so channel limits hold across send_to_* calls."""
+    global _dispatcher
+    with _smtp_pool_lock:
+        if _dispatcher is None:
+            _dispatcher = Dispatcher()
+            atexit.register(_dispatcher.shutdown)
+        return _dispatcher
+
+# --- Loading contacts ---
+# Accepted header spellings per canonical column (matched case-insensitively).
+# If column headers differ slightly, add them here but DO NOT modify file contents.
+CONTACT_ALIASES = {
+    "mentor": {"mentor_id": ("mentor_id", "mentorid"), "mentor_name": ("mentor_name", "mentorname"),
+               "mentor_email": ("mentor_email", "email"), "mentor_phone": ("mentor_phone", "phone"),
+               "mentor_language": ("mentor_language", "language")},
+    "parent": {"parent_id": ("parent_id", "parentid"), "parent_name": ("parent_name", "parentname"),
+               "parent_email": ("parent_email", "email"), "parent_phone": ("parent_phone", "phone"),
+               "parent_language": ("parent_language", "language")},
+}
+CONTACT_CACHE_VERSION = 3
+
+def normalize_contacts(df, role):
+    """Rename aliased headers to the canonical columns for role; absent ones become None, IDs numeric."""
+    cols = {c.lower(): c for c in df.columns}
+    out = {}
+    for column, variants in CONTACT_ALIASES[role].items():
+        source = next((cols[v] for v in variants if v in cols), None)
+        out[column] = df[source] if source is not None else pd.Series(None, index=df.index, dtype=object)
+    out[f"{role}_id"] = pd.to_numeric(out[f"{role}_id"], errors="coerce")
+    return pd.DataFrame(out)
+
+class ContactDirectory:
+    """
+    Contacts of one role ("mentor" or "parent") indexed by ID.
+
+    Files are normalized once with column operations and deduplicated on the
+    ID (first file wins). Lookups go through a hashed pd.Index, so resolving
+    a whole alerts file is one positions() call rather than a scan of the
+    contacts per alert. load() can keep the normalized table in an opt-in
+    cache directory as plain arrays (.npz read with allow_pickle=False, so a
+    tampered cache can at worst give wrong contacts, never run code) and
+    reuses it while the files are unchanged (size + mtime).
+    """
+
+    def __init__(self, frame: pd.DataFrame, role: str):
+        self.role = role
+        self.id_column = f"{role}_id"
+        frame = frame[frame[self.id_column].notna()]     # no ID: nothing can address it
+        self.frame = frame.drop_duplicates(subset=[self.id_column]).reset_index(drop=True)
+        self._index = pd.Index(self.frame[self.id_column])
+
+    @classmethod
+    def from_files(cls, files, role):
+        # As text, so phone numbers keep their "+" and leading zeros
+        frames = [normalize_contacts(pd.read_csv(path, dtype=str), role) for path in files]
+        return cls(pd.concat(frames, ignore_index=True), role)
+
+    @classmethod
+    def load(cls, files, role, cache_dir=CONTACT_CACHE_DIR):
+        """
+        Directory for the contact files, read through the array cache if one is configured.
+
+        Args:
+            files: Contact CSVs of one role
+            role: "mentor" or "parent"
+            cache_dir: Where to keep the cache (None, the default unless CONTACT_CACHE_DIR
+                       is set, always parses the CSVs)
+        """
+        files = [os.path.abspath(path) for path in files]
+        if not (cache_dir and files):
+            return cls.from_files(files, role)
+        key = hashlib.sha1("\n".join([role, *files]).encode()).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"contacts_{role}_{key}.npz")
+        signature = [[path, os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in files]
+        frame = _read_contact_cache(cache_path, signature)
+        if frame is not None:
+            return cls(frame, role)
+        directory = cls.from_files(files, role)
+        try:
+            _write_contact_cache(cache_path, signature, directory.frame)
+        except OSError:
+            pass    # unwritable cache dir: the directory still works, just uncached
+        return directory
+
+    def __len__(self):
+        return len(self.frame)
+
+    def positions(self, ids):
+        """Row position of every ID in self.frame, -1 where unknown (or missing)."""
+        return self._index.get_indexer(pd.to_numeric(pd.Series(ids), errors="coerce"))
+
+    def get(self, contact_id) -> Optional[Contact]:
+        pos = self.positions([contact_id])[0]
+        if pos < 0:
+            return None
+        row = self.frame.iloc[pos]
+        return Contact(row[f"{self.role}_name"], row[f"{self.role}_email"], row[f"{self.role}_phone"])
+
+def _read_contact_cache(path, signature):
+    """Cached contact table if path exists and was written for these exact files, else None."""
+    try:
+        with np.load(path, allow_pickle=False) as cached:
+            meta = json.loads(str(cached["meta"]))
+            if meta["version"] != CONTACT_CACHE_VERSION or meta["signature"] != signature:
+                return None
+            columns = {}
+            for i, column in enumerate(meta["columns"]):
+                values = cached[f"c{i}"]
+                if f"n{i}" in cached:
+                    # Text column: back to Python strings, NaN where the CSV had no value
+                    values = values.astype(object)
+                    values[cached[f"n{i}"]] = np.nan
+                columns[column] = values
+            return pd.DataFrame(columns)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+def _write_contact_cache(path, signature, frame):
+    arrays = {"meta": np.array(json.dumps({"version": CONTACT_CACHE_VERSION, "signature": signature,
+                                           "columns": list(frame.columns)}))}
+    for i, column in enumerate(frame.columns):
+        values = frame[column]
+        if pd.api.types.is_numeric_dtype(values.dtype):
+            arrays[f"c{i}"] = values.to_numpy()
+        else:
+            # Fixed-width unicode plus a null mask: no object arrays, so np.load never needs pickle
+            arrays[f"c{i}"] = np.asarray(values.fillna("").astype(str), dtype=str)
+            arrays[f"n{i}"] = values.isna().to_numpy()
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+def load_mentors(mentor_files):
+    # Expected columns: mentor_id, mentor_name, mentor_email?, mentor_phone?
+    return ContactDirectory.from_files(mentor_files, "mentor").frame
+
+def load_parents(parent_files):
+    return ContactDirectory.from_files(parent_files, "parent").frame
+
+# --- Digests ---
+def _alert_ids(alerts, role):
+    """Numeric recipient IDs of the alerts (role_id, or the roleid alias), NaN where missing."""
+    ids = alerts.get(f"{role}_id", alerts.get(f"{role}id"))
+    if ids is None:
+        return pd.Series(float("nan"), index=alerts.index)
+    return pd.to_numeric(ids, errors="coerce")
+
+def build_digests(alerts, role):
+    """
+    One consolidated alert row per recipient instead of one per student.
+
+    Rows are grouped on the recipient ID (mentor_id, or parent_id so siblings
+    share one message) and their messages concatenated, highest Risk_Score
+    first. Mentors get a count header over a bulleted list; parents get
+    their children's messages one after another. Rows without an ID or a
+    message are passed through unchanged so the senders still report them.
+
+    Returns:
+        DataFrame with {role}_id, message_{role}, students and (if present) Risk_Score
+        (the highest) and language (the recipient's first row)
+    """
+    key, message = f"{role}_id", f"message_{role}"
+    ids = _alert_ids(alerts, role)
+    messages = alerts.get(message, pd.Series(None, index=alerts.index, dtype=object))
+    valid = ids.notna() & messages.notna()
+    df = pd.DataFrame({key: ids[valid], message: messages[valid].astype(str)})
+    if "language" in alerts:
+        df["language"] = alerts.loc[valid, "language"]
+    if "Risk_Score" in alerts:
+        df["Risk_Score"] = pd.to_numeric(alerts.loc[valid, "Risk_Score"], errors="coerce")
+        df = df.sort_values([key, "Risk_Score"], ascending=[True, False], kind="stable")
+    else:
+        df = df.sort_values(key, kind="stable")
+
+    lines = "- " + df[message] if role == "mentor" else df[message]
+    grouped = lines.groupby(df[key], sort=False)
+    counts = grouped.size()
+    bodies = grouped.agg("\n".join if role == "mentor" else "\n\n".join)
+    if role == "mentor":
+        plural = pd.Series(np.where(counts.to_numpy() == 1, " student needs", " students need"), index=counts.index)
+        bodies = (counts.astype(str) + plural + " attention this week (highest risk first):\n\n" + bodies)
+    digests = pd.DataFrame({key: counts.index.to_numpy(), message: bodies.to_numpy(),
+                            "students": counts.to_numpy()})
+    if "Risk_Score" in df:
+        digests["Risk_Score"] = df.groupby(key, sort=False)["Risk_Score"].max().to_numpy()
+    if "language" in df:
+        digests["language"] = df.groupby(key, sort=False)["language"].first().to_numpy()
+    passthrough = pd.DataFrame({key: ids[~valid], message: messages[~valid]})
+    if "language" in alerts:
+        passthrough["language"] = alerts.loc[~valid, "language"]
+    return pd.concat([digests, passthrough], ignore_index=True) if len(passthrough) else digests
+
+# --- Main senders ---
+def resolve_alerts(alerts, directory, channel, channels=CHANNEL_LIMITS):
+    """
+    Pair every alert row with its recipient's address.
+
+    Yields, in row order, either (recipient_id, address, message) or a
+    failure tuple such as ("missing_fields", None) / ("mentor_not_found", id).
+    """
+    role = directory.role
+    ids = _alert_ids(alerts, role)
+    messages = alerts.get(f"message_{role}", pd.Series(None, index=alerts.index, dtype=object))
+    positions = directory.positions(ids)
+    addresses = directory.frame[f"{role}_email" if channel == "email" else f"{role}_phone"].to_numpy()
+    for key, msg, pos in zip(ids.to_numpy(), messages.to_numpy(), positions):
+        if pd.isna(key) or pd.isna(msg):
+            yield ("missing_fields", None)
+        elif pos < 0:
+            yield (f"{role}_not_found", int(key))
+        elif channel not in channels:
+            yield ("unknown_channel", channel)
+        else:
+            yield int(key), addresses[pos], msg
+
+def row_subjects(alerts, subject):
+    """Subject per alert row: the "subject" column where there is one, else the same subject for all."""
+    return alerts["subject"].tolist() if "subject" in alerts else [subject] * len(alerts)
+
+def _send_alerts(alerts, directory, channel, subject, dispatcher, outbox=None):
+    if outbox is not None:
+        # Durable path: queue (skipping anything already queued this week), then drain
+        failed = outbox.enqueue(alerts, directory, channel, subject)
+        sent, send_failed = outbox.deliver(dispatcher, role=directory.role, channel=channel)
+        return sent, failed + send_failed
+    outcomes = []
+    for item, row_subject in zip(resolve_alerts(alerts, directory, channel, dispatcher.limits),
+                                 row_subjects(alerts, subject)):
+        if len(item) == 3:
+            key, address, msg = item
+            item = dispatcher.submit(channel, key, address, body=msg, subject=row_subject)
+        outcomes.append(item)
+    return dispatcher.collect(outcomes)
+
+def _split_sms(alerts, message):
+    """One row per SMS: a digest longer than SMS_MAX_PARTS segments becomes several rows (part 1, 2, ...)."""
+    texts = alerts[message].dropna()
+    parts = split_sms(texts, SMS_MAX_PARTS)
+    split = alerts.loc[parts.index].assign(**{message: parts.to_numpy()})
+    split["part"] = split.groupby(level=0).cumcount() + 1
+    alerts = pd.concat([split, alerts.drop(index=texts.index).assign(part=1)]).sort_index(kind="stable")
+    return alerts.reset_index(drop=True)
+
+def _prepare_alerts(alerts_csv, directory, channel, subject, digest, render):
+    role = directory.role
+    message = f"message_{role}"
+    alerts = pd.read_csv(alerts_csv)
+    render = render or message not in alerts
+    if render:
+        if "language" not in alerts:
+            # Recipient's language from the contact files (English where unknown)
+            positions = directory.positions(_alert_ids(alerts, role))
+            languages = directory.frame[f"{role}_language"].to_numpy()
+            alerts["language"] = np.where(positions >= 0, languages[positions], None)
+        # Fresh text from notifications/templates/ (per channel, and per row if there is a language column)
+        alerts[message] = render_messages(alerts, role, channel, max_parts=None)
+    if digest:
+        alerts = build_digests(alerts, role)
+    if render:
+        # Subject in each recipient's language, like the body
+        languages = alerts["language"].fillna(DEFAULT_LANGUAGE).astype(str)
+        subjects = {lang: subject_for(role, channel, lang) or subject for lang in languages.unique()}
+        alerts["subject"] = languages.map(subjects)
+        if template_channel(channel) == "sms":
+            alerts = _split_sms(alerts, message)
+    return alerts, subject
+
+def send_to_mentors(alerts_csv, mentor_files, channel="email", dispatcher: Optional[Dispatcher] = None,
+                    digest=True, outbox=None, render=False):
+    # alerts must have: mentor_id, message_mentor
+    # digest=True sends each mentor one message covering all of their students
+    # outbox (outbox.Outbox) makes the run resumable: see notifications/outbox.py
+    # render=True (or no message_mentor column) builds the text from notifications/templates/
+    directory = ContactDirectory.load(mentor_files, "mentor")
+    alerts, subject = _prepare_alerts(alerts_csv, directory, channel, "At-risk students: weekly digest",
+                                      digest, render)
+    return _send_alerts(alerts, directory, channel, subject, dispatcher or get_dispatcher(), outbox)
+
+def send_to_parents(alerts_csv, parent_files, channel="email", dispatcher: Optional[Dispatcher] = None,
+                    digest=True, outbox=None, render=False):
+    # alerts must have: parent_id, message_parent
+    # digest=True sends parents of several flagged siblings one message
+    # outbox (outbox.Outbox) makes the run resumable: see notifications/outbox.py
+    # render=True (or no message_parent column) builds the text from notifications/templates/
+    directory = ContactDirectory.load(parent_files, "parent")
+    alerts, subject = _prepare_alerts(alerts_csv, directory, channel, "Attendance support update",
+                                      digest, render)
+    return _send_alerts(alerts, directory, channel, subject, dispatcher or get_dispatcher(), outbox)
+
+if __name__ == "__main__":
+    # Example usage (adjust paths):
+    # alerts.csv contains columns: mentor_id, parent_id, message_mentor, message_parent
+    ALERTS = "alerts.csv"
+
+    mentor_files = ["Mentors_Institute1.csv", "Mentors_Institute2.csv"]
+    parent_files = ["Parents_Institute1.csv", "Parents_Institute2.csv"]
+
+    print("Sending mentor notifications (email)...")
+    m_ok, m_fail = send_to_mentors(ALERTS, mentor_files, channel="email")
+    print("Mentor sent:", m_ok)
+    print("Mentor failed:", m_fail)
+
+    print("Sending parent notifications (email)...")
+    p_ok, p_fail = send_to_parents(ALERTS, parent_files, channel="email")
+    print("Parent sent:", p_ok)
+    print("Parent failed:", p_fail)
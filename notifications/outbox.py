@@ -0,0 +1,326 @@
+"""
+Durable SQLite outbox for notifications: resumable runs, retries, no duplicate sends.
+
+    from outbox import Outbox
+    with Outbox() as box:
+        sent, failed = send_to_parents("alerts.csv", parent_files, outbox=box)
+
+Every message is written to the outbox before anything is sent, under an
+idempotency key
+
+    (recipient, week, channel)      e.g. "parent:300001|2025-W37|email"
+
+so queueing the same alerts file again in the same week adds nothing (a
+digest split over several SMS gets "|2", "|3", ... on its later parts).
+Delivery claims due messages in batches (BEGIN IMMEDIATE, so several worker
+processes can share one outbox), hands them to the notifier's Dispatcher
+(which enforces the per-channel rate and concurrency limits) and records
+every result as soon as it comes back. A failure is retried with
+exponential backoff (base * 2^(attempt-1), capped, +/-20% jitter) until
+max_attempts; permanent errors (no address, channel not configured, SMTP
+5xx replies) are not retried. A send whose connection failed after the
+message reached the server (notifier.AMBIGUOUS_DELIVERY) may well have been
+delivered, so it is never retried either: it is marked "review" for a
+person to check, and requeue-failed leaves it alone.
+
+A crash or Ctrl+C leaves already-sent messages marked sent and the rest
+pending, and the next run picks up exactly those. A worker renews the lease
+on every message it still holds (sending, or queued behind the channel's
+rate limit) every lease/3 seconds, so a slow batch is never reclaimed from
+under it; only messages of a worker that died are reclaimed, `lease`
+seconds after its last renewal, and only those (at most the messages in
+flight at the time) can ever be sent twice. A long deliver() prints a
+progress line every progress_every seconds.
+
+    python outbox.py status                  # counts per status
+    python outbox.py deliver --batch-size 200
+"""
+import argparse
+import os
+import random
+import re
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait as wait_for
+from contextlib import contextmanager
+
+from notifier import AMBIGUOUS_DELIVERY, get_dispatcher, resolve_alerts, row_subjects
+
+OUTBOX_PATH = os.getenv("NOTIFY_OUTBOX", os.path.join(os.path.dirname(os.path.abspath(__file__)), "outbox.db"))
+
+STATUSES = ("pending", "sending", "sent", "failed", "review")
+PERMANENT_ERRORS = re.compile(r"missing email|not configured|\(5\d\d,")
+PROGRESS_EVERY = 30.0   # seconds between progress lines during deliver()
+
+
+def current_week(ts=None):
+    """ISO week label, e.g. "2025-W37"."""
+    return time.strftime("%G-W%V", time.localtime(ts))
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def is_permanent(info):
+    """True for failures a retry cannot fix (bad address, unconfigured channel, SMTP 5xx)."""
+    return info is None or bool(PERMANENT_ERRORS.search(str(info)))
+
+def is_ambiguous(info):
+    """True for failures after which the message may have been delivered anyway."""
+    return str(info).startswith(AMBIGUOUS_DELIVERY)
+
+
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH, max_attempts=5, backoff_base=2.0, backoff_max=300.0, lease=300.0):
+        """
+        Args:
+            path: SQLite file (created on first use)
+            max_attempts: Sends tried per message before it is marked failed
+            backoff_base: Seconds before the first retry (doubles every attempt)
+            backoff_max: Longest wait between two attempts
+            lease: Seconds without a renewal after which a claimed message is reclaimed
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self.last_enqueued = 0      # rows the latest enqueue() added (the rest were already queued)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY, idem_key TEXT NOT NULL UNIQUE,"
+            " role TEXT NOT NULL, recipient_id INTEGER NOT NULL, week TEXT NOT NULL, channel TEXT NOT NULL,"
+            " address TEXT, subject TEXT NOT NULL, body TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL, claimed_by TEXT, claimed_at REAL,"
+            " last_error TEXT, info TEXT, created_at REAL NOT NULL, sent_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def _transaction(self, mode="IMMEDIATE"):
+        with self._lock:
+            self.conn.execute(f"BEGIN {mode}")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    # ========== Queueing ==========
+    def enqueue(self, alerts, directory, channel, subject, week=None):
+        """
+        Queue one message per alert row (use notifier.build_digests first for digests).
+
+        Rows whose key is already in the outbox are skipped, whatever their status.
+        Optional "subject" and "part" columns give a row its own subject and
+        mark the later parts of a message split over several SMS.
+
+        Returns:
+            list of failure tuples for rows that could not be queued (as in notifier's failed list)
+        """
+        week = week or current_week()
+        now = time.time()
+        role = directory.role
+        parts = alerts["part"].tolist() if "part" in alerts else [1] * len(alerts)
+        rows, failed = [], []
+        for item, row_subject, part in zip(resolve_alerts(alerts, directory, channel),
+                                           row_subjects(alerts, subject), parts):
+            if len(item) != 3:
+                failed.append(item)
+                continue
+            key, address, body = item
+            address = None if address is None or address != address else str(address)   # NaN -> None
+            idem_key = f"{role}:{key}|{week}|{channel}" + (f"|{part}" if part > 1 else "")
+            rows.append((idem_key, role, key, week, channel, address, row_subject, str(body), now, now))
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO outbox (idem_key, role, recipient_id, week, channel, address,"
+                " subject, body, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.last_enqueued = conn.total_changes - before
+        return failed
+
+    # ========== Delivery ==========
+    def claim(self, batch_size=100, worker_id=None, role=None, channel=None):
+        """Atomically take up to batch_size due messages for this worker."""
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        where = ["((status = 'pending' AND next_attempt_at <= ?) OR (status = 'sending' AND claimed_at < ?))"]
+        params = [now, now - self.lease]
+        if role is not None:
+            where.append("role = ?")
+            params.append(role)
+        if channel is not None:
+            where.append("channel = ?")
+            params.append(channel)
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, recipient_id, channel, address, subject, body, attempts FROM outbox"
+                f" WHERE {' AND '.join(where)} ORDER BY next_attempt_at, id LIMIT ?",
+                [*params, batch_size]).fetchall()
+            conn.executemany("UPDATE outbox SET status = 'sending', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                             [(worker_id, now, row[0]) for row in rows])
+        return rows
+
+    def _backoff(self, attempts):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _record(self, message_id, attempts, ok, info):
+        now = time.time()
+        with self._transaction() as conn:
+            if ok:
+                conn.execute("UPDATE outbox SET status = 'sent', attempts = ?, info = ?, sent_at = ?,"
+                             " claimed_by = NULL WHERE id = ?", (attempts, str(info), now, message_id))
+            elif is_ambiguous(info):
+                # Resending could deliver it twice: leave it for a person to check
+                conn.execute("UPDATE outbox SET status = 'review', attempts = ?, last_error = ?,"
+                             " claimed_by = NULL WHERE id = ?", (attempts, str(info), message_id))
+                return "review"
+            elif attempts >= self.max_attempts or is_permanent(info):
+                conn.execute("UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?,"
+                             " claimed_by = NULL WHERE id = ?", (attempts, str(info), message_id))
+                return "failed"
+            else:
+                conn.execute("UPDATE outbox SET status = 'pending', attempts = ?, last_error = ?,"
+                             " next_attempt_at = ?, claimed_by = NULL WHERE id = ?",
+                             (attempts, str(info), now + self._backoff(attempts), message_id))
+                return "retry"
+        return "sent"
+
+    def _renew(self, message_ids, worker_id):
+        """Extend the lease on messages this worker still holds, so no other worker reclaims them."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany("UPDATE outbox SET claimed_at = ? WHERE id = ? AND claimed_by = ? AND status = 'sending'",
+                             [(now, i, worker_id) for i in message_ids])
+
+    def _release(self, message_ids):
+        with self._transaction() as conn:
+            conn.executemany("UPDATE outbox SET status = 'pending', claimed_by = NULL WHERE id = ?",
+                             [(i,) for i in message_ids])
+
+    def _next_due(self, role, channel):
+        where, params = ["status = 'pending'"], []
+        if role is not None:
+            where.append("role = ?")
+            params.append(role)
+        if channel is not None:
+            where.append("channel = ?")
+            params.append(channel)
+        return self.conn.execute(f"SELECT MIN(next_attempt_at) FROM outbox WHERE {' AND '.join(where)}",
+                                 params).fetchone()[0]
+
+    def deliver(self, dispatcher=None, role=None, channel=None, batch_size=100, worker_id=None, wait=True,
+                progress_every=PROGRESS_EVERY):
+        """
+        Send due messages until none are left (or, with wait=False, none are due now).
+
+        Args:
+            dispatcher: notifier.Dispatcher enforcing the channel limits (default: the shared one)
+            role, channel: Only deliver messages for this role / channel
+            batch_size: Messages claimed per transaction
+            wait: Sleep through retry backoffs instead of returning with retries still pending
+            progress_every: Seconds between progress lines (None for none)
+
+        Returns:
+            (sent, failed): (recipient_id, info) for messages delivered or given up on by this call
+                            (failed includes the ones marked for review)
+        """
+        dispatcher = dispatcher or get_dispatcher()
+        worker_id = worker_id or default_worker_id()
+        sent, failed = [], []
+        reported = time.monotonic()
+        renew_every = self.lease / 3
+        tick = min(filter(None, (renew_every, progress_every)), default=None)
+
+        def report(waiting=0.0):
+            nonlocal reported
+            if progress_every is not None and time.monotonic() - reported >= progress_every:
+                note = f", waiting {waiting:.0f}s for retries" if waiting >= 1 else ""
+                print(f"📤 Outbox: {len(sent)} sent, {len(failed)} given up{note}", flush=True)
+                reported = time.monotonic()
+
+        while True:
+            batch = self.claim(batch_size, worker_id, role, channel)
+            if not batch:
+                due = self._next_due(role, channel) if wait else None
+                if due is None:
+                    return sent, failed
+                delay = max(0.0, min(due - time.time(), self.backoff_max))
+                report(delay)
+                time.sleep(delay)
+                continue
+            futures = {dispatcher.submit(ch, message_id, address, body=body, subject=subject):
+                       (message_id, recipient_id, attempts)
+                       for message_id, recipient_id, ch, address, subject, body, attempts in batch}
+            renewed = time.monotonic()
+            # Results are committed one by one as they arrive: a crash loses at most what is in flight
+            try:
+                while futures:
+                    done, _ = wait_for(futures, timeout=tick, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        message_id, recipient_id, attempts = futures.pop(future)
+                        ok, (_, info) = future.result()
+                        outcome = self._record(message_id, attempts + 1, ok, info)
+                        if outcome == "sent":
+                            sent.append((recipient_id, info))
+                        elif outcome in ("failed", "review"):
+                            failed.append((recipient_id, info))
+                    if futures and renew_every and time.monotonic() - renewed >= renew_every:
+                        # Still queued behind the rate limit or mid-send: keep the claim
+                        self._renew([message_id for message_id, _, _ in futures.values()], worker_id)
+                        renewed = time.monotonic()
+                    report()
+            except BaseException:
+                # Hand back what never started; anything mid-send stays claimed until its lease ends
+                self._release([futures[f][0] for f in list(futures) if f.cancel()])
+                raise
+
+    # ========== Inspection ==========
+    def stats(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        return counts
+
+    def requeue_failed(self):
+        """
+        Give messages marked failed another full set of attempts (e.g. after fixing SMTP settings).
+
+        Messages in review are not touched: they may have been delivered already.
+        """
+        with self._transaction() as conn:
+            return conn.execute("UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ?"
+                                " WHERE status = 'failed'", (time.time(),)).rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or drain the notification outbox.")
+    parser.add_argument("command", choices=["status", "deliver", "requeue-failed"])
+    parser.add_argument("--db", default=OUTBOX_PATH)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--no-wait", action="store_true", help="deliver: return instead of waiting out retries")
+    args = parser.parse_args()
+    with Outbox(args.db) as box:
+        if args.command == "deliver":
+            sent, failed = box.deliver(batch_size=args.batch_size, wait=not args.no_wait)
+            print(f"✅ Sent {len(sent)}, gave up on {len(failed)}")
+        elif args.command == "requeue-failed":
+            print(f"🔁 Requeued {box.requeue_failed()} messages")
+        print(box.stats())
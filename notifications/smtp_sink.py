@@ -0,0 +1,154 @@
+"""
+Local stand-in SMTP server for tests and benchmarks (standard library only).
+
+Speaks just enough SMTP for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN (any
+credentials), MAIL, RCPT, DATA, RSET, NOOP, QUIT. Messages are kept in
+memory instead of being delivered. No STARTTLS, so point the notifier at it
+with SMTP_STARTTLS=0.
+
+    with SMTPSink(latency_ms=20) as sink:
+        pool = SMTPPool("127.0.0.1", sink.port, starttls=False)
+        ...
+        sink.messages, sink.connections
+
+latency_ms delays every reply to stand in for the round trip to a real
+provider (a local socket would make connection setup look free),
+drop_after closes each connection after that many messages to exercise
+reconnects, and hang_up_in_data accepts a message but hangs up before
+confirming it (the case a client must not resend).
+
+    python smtp_sink.py --port 2525 --latency-ms 20
+"""
+import argparse
+import base64
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+        self.wfile.flush()
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        delivered = 0
+        sender, recipients = None, []
+        self.reply("220 smtp-sink ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb = line[:4].upper()
+            if verb == "EHLO":
+                self.reply("250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 smtp-sink")
+            elif verb == "AUTH":
+                if line.upper().startswith("AUTH LOGIN"):
+                    self.reply("334 " + base64.b64encode(b"Username:").decode())
+                    self.rfile.readline()
+                    self.reply("334 " + base64.b64encode(b"Password:").decode())
+                    self.rfile.readline()
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                sender, recipients = line[10:].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = line[8:].strip()
+                if address.strip("<>") in sink.reject:
+                    self.reply("550 5.1.1 No such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                while True:
+                    raw = self.rfile.readline()
+                    if not raw or raw in (b".\r\n", b".\n"):
+                        break
+                    body.append(raw[1:] if raw.startswith(b"..") else raw)
+                with sink.lock:
+                    sink.messages.append({"from": sender, "to": recipients, "data": b"".join(body)})
+                delivered += 1
+                if sink.hang_up_in_data:
+                    return      # message kept, but the client never hears back
+                self.reply("250 OK queued")
+                if sink.drop_after and delivered >= sink.drop_after:
+                    return      # hang up without a goodbye, like an idle-timeout
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """
+    Threaded SMTP sink on 127.0.0.1.
+
+    Args:
+        port: Port to listen on (0 picks a free one; see .port)
+        latency_ms: Delay before every reply, to mimic network round trips
+        drop_after: Close each connection after this many messages (None = never)
+        reject: Recipient addresses answered with 550
+        hang_up_in_data: Close the connection after receiving a message, before the 250 reply
+    """
+
+    def __init__(self, port=0, latency_ms=0, drop_after=None, reject=(), hang_up_in_data=False):
+        self.messages = []
+        self.connections = 0
+        self.drop_after = drop_after
+        self.hang_up_in_data = hang_up_in_data
+        self.reject = set(reject)
+        self.lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", port), _Handler)
+        self._server.sink = self
+        self._server.latency = latency_ms / 1000
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink that accepts and discards mail.")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    sink = SMTPSink(args.port, args.latency_ms)
+    print(f"📬 SMTP sink on 127.0.0.1:{sink.port} (SMTP_STARTTLS=0), Ctrl+C to stop")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"✅ {len(sink.messages)} messages over {sink.connections} connections")
@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+import pytest
+
+import notifier
+from message_templates import Template, fit_sms, load_template, render, split_sms
+
+
+@pytest.fixture
+def scored():
+    return pd.DataFrame({
+        "student_id": [101, 102, 103],
+        "student_name": ["Asha Rao", "Ravi Kumar", "Neha Iyer"],
+        "mentor_name": ["Meera Shah"] * 3,
+        "parent_name": ["Sunita Rao", "Vikram Kumar", "Lakshmi Iyer"],
+        "Risk_Level": ["High", "Medium", "High"],
+        "Risk_Score": [0.87, 0.42, 0.91],
+    })
+
+def test_template_compiles_fields_and_subject():
+    template = Template("Subject: Hello\nDear {name}, {score:.0%} for {name}. {{literal}}\n")
+    assert template.subject == "Hello" and template.fields == ["name", "score"]
+    out = template.render(pd.DataFrame({"name": ["A", "B"], "score": [0.5, 0.25]}))
+    assert out.tolist() == ["Dear A, 50% for A. {literal}", "Dear B, 25% for B. {literal}"]
+
+def test_render_per_row_language_with_english_fallback(scored):
+    scored["language"] = ["hi", "en", "ta"]
+    out = render(scored, "parent", "email")
+    assert out[0].startswith("नमस्ते Sunita Rao")
+    assert out[1].startswith("Dear Vikram Kumar") and out[2].startswith("Dear Lakshmi Iyer")
+
+def test_missing_fields_are_reported(scored):
+    with pytest.raises(ValueError, match="mentor_name"):
+        render(scored.drop(columns="mentor_name"), "parent", "sms")
+
+def test_sms_truncation_by_encoding():
+    out = fit_sms(pd.Series(["x" * 200, "ह" * 100, "short"]))
+    assert out.str.len().tolist() == [160, 70, 5] and out[0].endswith("...")
+    assert fit_sms(pd.Series(["x" * 400]), max_parts=2).str.len().tolist() == [306]
+
+def test_notifier_renders_when_alerts_have_no_messages(tmp_path, scored, monkeypatch):
+    sent_bodies = []
+    monkeypatch.setattr(notifier, "send_sms_stub", lambda to_phone, body: (sent_bodies.append(body), (True, "ok"))[1])
+    scored["parent_id"] = [1, 2, 1]
+    alerts = tmp_path / "alerts.csv"
+    scored.to_csv(alerts, index=False)
+    parents = tmp_path / "parents.csv"
+    parents.write_text("parent_id,parent_name,parent_phone,language\n1,Sunita Rao,+911,hi\n2,Vikram Kumar,+912,en\n")
+    with notifier.Dispatcher({"sms_stub": notifier.ChannelLimit(concurrency=1)}) as dispatcher:
+        sent, failed = notifier.send_to_parents(str(alerts), [str(parents)], channel="sms_stub", dispatcher=dispatcher)
+    # Parent 1's Hindi digest of two children does not fit two segments: it goes out as two SMS
+    assert [key for key, _ in sent] == [1, 1, 2] and not failed
+    assert sent_bodies[0].startswith("नमस्ते") and sent_bodies[2].startswith("Dear Vikram Kumar")
+    assert "Neha Iyer" in sent_bodies[0] and "Asha Rao" in sent_bodies[1]
+    assert all(len(body) <= 2 * 67 for body in sent_bodies[:2])
+
+def test_split_sms_keeps_every_line():
+    digest = "3 students need attention:\n\n" + "\n".join(f"- student {i} " + "x" * 40 for i in range(6))
+    parts = split_sms(pd.Series([digest, "short"], index=[7, 8]))
+    assert parts.index.tolist()[-1] == 8 and set(parts.index[:-1]) == {7}
+    assert (parts.str.len() <= 160).all()
+    assert sum(part.count("- student") for part in parts) == 6
+
+def test_edited_template_is_reloaded(tmp_path):
+    path = tmp_path / "parent_email.en.txt"
+    path.write_text("Subject: One\nfirst")
+    assert load_template("parent", "email", template_dir=str(tmp_path)).subject == "One"
+    mtime = path.stat().st_mtime_ns
+    path.write_text("Subject: Two\nsecond version")
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))   # coarse filesystem clocks: make the edit visible
+    assert load_template("parent", "email", template_dir=str(tmp_path)).subject == "Two"
+
+def test_subject_follows_recipient_language(tmp_path, scored, monkeypatch):
+    subjects = []
+    monkeypatch.setattr(notifier, "send_email", lambda to, subject, body, pool=None: (subjects.append(subject), (True, "ok"))[1])
+    scored["parent_id"] = [1, 2, 1]
+    alerts = tmp_path / "alerts.csv"
+    scored.to_csv(alerts, index=False)
+    parents = tmp_path / "parents.csv"
+    parents.write_text("parent_id,parent_name,parent_email,language\n1,Sunita Rao,s@example.org,hi\n"
+                       "2,Vikram Kumar,v@example.org,en\n")
+    with notifier.Dispatcher({"email": notifier.ChannelLimit(concurrency=1)}) as dispatcher:
+        notifier.send_to_parents(str(alerts), [str(parents)], channel="email", dispatcher=dispatcher)
+    assert subjects == ["उपस्थिति सहायता सूचना", "Attendance support update"]
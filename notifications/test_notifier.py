@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import notifier
+from notifier import SMTPPool
+from smtp_sink import SMTPSink
+
+
+@pytest.fixture
+def sink():
+    with SMTPSink() as s:
+        yield s
+
+def _pool(sink, **kwargs):
+    return SMTPPool("127.0.0.1", sink.port, user="desk@example.org", password="x",
+                    starttls=False, timeout=5, **kwargs)
+
+def test_pool_reuses_one_session(sink):
+    with _pool(sink, size=1) as pool:
+        results = [notifier.send_email(f"m{i}@example.org", "Digest", "body", pool=pool) for i in range(20)]
+    assert all(ok for ok, _ in results)
+    assert len(sink.messages) == 20 and sink.connections == 1
+    assert sink.messages[3]["to"] == ["<m3@example.org>"]
+
+def test_sessions_are_recycled_after_max_per_session(sink):
+    with _pool(sink, size=1, max_per_session=5) as pool:
+        for i in range(12):
+            pool.send(notifier.build_email(f"m{i}@example.org", "Digest", "body"))
+    assert len(sink.messages) == 12 and sink.connections == 3
+
+def test_dropped_connection_is_retried_transparently():
+    with SMTPSink(drop_after=3) as sink, _pool(sink, size=1) as pool:
+        results = [pool.send(notifier.build_email(f"m{i}@example.org", "Digest", "body")) for i in range(10)]
+        assert all(ok for ok, _ in results)
+        assert len(sink.messages) == 10 and pool.reconnects >= 3
+
+def test_drop_after_data_is_not_resent():
+    with SMTPSink(hang_up_in_data=True) as sink, _pool(sink, size=1) as pool:
+        ok, info = pool.send(notifier.build_email("m@example.org", "Digest", "body"))
+        assert not ok and info.startswith(notifier.AMBIGUOUS_DELIVERY) and pool.reconnects == 0
+        assert len(sink.messages) == 1      # the server has it: a retry would have delivered it twice
+
+def test_refused_recipient_fails_without_dropping_the_session():
+    with SMTPSink(reject={"gone@example.org"}) as sink, _pool(sink, size=1) as pool:
+        ok, info = notifier.send_email("gone@example.org", "Digest", "body", pool=pool)
+        assert not ok and "gone@example.org" in info
+        assert notifier.send_email("here@example.org", "Digest", "body", pool=pool)[0]
+        assert sink.connections == 1 and len(sink.messages) == 1
+
+def test_token_bucket_bounds_the_rate():
+    bucket = notifier.TokenBucket(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(21):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.19
+
+def test_dispatcher_caps_concurrency_and_keeps_order(monkeypatch):
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def slow_stub(to_phone, body):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return (to_phone != "bad"), "stubbed"
+    monkeypatch.setattr(notifier, "send_sms_stub", slow_stub)
+
+    phones = ["bad" if i == 5 else f"+91{i}" for i in range(20)]
+    with notifier.Dispatcher({"sms_stub": notifier.ChannelLimit(concurrency=3)}) as dispatcher:
+        sent, failed = dispatcher.collect(
+            [dispatcher.submit("sms_stub", i, phone, "hi") for i, phone in enumerate(phones)]
+            + [("mentor_not_found", 99)])
+    assert peak[0] == 3
+    assert [key for key, _ in sent] == [i for i in range(20) if i != 5]
+    assert failed == [(5, "stubbed"), ("mentor_not_found", 99)]
+
+def test_send_to_mentors_dispatches_email(sink, tmp_path):
+    mentors = tmp_path / "mentors.csv"
+    alerts = tmp_path / "alerts.csv"
+    mentors.write_text("mentor_id,mentor_name,mentor_email\n1,A,a@example.org\n2,B,b@example.org\n")
+    alerts.write_text("mentor_id,message_mentor\n1,first\n2,second\n3,orphan\n1,third\n")
+    limits = {"email": notifier.ChannelLimit(concurrency=2)}
+    with _pool(sink, size=2) as pool, notifier.Dispatcher(limits, smtp_pool=pool) as dispatcher:
+        per_alert = notifier.send_to_mentors(str(alerts), [str(mentors)], dispatcher=dispatcher, digest=False)
+        digests = notifier.send_to_mentors(str(alerts), [str(mentors)], dispatcher=dispatcher)
+    assert [key for key, _ in per_alert[0]] == [1, 2, 1]
+    assert per_alert[1] == [("mentor_not_found", 3)]
+    assert [key for key, _ in digests[0]] == [1, 2]
+    assert digests[1] == [("mentor_not_found", 3)]
+    assert len(sink.messages) == 5
+    assert any(b"- first\r\n- third" in m["data"] for m in sink.messages[3:])
+
+def test_digests_group_by_recipient_highest_risk_first():
+    alerts = pd.DataFrame({
+        "mentor_id": [10, 20, 10, 10, None],
+        "parent_id": [1, 2, 1, 3, 4],
+        "message_mentor": ["low", "only", "high", "mid", "no mentor"],
+        "message_parent": ["Dear P1, Asha", "Dear P2", "Dear P1, Ravi", "Dear P3", "Dear P4"],
+        "Risk_Score": [0.35, 0.9, 0.95, 0.6, 0.5],
+    })
+    mentors = notifier.build_digests(alerts, "mentor")
+    assert mentors["students"].tolist()[:2] == [3, 1]
+    assert mentors["message_mentor"][0] == (
+        "3 students need attention this week (highest risk first):\n\n- high\n- mid\n- low")
+    assert mentors["message_mentor"][1].startswith("1 student needs")
+    assert mentors["Risk_Score"].tolist()[:2] == [0.95, 0.9]
+    assert pd.isna(mentors["mentor_id"][2]) and mentors["message_mentor"][2] == "no mentor"
+
+    parents = notifier.build_digests(alerts, "parent").set_index("parent_id")
+    assert parents.loc[1, "message_parent"] == "Dear P1, Ravi\n\nDear P1, Asha"
+    assert parents["students"].tolist() == [2, 1, 1, 1]
+
+def test_contact_directory_normalizes_aliases_and_indexes(tmp_path):
+    first = tmp_path / "parents1.csv"
+    second = tmp_path / "parents2.csv"
+    first.write_text("ParentID,ParentName,Email\n7,Asha,asha@example.org\n8,Ravi,ravi@example.org\n")
+    second.write_text("parent_id,parent_name,parent_phone\n8,Ravi Again,+9100\n9,Neha,+9111\n")
+    directory = notifier.ContactDirectory.load([str(first), str(second)], "parent")
+    assert len(directory) == 3
+    assert list(directory.positions([9, 7, 42, None])) == [2, 0, -1, -1]
+    ravi = directory.get(8)
+    assert (ravi.name, ravi.email) == ("Ravi", "ravi@example.org")
+    assert directory.get(9).phone == "+9111"
+
+def test_contact_directory_cache_follows_file_changes(tmp_path):
+    path = tmp_path / "mentors.csv"
+    cache_dir = str(tmp_path / "cache")
+    path.write_text("mentor_id,mentor_name,mentor_email\n1,A,a@example.org\n2,B,\n")
+    assert notifier.ContactDirectory.load([str(path)], "mentor").get(1).email == "a@example.org"
+    assert not (tmp_path / "cache").exists()     # no cache unless asked for
+
+    notifier.ContactDirectory.load([str(path)], "mentor", cache_dir=cache_dir)
+    cached = notifier.ContactDirectory.load([str(path)], "mentor", cache_dir=cache_dir)
+    assert list((tmp_path / "cache").glob("contacts_mentor_*.npz"))
+    pd.testing.assert_frame_equal(cached.frame, notifier.ContactDirectory.from_files([str(path)], "mentor").frame)
+    path.write_text("mentor_id,mentor_name,mentor_email\n1,A,new-address@example.org\n")
+    reloaded = notifier.ContactDirectory.load([str(path)], "mentor", cache_dir=cache_dir)
+    assert reloaded.get(1).email == "new-address@example.org"
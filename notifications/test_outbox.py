@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import notifier
+from outbox import Outbox, is_permanent
+from smtp_sink import SMTPSink
+
+
+@pytest.fixture
+def parents(tmp_path):
+    rows = "\n".join(f"{i},P{i},+91{i:04d}" for i in range(1, 11))
+    path = tmp_path / "parents.csv"
+    path.write_text("parent_id,parent_name,parent_phone\n" + rows + "\n")
+    return notifier.ContactDirectory.load([str(path)], "parent")
+
+@pytest.fixture
+def alerts():
+    return pd.DataFrame({"parent_id": list(range(1, 11)) + [99],
+                         "message_parent": [f"Dear P{i}" for i in range(1, 11)] + ["orphan"]})
+
+@pytest.fixture
+def stub(monkeypatch):
+    calls = []
+
+    def send(to_phone, body):
+        calls.append(to_phone)
+        return True, "stubbed"
+    monkeypatch.setattr(notifier, "send_sms_stub", send)
+    return calls
+
+def _dispatcher():
+    return notifier.Dispatcher({"sms_stub": notifier.ChannelLimit(concurrency=1)})
+
+def test_requeue_of_the_same_week_sends_nothing_twice(tmp_path, parents, alerts, stub):
+    with Outbox(str(tmp_path / "outbox.db")) as box, _dispatcher() as dispatcher:
+        failed = box.enqueue(alerts, parents, "sms_stub", "Update", week="2025-W37")
+        assert failed == [("parent_not_found", 99)] and box.last_enqueued == 10
+        sent, failed = box.deliver(dispatcher)
+        assert len(sent) == 10 and not failed
+
+        box.enqueue(alerts, parents, "sms_stub", "Update", week="2025-W37")
+        assert box.last_enqueued == 0
+        assert box.deliver(dispatcher) == ([], [])
+        box.enqueue(alerts, parents, "sms_stub", "Update", week="2025-W38")
+        assert box.last_enqueued == 10
+    assert len(stub) == 10
+
+def test_transient_failures_back_off_then_succeed(tmp_path, parents, alerts, monkeypatch):
+    attempts = {}
+
+    def flaky(to_phone, body):
+        attempts[to_phone] = attempts.get(to_phone, 0) + 1
+        if to_phone == "+910005":
+            return False, "sms vendor not configured"
+        return attempts[to_phone] >= 3, "throttled (429)"
+    monkeypatch.setattr(notifier, "send_sms_stub", flaky)
+
+    with Outbox(str(tmp_path / "outbox.db"), backoff_base=0.01) as box, _dispatcher() as dispatcher:
+        box.enqueue(alerts, parents, "sms_stub", "Update")
+        sent, failed = box.deliver(dispatcher)
+        assert len(sent) == 9 and failed == [(5, "sms vendor not configured")]
+        assert box.stats() == {"pending": 0, "sending": 0, "sent": 9, "failed": 1, "review": 0}
+    assert attempts["+910005"] == 1 and attempts["+910001"] == 3
+
+def test_crashed_run_resumes_where_it_stopped(tmp_path, parents, alerts, stub):
+    path = str(tmp_path / "outbox.db")
+    with Outbox(path) as box:
+        box.enqueue(alerts, parents, "sms_stub", "Update")
+        # A worker sent and recorded three messages, claimed two more, then died
+        for message_id, *_ in box.claim(batch_size=3, worker_id="dead"):
+            box._record(message_id, 1, True, "stubbed")
+        box.claim(batch_size=2, worker_id="dead")
+        assert box.stats() == {"pending": 5, "sending": 2, "sent": 3, "failed": 0, "review": 0}
+
+    with Outbox(path) as box, _dispatcher() as dispatcher:
+        assert len(box.deliver(dispatcher)[0]) == 5       # the dead worker's claims are still leased
+    with Outbox(path, lease=0) as box, _dispatcher() as dispatcher:
+        assert len(box.deliver(dispatcher)[0]) == 2
+        assert box.stats()["sent"] == 10
+    assert sorted(stub) == sorted(f"+91{i:04d}" for i in range(4, 11))
+
+def test_permanent_errors():
+    assert is_permanent("missing email") and is_permanent("twilio not configured")
+    assert is_permanent("{'x@example.org': (550, b'5.1.1 No such user')}")
+    assert not is_permanent("Connection unexpectedly closed") and not is_permanent("(421, b'Try later')")
+
+def test_lease_is_renewed_while_a_slow_batch_is_sent(tmp_path, parents, alerts, stub):
+    path = str(tmp_path / "outbox.db")
+    with Outbox(path) as box:
+        box.enqueue(alerts, parents, "sms_stub", "Update")
+    limits = {"sms_stub": notifier.ChannelLimit(rate=10, concurrency=1)}    # 10 messages take ~1s
+    with Outbox(path, lease=0.3) as slow, Outbox(path, lease=0.3) as other, \
+            notifier.Dispatcher(limits) as dispatcher:
+        worker = threading.Thread(target=slow.deliver, args=(dispatcher,), kwargs={"worker_id": "slow"})
+        worker.start()
+        time.sleep(0.6)     # twice the lease: without renewals everything unsent would be up for grabs
+        assert other.claim(worker_id="other") == []
+        worker.join()
+        assert other.stats()["sent"] == 10
+    assert sorted(stub) == sorted(f"+91{i:04d}" for i in range(1, 11))
+
+def test_deliver_reports_progress(tmp_path, parents, alerts, stub, capsys):
+    with Outbox(str(tmp_path / "outbox.db")) as box, _dispatcher() as dispatcher:
+        box.enqueue(alerts, parents, "sms_stub", "Update")
+        box.deliver(dispatcher, progress_every=0)
+    assert "📤 Outbox: 10 sent, 0 given up" in capsys.readouterr().out
+
+def test_drop_after_data_is_held_for_review_not_resent(tmp_path):
+    path = tmp_path / "parents.csv"
+    path.write_text("parent_id,parent_name,parent_email\n1,P1,p1@example.org\n2,P2,p2@example.org\n")
+    parents = notifier.ContactDirectory.load([str(path)], "parent")
+    alerts = pd.DataFrame({"parent_id": [1, 2], "message_parent": ["Dear P1", "Dear P2"]})
+    with SMTPSink(hang_up_in_data=True) as sink, \
+            notifier.SMTPPool("127.0.0.1", sink.port, starttls=False, timeout=5, size=1) as pool, \
+            notifier.Dispatcher(smtp_pool=pool) as dispatcher, \
+            Outbox(str(tmp_path / "outbox.db"), backoff_base=0.01) as box:
+        box.enqueue(alerts, parents, "email", "Update")
+        sent, failed = box.deliver(dispatcher)
+        assert sent == [] and [key for key, _ in failed] == [1, 2]
+        assert box.stats()["review"] == 2
+        # Neither a later run nor requeue-failed sends them again
+        assert box.requeue_failed() == 0 and box.deliver(dispatcher) == ([], [])
+        assert len(sink.messages) == 2